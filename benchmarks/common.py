@@ -0,0 +1,52 @@
+import os
+import tempfile
+from decimal import Decimal
+
+
+def use_temp_database(name: str = "bench") -> str:
+    # Must run before anything under src/ is imported: settings are read at import time.
+    directory = tempfile.mkdtemp(prefix=f"happyloop-{name}-")
+    url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ["DATABASE_URL"] = url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    return url
+
+
+def quiet_engines() -> None:
+    from src.db.database import async_engine, sql_engine
+
+    sql_engine.echo = False
+    async_engine.echo = False
+
+
+def create_schema() -> None:
+    import src.db.base  # noqa: F401  registers every table on the metadata
+    from src.db.database import create_tables
+
+    create_tables()
+
+
+def seed_products(session, count: int = 1, stock: int = 100, price: str = "3.50"):
+    from src.model.product import Product
+
+    products = [
+        Product(
+            name=f"Product {i}",
+            sku=f"SKU_{i}",
+            description=f"Product {i}",
+            price=Decimal(price),
+            stock_quantity=stock,
+        )
+        for i in range(count)
+    ]
+    session.add_all(products)
+    session.commit()
+    return [p.id for p in products]
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,70 @@
+"""Purchase throughput with SQLAlchemy/SQLite defaults versus the tuned engine.
+
+Runs benchmarks.purchase_concurrency once per configuration, each in its own
+process and database file, since settings are read at import time and the
+journal mode sticks to the file:
+
+    python -m benchmarks.db_tuning --buyers 32 --attempts 50
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+# What the engine used before the settings-driven factory.
+BASELINE = {
+    "DB_POOL_SIZE": "5",
+    "DB_MAX_OVERFLOW": "10",
+    "DB_POOL_PRE_PING": "false",
+    "SQLITE_JOURNAL_MODE": "",
+    "SQLITE_SYNCHRONOUS": "",
+    "SQLITE_BUSY_TIMEOUT_MS": "",
+    "SQLITE_MMAP_SIZE": "",
+    "SQLITE_CACHE_SIZE": "",
+    "SQLITE_TEMP_STORE": "",
+}
+CONFIGURATIONS = {"baseline": BASELINE, "tuned": {}}
+COLUMNS = ["purchases_per_s", "p50_ms", "p99_ms", "successful", "rejected", "consistent"]
+
+
+def run_configuration(overrides: dict, args: argparse.Namespace) -> dict:
+    env = {**os.environ, **overrides}
+    # Keep the tuned run on the defaults in src/settings.py, not the caller's shell.
+    if not overrides:
+        for key in BASELINE:
+            env.pop(key, None)
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.purchase_concurrency",
+        "--json",
+        "--buyers", str(args.buyers),
+        "--stock", str(args.stock),
+        "--attempts", str(args.attempts),
+    ]
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--buyers", type=int, default=16)
+    parser.add_argument("--stock", type=int, default=500)
+    parser.add_argument("--attempts", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {
+        name: run_configuration(overrides, args)
+        for name, overrides in CONFIGURATIONS.items()
+    }
+    print(f"{'':>16}" + "".join(f"{name:>12}" for name in results))
+    for column in COLUMNS:
+        print(f"{column:>16}" + "".join(f"{str(r[column]):>12}" for r in results.values()))
+    speedup = results["tuned"]["purchases_per_s"] / results["baseline"]["purchases_per_s"]
+    print(f"{'speedup':>16}{speedup:>24.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""Async load generator for the running stack (nginx on :80 by default).
+
+Synthesizes chat, product, transaction and bulk-purchase traffic, or replays
+a JSONL file of requests, at a target rate (--rps) or a fixed number of
+concurrent clients (--concurrency alone). Reports latency percentiles and
+errors per endpoint, checks stock for oversells, and writes everything as
+JSON so runs can be compared between commits:
+
+    docker compose -f docker-compose.yml -f docker-compose.loadtest.yml up -d
+    python -m benchmarks.load_test --rps 50 --duration 60 --output results.json
+    python -m benchmarks.load_test --rps 50 --duration 60 --compare results.json
+
+Replay lines look like {"method": "POST", "path": "/api/v1/chat",
+"json": {"message": "two cokes"}}; a bare {"message": ...} is a chat request.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import httpx
+
+from benchmarks.common import percentile
+
+
+DEFAULT_MIX = "chat=0.6,products=0.2,transactions=0.1,analytics=0.05,bulk=0.05"
+CHAT_TEMPLATES = [
+    "{count} {name}",
+    "I want {count} {name}",
+    "can I get {count} {name} please",
+    "how many {name} are left?",
+    "what do you have?",
+    "{count} {name} and one {other}",
+    "hello",
+]
+COUNT_WORDS = ["a", "one", "two", "three", "2", "3"]
+# Stored as the transactions' user_message, to tell bulk sales from chat sales.
+BULK_REFERENCE = "load-test bulk"
+# Synthesized reads that never expect a 4xx; on these one counts as an error.
+READ_ENDPOINTS = {"products", "transactions", "analytics"}
+
+
+class Traffic:
+    def __init__(self, products: List[dict], mix: Dict[str, float], rng: random.Random):
+        self.products = [p for p in products if p.get("is_active", True)] or products
+        self.rng = rng
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+
+    def next(self) -> dict:
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        return getattr(self, f"_{kind}")()
+
+    def _product(self) -> dict:
+        return self.rng.choice(self.products)
+
+    def _chat(self) -> dict:
+        product, other = self._product(), self._product()
+        message = self.rng.choice(CHAT_TEMPLATES).format(
+            count=self.rng.choice(COUNT_WORDS), name=product["name"], other=other["name"]
+        )
+        return dict(endpoint="chat", method="POST", path="/api/v1/chat", json={"message": message})
+
+    def _products(self) -> dict:
+        choice = self.rng.random()
+        if choice < 0.4:
+            return dict(endpoint="products", method="GET", path="/api/v1/products")
+        if choice < 0.8:
+            path = f"/api/v1/products/{self._product()['id']}"
+            return dict(endpoint="products", method="GET", path=path)
+        name = self._product()["name"].split()[0]
+        return dict(endpoint="products", method="GET", path=f"/api/v1/products/search/{quote(name)}")
+
+    def _transactions(self) -> dict:
+        return dict(endpoint="transactions", method="GET", path="/api/v1/transactions?limit=50")
+
+    def _analytics(self) -> dict:
+        path = self.rng.choice(["total", "daily", "popular-products", "hourly"])
+        return dict(
+            endpoint="analytics", method="GET", path=f"/api/v1/transactions/analytics/{path}"
+        )
+
+    def _bulk(self) -> dict:
+        items = [
+            {"product_id": self._product()["id"], "quantity": self.rng.randint(1, 2)}
+            for _ in range(self.rng.randint(1, 3))
+        ]
+        return dict(
+            endpoint="bulk",
+            method="POST",
+            path="/api/v1/purchases/bulk",
+            json={"items": items, "reference": BULK_REFERENCE},
+        )
+
+
+def load_replay(path: str) -> List[dict]:
+    requests = []
+    with open(path) as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "path" not in entry:
+                entry = {"method": "POST", "path": "/api/v1/chat", "json": {"message": entry["message"]}}
+            endpoint = entry.get("endpoint") or entry["path"].split("?")[0].rstrip("/")
+            requests.append(
+                dict(
+                    endpoint=endpoint,
+                    method=entry.get("method", "GET").upper(),
+                    path=entry["path"],
+                    json=entry.get("json"),
+                )
+            )
+    return requests
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, request: dict, elapsed: float, response: Optional[httpx.Response]):
+        endpoint = request["endpoint"]
+        self.latencies[endpoint].append(elapsed)
+        if response is None:
+            self.statuses[endpoint]["exception"] += 1
+            self.errors[endpoint] += 1
+            return
+        self.statuses[endpoint][str(response.status_code)] += 1
+        # 4xx are answers on chat and bulk (unknown product, out of stock), but a
+        # bad request on a read; 5xx and timeouts are always errors.
+        if response.status_code >= 500 or (
+            response.status_code >= 400 and endpoint in READ_ENDPOINTS
+        ):
+            self.errors[endpoint] += 1
+
+    def summary(self, duration: float) -> Dict[str, dict]:
+        result = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            result[endpoint] = {
+                "requests": len(latencies),
+                "rps": round(len(latencies) / duration, 2),
+                "errors": self.errors[endpoint],
+                "error_rate": round(self.errors[endpoint] / len(latencies), 4),
+                "statuses": dict(self.statuses[endpoint]),
+                "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+                "max_ms": round(max(latencies) * 1000, 2),
+            }
+        return result
+
+
+async def send(client: httpx.AsyncClient, recorder: Recorder, request: dict) -> None:
+    started = time.perf_counter()
+    try:
+        response = await client.request(request["method"], request["path"], json=request.get("json"))
+    except httpx.HTTPError:
+        response = None
+    recorder.record(request, time.perf_counter() - started, response)
+
+
+async def open_loop(client, recorder, next_request, rps: float, duration: float, limit: int):
+    # Requests start on schedule whether or not earlier ones finished, so a
+    # slow server shows up as latency instead of as a lower offered load.
+    in_flight = asyncio.Semaphore(limit)
+    tasks = set()
+    started = time.perf_counter()
+    sent = 0
+    while True:
+        due = started + sent / rps
+        if due - started >= duration:
+            break
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        request = next_request()
+        if request is None:
+            break
+        await in_flight.acquire()
+        task = asyncio.create_task(send(client, recorder, request))
+        task.add_done_callback(lambda _: in_flight.release())
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        sent += 1
+    await asyncio.gather(*tasks)
+
+
+async def closed_loop(client, recorder, next_request, concurrency: int, duration: float):
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            request = next_request()
+            if request is None:
+                return
+            await send(client, recorder, request)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def fetch_products(client: httpx.AsyncClient) -> List[dict]:
+    # Stock snapshots must not come from nginx's product cache, which can
+    # also hand out a stale copy while it refreshes one.
+    response = await client.get(
+        "/api/v1/products", params={"limit": 1000}, headers={"Cache-Control": "no-cache"}
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def latest_transaction_id(client: httpx.AsyncClient) -> int:
+    response = await client.get("/api/v1/transactions", params={"limit": 1})
+    response.raise_for_status()
+    transactions = response.json()
+    return transactions[0]["id"] if transactions else 0
+
+
+async def sales_since(client: httpx.AsyncClient, after_id: int) -> List[dict]:
+    # Successful transactions newer than after_id, following X-Next-Cursor.
+    sales = []
+    params = {"limit": 1000}
+    while True:
+        response = await client.get("/api/v1/transactions", params=params)
+        response.raise_for_status()
+        page = [t for t in response.json() if t["id"] > after_id]
+        sales.extend(t for t in page if t["status"] == "success")
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor or len(page) < len(response.json()):
+            return sales
+        params = {"limit": 1000, "cursor": cursor}
+
+
+def check_stock(before: List[dict], after: List[dict], sales: List[dict]) -> dict:
+    # The transaction ledger, not the responses, says what was sold: it also
+    # covers requests that timed out on our side but completed on the server.
+    sold = defaultdict(int)
+    by_endpoint = defaultdict(int)
+    for sale in sales:
+        sold[sale["product_id"]] += sale["quantity"]
+        endpoint = "bulk" if sale["user_message"] == BULK_REFERENCE else "chat"
+        by_endpoint[endpoint] += sale["quantity"]
+
+    final = {p["id"]: p["stock_quantity"] for p in after}
+    products = {}
+    for product in before:
+        product_id = product["id"]
+        initial = product["stock_quantity"]
+        remaining = final.get(product_id, 0)
+        products[product_id] = {
+            "initial_stock": initial,
+            "final_stock": remaining,
+            "units_sold": sold[product_id],
+            "oversold": max(0, sold[product_id] - initial, -remaining),
+            "consistent": remaining == initial - sold[product_id],
+        }
+    return {
+        "units_sold_by_endpoint": dict(by_endpoint),
+        "oversold_units": sum(p["oversold"] for p in products.values()),
+        "consistent": all(p["consistent"] for p in products.values()),
+        "products": products,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if not hasattr(Traffic, f"_{kind.strip()}"):
+            raise SystemExit(f"unknown traffic kind: {kind}")
+        mix[kind.strip()] = float(weight or 1)
+    return mix
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+        for product in await fetch_products(client):
+            if args.restock and product["stock_quantity"] < args.restock:
+                await client.post(
+                    f"/api/v1/products/{product['id']}/restock",
+                    params={"quantity": args.restock - product["stock_quantity"]},
+                )
+        before = await fetch_products(client)
+        last_transaction_id = await latest_transaction_id(client)
+
+        if args.replay:
+            replay = iter(load_replay(args.replay))
+            next_request = lambda: next(replay, None)  # noqa: E731
+        else:
+            traffic = Traffic(before, parse_mix(args.mix), rng)
+            next_request = traffic.next
+
+        recorder = Recorder()
+        started = time.perf_counter()
+        if args.rps:
+            await open_loop(client, recorder, next_request, args.rps, args.duration, args.concurrency)
+        else:
+            await closed_loop(client, recorder, next_request, args.concurrency, args.duration)
+        elapsed = time.perf_counter() - started
+
+        after = await fetch_products(client)
+        sales = await sales_since(client, last_transaction_id)
+
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            key: getattr(args, key)
+            for key in ("base_url", "rps", "concurrency", "duration", "mix", "replay", "seed")
+        },
+        "elapsed_s": round(elapsed, 3),
+        "endpoints": recorder.summary(elapsed),
+        "stock": check_stock(before, after, sales),
+    }
+
+
+def compare(result: dict, baseline: dict) -> None:
+    print(f"\ncompared with {baseline.get('commit')} ({baseline.get('started_at')}):")
+    for endpoint, stats in result["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(endpoint)
+        if not previous:
+            continue
+        deltas = []
+        for key in ("p50_ms", "p99_ms", "rps", "error_rate"):
+            if previous[key]:
+                deltas.append(f"{key} {(stats[key] - previous[key]) / previous[key]:+.1%}")
+            else:
+                deltas.append(f"{key} {previous[key]} -> {stats[key]}")
+        print(f"  {endpoint:>14}: " + ", ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", default="http://localhost")
+    parser.add_argument("--rps", type=float, default=0, help="Target rate; 0 runs closed-loop")
+    parser.add_argument("--concurrency", type=int, default=32, help="Clients, or max in flight")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--replay", help="JSONL file of requests to send instead")
+    parser.add_argument("--restock", type=int, default=0, help="Top every product up to this stock")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Previous results file to diff against")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    for endpoint, stats in result["endpoints"].items():
+        print(
+            f"{endpoint:>14}: {stats['requests']:>6} req  {stats['rps']:>8} rps  "
+            f"p50 {stats['p50_ms']:>8} ms  p95 {stats['p95_ms']:>8} ms  "
+            f"p99 {stats['p99_ms']:>8} ms  errors {stats['errors']}"
+        )
+    stock = result["stock"]
+    print(f"{'oversold':>14}: {stock['oversold_units']} units, consistent: {stock['consistent']}")
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(result, handle, indent=2)
+    if args.compare:
+        with open(args.compare) as handle:
+            compare(result, json.load(handle))
+    if stock["oversold_units"]:
+        raise SystemExit("oversell detected")
+
+
+if __name__ == "__main__":
+    main()
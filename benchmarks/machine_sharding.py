@@ -0,0 +1,166 @@
+"""Purchase throughput as the number of machines grows.
+
+Every machine gets `--buyers` processes selling from its own machine_stock
+rows. In the "shared" layout all machines live in one SQLite file,
+partitioned by machine_id, and queue on its single write lock; in the
+"sharded" layout SHARD_DATABASE_URL gives each machine its own file. Buyers
+are processes rather than threads, like replicas and uvicorn workers:
+
+    python -m benchmarks.machine_sharding --machines 1,2,4,8 --buyers 2
+
+Each configuration runs in a fresh process and temporary directory, since
+settings are read at import time.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import percentile
+
+
+LAYOUTS = ("shared", "sharded")
+COLUMNS = ["purchases_per_s", "per_machine_per_s", "p50_ms", "p99_ms", "consistent"]
+
+
+def machine_ids(count: int):
+    return [f"bench-{i}" for i in range(count)]
+
+
+def buyer(machine_id: str, attempts: int, barrier, results) -> None:
+    from sqlmodel import Session
+
+    from benchmarks.common import quiet_engines
+    from src.db.database import sql_engine
+    from src.db.shards import shard_router
+    from src.model.purchase import PurchaseIntent, UserIntent
+    from src.service.purchase_service import PurchaseService
+
+    quiet_engines()
+    intent = PurchaseIntent(
+        intent=UserIntent.PURCHASE, product_name="Product 0", quantity=1, confidence=1.0
+    )
+    latencies = []
+    sold = 0
+    barrier.wait()
+    started = time.time()
+    for _ in range(attempts):
+        with Session(sql_engine) as session, shard_router.stock_session(
+            machine_id, session
+        ) as stock_session:
+            service = PurchaseService(session, machine_id, stock_session)
+            attempt_started = time.perf_counter()
+            response = service.process_purchase(intent, "bench")
+            latencies.append(time.perf_counter() - attempt_started)
+        sold += response.success
+    results.put((started, time.time(), latencies, sold))
+
+
+def run(machines: int, buyers: int, attempts: int) -> dict:
+    from sqlmodel import Session
+
+    from benchmarks.common import create_schema, quiet_engines, seed_products
+    from src.db.database import sql_engine
+    from src.db.repository.machine_stock_repository import MachineStockRepository
+    from src.db.shards import shard_router
+
+    quiet_engines()
+    create_schema()
+    stock = buyers * attempts
+    with Session(sql_engine) as session:
+        (product_id,) = seed_products(session, count=1)
+        for machine_id in machine_ids(machines):
+            with shard_router.stock_session(machine_id, session, create=True) as stock_session:
+                MachineStockRepository(stock_session, machine_id).set_stock(product_id, stock)
+
+    # Spawned buyers inherit the environment, so they open the same databases.
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(machines * buyers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=buyer, args=(machine_id, attempts, barrier, results))
+        for machine_id in machine_ids(machines)
+        for _ in range(buyers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    elapsed = max(o[1] for o in outcomes) - min(o[0] for o in outcomes)
+    latencies = [latency for o in outcomes for latency in o[2]]
+    sold = sum(o[3] for o in outcomes)
+    with Session(sql_engine) as session:
+        remaining = 0
+        for machine_id in machine_ids(machines):
+            with shard_router.stock_session(machine_id, session) as stock_session:
+                remaining += MachineStockRepository(stock_session, machine_id).get_levels()[product_id]
+
+    attempts_total = machines * buyers * attempts
+    return {
+        "machines": machines,
+        "buyers": machines * buyers,
+        "attempts": attempts_total,
+        "elapsed_s": round(elapsed, 3),
+        "purchases_per_s": round(attempts_total / elapsed, 1),
+        "per_machine_per_s": round(attempts_total / elapsed / machines, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "successful": sold,
+        "consistent": remaining + sold == machines * stock,
+    }
+
+
+def run_configuration(layout: str, machines: int, args: argparse.Namespace) -> dict:
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.machine_sharding",
+        "--single",
+        "--layout", layout,
+        "--machines", str(machines),
+        "--buyers", str(args.buyers),
+        "--attempts", str(args.attempts),
+    ]
+    output = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--machines", default="1,2,4,8", help="Comma-separated machine counts")
+    parser.add_argument("--buyers", type=int, default=2, help="Buyer processes per machine")
+    parser.add_argument("--attempts", type=int, default=200, help="Purchases per buyer")
+    parser.add_argument("--layout", choices=LAYOUTS, default=None)
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        from benchmarks.common import use_temp_database
+
+        url = use_temp_database("machines")
+        if args.layout == "sharded":
+            os.environ["SHARD_DATABASE_URL"] = url.replace("bench.db", "machine_{machine_id}.db")
+        else:
+            os.environ.pop("SHARD_DATABASE_URL", None)
+        print(json.dumps(run(int(args.machines), args.buyers, args.attempts)))
+        return
+
+    counts = [int(count) for count in args.machines.split(",")]
+    layouts = [args.layout] if args.layout else list(LAYOUTS)
+    for layout in layouts:
+        print(f"\n{layout}")
+        print(f"{'machines':>18}" + "".join(f"{count:>10}" for count in counts))
+        results = [run_configuration(layout, count, args) for count in counts]
+        for column in COLUMNS:
+            print(f"{column:>18}" + "".join(f"{str(r[column]):>10}" for r in results))
+        if any(not r["consistent"] for r in results):
+            raise SystemExit("oversell detected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Chat-completions server that stands in for OpenAI during load tests.
+
+Answers instructor tool calls for PurchaseIntent and IntentBatch with the
+local intent model, after a configurable delay, so load tests need no
+network and no API key:
+
+    python -m benchmarks.mock_openai --port 8080 --latency-ms 400 --jitter-ms 150
+    LLM_BACKEND=mock LLM_MOCK_BASE_URL=http://localhost:8080/v1 uv run dev
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from src.core.local_llm import tool_arguments
+
+
+def completion(model: str, tool: str, arguments: dict, prompt_tokens: int) -> dict:
+    content = json.dumps(arguments)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "tool_calls",
+                "message": {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [
+                        {
+                            "id": f"call_{uuid.uuid4().hex[:24]}",
+                            "type": "function",
+                            "function": {"name": tool, "arguments": content},
+                        }
+                    ],
+                },
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_tokens + len(content) // 4,
+        },
+    }
+
+
+def create_app(latency_ms: float, jitter_ms: float, error_rate: float, seed: Optional[int]):
+    app = FastAPI(title="Mock OpenAI")
+    rng = random.Random(seed)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        if rng.random() < error_rate:
+            return JSONResponse(
+                {"error": {"message": "Injected failure", "type": "server_error"}},
+                status_code=500,
+            )
+
+        tools = body.get("tools") or []
+        tool = tools[0]["function"]["name"] if tools else "PurchaseIntent"
+        messages = body.get("messages", [])
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+        arguments = tool_arguments(tool, messages)
+        return completion(body.get("model", "mock"), tool, arguments, prompt_tokens)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--latency-ms", type=float, default=float(os.getenv("MOCK_LLM_LATENCY_MS", "400"))
+    )
+    parser.add_argument(
+        "--jitter-ms", type=float, default=float(os.getenv("MOCK_LLM_JITTER_MS", "100"))
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=float(os.getenv("MOCK_LLM_ERROR_RATE", "0"))
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
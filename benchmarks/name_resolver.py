@@ -0,0 +1,193 @@
+"""Product name resolution: ILIKE + alias loop versus ProductResolver.
+
+Seeds a catalog (10k products by default) and resolves the same mix of
+exact names, SKUs, aliases and typos through both implementations:
+
+    python -m benchmarks.name_resolver --products 10000
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from benchmarks.common import (
+    create_schema,
+    percentile,
+    quiet_engines,
+    use_temp_database,
+)
+
+use_temp_database("resolver")
+
+from sqlmodel import Session  # noqa: E402
+
+from src.core.catalog import ProductCatalog  # noqa: E402
+from src.db.database import sql_engine  # noqa: E402
+from src.db.repository.product_alias_repository import ProductAliasRepository  # noqa: E402
+from src.db.repository.product_repository import ProductRepository  # noqa: E402
+from src.model.product import Product  # noqa: E402
+from src.model.product_alias import ProductAlias  # noqa: E402
+
+
+BRANDS = [
+    "Coca-Cola", "Pepsi", "Sprite", "Fanta", "Guarana Antarctica", "Schweppes",
+    "Dolly", "Kuat", "Sukita", "Mountain Dew", "Dr Pepper", "Tubaina", "Soda",
+    "Itubaina", "Crush", "Mirinda", "Sumol", "Jesus", "Convenção", "Pureza",
+]
+FLAVORS = [
+    "Original", "Zero", "Diet", "Lemon", "Orange", "Grape", "Cherry", "Vanilla",
+    "Lime", "Guava", "Passion Fruit", "Pineapple", "Tonic", "Ginger", "Mango",
+    "Strawberry", "Apple", "Peach", "Citrus", "Berry",
+]
+SIZES = ["250ml", "350ml", "500ml", "600ml", "1L", "1.5L", "2L", "2.5L", "3L"]
+SERIES = ["Classic", "Retro", "Limited", "Export", "Family", "Festival"]
+
+# The alias table the old implementation had hard-coded.
+LEGACY_ALIASES = {
+    "Coca-Cola": ["coke", "coca cola", "cola"],
+    "Pepsi": ["pepsi"],
+    "Sprite": ["sprite"],
+    "Fanta Orange": ["fanta", "fanta orange"],
+    "Guarana Antarctica": ["guarana", "guarana antarctica"],
+}
+
+
+def _typo(text: str, rng: random.Random) -> str:
+    letters = [i for i in range(len(text) - 1) if text[i].isalpha() and text[i + 1].isalpha()]
+    if not letters:
+        return text
+    i = rng.choice(letters)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2 :]
+
+
+def seed(count: int) -> tuple:
+    names = [
+        f"{brand} {flavor} {size} {series}"
+        for series in SERIES
+        for size in SIZES
+        for flavor in FLAVORS
+        for brand in BRANDS
+    ][:count]
+    with Session(sql_engine) as session:
+        products = [
+            Product(
+                name=name,
+                sku=f"SKU_{i:05d}",
+                description=name,
+                price=Decimal("3.50"),
+                stock_quantity=10,
+            )
+            for i, name in enumerate(names)
+        ]
+        session.add_all(products)
+        session.flush()
+        aliases = [
+            ProductAlias(product_id=product.id, alias=f"{product.name.split()[0].lower()} {i}")
+            for i, product in enumerate(products[::10])
+        ]
+        session.add_all(aliases)
+        session.commit()
+        return [(p.id, p.name, p.sku) for p in products], [(a.product_id, a.alias) for a in aliases]
+
+
+def legacy_find(repo: ProductRepository, name: str):
+    # The previous PurchaseService._find_product_by_name.
+    name_lower = name.lower().strip()
+    products = repo.search_by_name(name)
+    if products:
+        return products[0]
+    for real_name, aliases in LEGACY_ALIASES.items():
+        if any(alias in name_lower for alias in aliases):
+            products = repo.search_by_name(real_name)
+            if products:
+                return products[0]
+    return None
+
+
+def build_queries(products, aliases, count: int, rng: random.Random):
+    queries = []
+    for _ in range(count):
+        kind = rng.choice(["name", "sku", "alias", "typo"])
+        if kind == "alias":
+            product_id, text = rng.choice(aliases)
+        else:
+            product_id, name, sku = rng.choice(products)
+            text = {"name": name, "sku": sku, "typo": _typo(name, rng)}[kind]
+        queries.append((kind, text, product_id))
+    return queries
+
+
+def measure(find, queries):
+    latencies = []
+    hits = {}
+    for kind, text, expected in queries:
+        started = time.perf_counter()
+        product = find(text)
+        latencies.append(time.perf_counter() - started)
+        found, total = hits.get(kind, (0, 0))
+        hits[kind] = (found + (product is not None and product.id == expected), total + 1)
+    return {
+        "p50_us": round(percentile(latencies, 0.5) * 1e6, 1),
+        "p99_us": round(percentile(latencies, 0.99) * 1e6, 1),
+        "max_us": round(max(latencies) * 1e6, 1),
+        "accuracy": {kind: f"{found}/{total}" for kind, (found, total) in sorted(hits.items())},
+    }
+
+
+def run(product_count: int, query_count: int, seed_value: int) -> dict:
+    quiet_engines()
+    create_schema()
+    rng = random.Random(seed_value)
+    products, aliases = seed(product_count)
+    queries = build_queries(products, aliases, query_count, rng)
+
+    catalog = ProductCatalog(check_interval=3600, max_age=3600)
+    with Session(sql_engine) as session:
+        started = time.perf_counter()
+        snapshot = catalog.get(session)
+        build_s = time.perf_counter() - started
+
+        legacy = measure(lambda text: legacy_find(ProductRepository(session), text), queries)
+        resolver = measure(snapshot.find, queries)
+
+    # One product write: the reload re-reads the table but only re-indexes
+    # the changed product.
+    with Session(sql_engine) as session:
+        ProductAliasRepository(session).create(products[-1][0], "reloaded")
+        catalog.invalidate()
+        started = time.perf_counter()
+        snapshot = catalog.get(session)
+        reload_s = time.perf_counter() - started
+        assert snapshot.find("reloaded").id == products[-1][0]
+
+    product_id, name, sku = products[-1]
+    started = time.perf_counter()
+    catalog.resolver.add(product_id, name, sku, ("reloaded", "again"))
+    incremental_us = (time.perf_counter() - started) * 1e6
+
+    return {
+        "products": len(products),
+        "aliases": len(aliases),
+        "queries": len(queries),
+        "snapshot_build_ms": round(build_s * 1000, 1),
+        "snapshot_reload_ms": round(reload_s * 1000, 1),
+        "incremental_update_us": round(incremental_us, 1),
+        "legacy": legacy,
+        "resolver": resolver,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    result = run(args.products, args.queries, args.seed)
+    for key, value in result.items():
+        print(f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Many parallel buyers racing for the same product.
+
+Reports purchase throughput and checks that the units sold never exceed the
+initial stock:
+
+    python -m benchmarks.purchase_concurrency --buyers 32 --stock 500
+"""
+import argparse
+import json
+import threading
+import time
+
+from benchmarks.common import (
+    create_schema,
+    percentile,
+    quiet_engines,
+    seed_products,
+    use_temp_database,
+)
+
+use_temp_database("purchase")
+
+from sqlalchemy import func  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from src.db.database import sql_engine  # noqa: E402
+from src.model.product import Product  # noqa: E402
+from src.model.purchase import PurchaseIntent, UserIntent  # noqa: E402
+from src.model.transaction import Transaction, TransactionStatus  # noqa: E402
+from src.service.purchase_service import PurchaseService  # noqa: E402
+
+
+def run(buyers: int, stock: int, quantity: int, attempts: int) -> dict:
+    quiet_engines()
+    create_schema()
+    with Session(sql_engine) as session:
+        seed_products(session, count=1, stock=stock)
+        product_name = session.exec(select(Product.name)).first()
+
+    intent = PurchaseIntent(
+        intent=UserIntent.PURCHASE,
+        product_name=product_name,
+        quantity=quantity,
+        confidence=1.0,
+    )
+    latencies = []
+    outcomes = {"success": 0, "rejected": 0}
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(buyers)
+
+    def buyer():
+        local_latencies = []
+        local = {"success": 0, "rejected": 0}
+        start_barrier.wait()
+        for _ in range(attempts):
+            with Session(sql_engine) as session:
+                started = time.perf_counter()
+                response = PurchaseService(session).process_purchase(intent, "bench")
+                local_latencies.append(time.perf_counter() - started)
+            local["success" if response.success else "rejected"] += 1
+        with lock:
+            latencies.extend(local_latencies)
+            for key, value in local.items():
+                outcomes[key] += value
+
+    threads = [threading.Thread(target=buyer) for _ in range(buyers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with Session(sql_engine) as session:
+        final_stock = session.exec(select(Product.stock_quantity)).one()
+        sold = session.exec(
+            select(func.coalesce(func.sum(Transaction.quantity), 0)).where(
+                Transaction.status == TransactionStatus.SUCCESS
+            )
+        ).one()
+
+    return {
+        "buyers": buyers,
+        "attempts": buyers * attempts,
+        "elapsed_s": round(elapsed, 3),
+        "purchases_per_s": round(buyers * attempts / elapsed, 1),
+        "successful": outcomes["success"],
+        "rejected": outcomes["rejected"],
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "initial_stock": stock,
+        "final_stock": final_stock,
+        "units_sold": sold,
+        "oversold": max(0, sold - stock) + max(0, -final_stock),
+        "consistent": final_stock + sold == stock,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--buyers", type=int, default=16)
+    parser.add_argument("--stock", type=int, default=500)
+    parser.add_argument("--quantity", type=int, default=1)
+    parser.add_argument("--attempts", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    result = run(args.buyers, args.stock, args.quantity, args.attempts)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key:>16}: {value}")
+    if result["oversold"] or not result["consistent"]:
+        raise SystemExit("oversell detected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Query-plan regression check for TransactionRepository.
+
+Seeds a transactions table (1M rows by default), runs each repository
+query, unscoped and scoped to one machine, and captures the SQL it emits.
+Fails if a query raises or if SQLite plans a full table scan for any of
+its statements:
+
+    python -m benchmarks.query_plans --rows 1000000
+"""
+import argparse
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import create_schema, quiet_engines, use_temp_database
+
+DATABASE_URL = use_temp_database("plans")
+
+from sqlalchemy import event  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from src.db.database import sql_engine  # noqa: E402
+from src.db.repository.transaction_repository import TransactionRepository  # noqa: E402
+from src.model.transaction import UserIntent  # noqa: E402
+
+
+_captured = []
+
+
+def _capture(conn, cursor, statement, parameters, context, executemany):
+    _captured.append((statement, parameters))
+
+
+QUERIES = {
+    "get_all": lambda repo: repo.get_all(0, 100),
+    "get_recent_transactions": lambda repo: repo.get_recent_transactions(24),
+    "get_successful_transactions": lambda repo: repo.get_successful_transactions(
+        datetime.now() - timedelta(days=1)
+    ),
+    "get_sales_by_product": lambda repo: repo.get_sales_by_product(3),
+    "get_total_sales": lambda repo: repo.get_total_sales(
+        datetime.now() - timedelta(days=30)
+    ),
+    "get_daily_sales_summary": lambda repo: repo.get_daily_sales_summary(),
+    "get_failed_transactions": lambda repo: repo.get_failed_transactions(24),
+    "get_transactions_by_intent": lambda repo: repo.get_transactions_by_intent(
+        UserIntent.CHECK_STOCK
+    ),
+    "get_popular_products": lambda repo: repo.get_popular_products(7),
+    "get_hourly_sales_pattern": lambda repo: repo.get_hourly_sales_pattern(7),
+}
+MACHINES = ["default", "bench-1", "bench-2", "bench-3"]
+
+
+def seed(path: str, rows: int, products: int = 50) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO products (name, description, price, stock_quantity, sku, "
+        "is_active, created_at, updated_at) VALUES "
+        + ",".join(
+            f"('Product {i}', NULL, 3.5, 100, 'SKU_{i}', 1, datetime('now'), datetime('now'))"
+            for i in range(products)
+        )
+    )
+    statuses = ["SUCCESS"] * 18 + ["FAILED", "PENDING"]
+    intents = ["PURCHASE"] * 17 + ["CHECK_STOCK", "LIST_PRODUCTS", "UNKNOWN"]
+    start = datetime.now() - timedelta(days=365)
+    step = timedelta(days=365) / rows
+    rng = random.Random(42)
+
+    def generate():
+        for i in range(rows):
+            quantity = rng.randint(1, 3)
+            yield (
+                rng.randint(1, products),
+                quantity,
+                3.5,
+                3.5 * quantity,
+                "bench",
+                rng.choice(statuses),
+                rng.choice(intents),
+                0.9,
+                (start + step * i).strftime("%Y-%m-%d %H:%M:%S.%f"),
+                rng.choice(MACHINES),
+            )
+
+    conn.executemany(
+        "INSERT INTO transactions (product_id, quantity, unit_price, total_price, "
+        "user_message, status, intent, confidence, created_at, machine_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        generate(),
+    )
+    conn.commit()
+    conn.close()
+
+
+def plan_for(path: str, statement: str, parameters) -> list:
+    conn = sqlite3.connect(path)
+    try:
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    finally:
+        conn.close()
+
+
+def is_full_scan(detail: str) -> bool:
+    return detail.startswith("SCAN transactions") and "INDEX" not in detail
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    quiet_engines()
+    create_schema()
+    path = sql_engine.url.database
+    started = time.perf_counter()
+    seed(path, args.rows)
+    print(f"seeded {args.rows} transactions in {time.perf_counter() - started:.1f}s\n")
+
+    failures = []
+    event.listen(sql_engine, "before_cursor_execute", _capture)
+    try:
+        for machine_id in (None, MACHINES[1]):
+            for name, query in QUERIES.items():
+                if machine_id is not None:
+                    name = f"{name}[machine_id]"
+                _captured.clear()
+                with Session(sql_engine) as session:
+                    # Run for real: a query that cannot execute fails the check.
+                    try:
+                        query(TransactionRepository(session, machine_id))
+                    except Exception as e:
+                        print(f"FAIL  {name}: {e!r}")
+                        failures.append(name)
+                        continue
+                if not _captured:
+                    raise RuntimeError(f"{name} did not hit the database")
+                plan = [
+                    detail
+                    for statement, parameters in _captured
+                    for detail in plan_for(path, statement, parameters)
+                ]
+                scans = [detail for detail in plan if is_full_scan(detail)]
+                print(f"{'FAIL' if scans else 'ok':>4}  {name}: {' | '.join(plan)}")
+                if scans:
+                    failures.append(name)
+    finally:
+        event.remove(sql_engine, "before_cursor_execute", _capture)
+
+    if failures:
+        raise SystemExit(f"\nfailed or full table scans: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,19 @@ from fastapi import APIRouter
 from .v1.products import router as products_router
 from .v1.vending import router as vending_router
 from .v1.transactions import router as transactions_router
+from .v1.metrics import router as metrics_router
+from .v1.purchases import router as purchases_router
+from .v1.machines import router as machines_router
+from .v1.reservations import router as reservations_router
+from .v1.inventory import router as inventory_router
 
 api_router = APIRouter()
 
 api_router.include_router(products_router, prefix="/v1")
 api_router.include_router(vending_router, prefix="/v1")
-api_router.include_router(transactions_router, prefix="/v1")
\ No newline at end of file
+api_router.include_router(transactions_router, prefix="/v1")
+api_router.include_router(purchases_router, prefix="/v1")
+api_router.include_router(machines_router, prefix="/v1")
+api_router.include_router(reservations_router, prefix="/v1")
+api_router.include_router(inventory_router, prefix="/v1")
+api_router.include_router(metrics_router, prefix="/v1")
\ No newline at end of file
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from src.core.inventory_feed import inventory_feed
+
+
+router = APIRouter(tags=["inventory"])
+
+
+@router.get("/inventory/changes")
+async def inventory_changes(
+    since: Optional[int] = Query(None, ge=0, description="Resume after this event id"),
+    last_event_id: Optional[int] = Header(None, ge=0),
+):
+    # EventSource sends Last-Event-ID by itself when it reconnects.
+    return StreamingResponse(
+        inventory_feed.stream(since if since is not None else last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from sqlmodel import Session
+from typing import List
+
+from src.db.database import get_session
+from src.db.shards import ShardNotFound, shard_router
+from src.model.machine_stock import MACHINE_ID_PATTERN, MachineStockResponse, MachineStockUpdate
+from src.model.product import ProductResponse
+from src.service.machine_service import MachineService
+
+
+router = APIRouter(tags=["machines"])
+
+MACHINE_ID_PATH = Path(..., pattern=MACHINE_ID_PATTERN)
+
+
+@router.get("/machines/{machine_id}/products", response_model=List[ProductResponse])
+def list_machine_products(
+    machine_id: str = MACHINE_ID_PATH,
+    available_only: bool = Query(False),
+    session: Session = Depends(get_session),
+):
+    try:
+        with shard_router.stock_session(machine_id, session) as stock_session:
+            return MachineService(session, machine_id, stock_session).list_products(available_only)
+    except ShardNotFound:
+        raise HTTPException(status_code=404, detail="Machine not found")
+
+
+@router.put("/machines/{machine_id}/stock/{product_id}", response_model=MachineStockResponse)
+def set_machine_stock(
+    product_id: int,
+    stock: MachineStockUpdate,
+    machine_id: str = MACHINE_ID_PATH,
+    session: Session = Depends(get_session),
+):
+    with shard_router.stock_session(machine_id, session, create=True) as stock_session:
+        service = MachineService(session, machine_id, stock_session)
+        machine_stock = service.set_stock(product_id, stock.stock_quantity)
+    if not machine_stock:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return machine_stock
+
+
+@router.post(
+    "/machines/{machine_id}/stock/{product_id}/restock", response_model=MachineStockResponse
+)
+def restock_machine(
+    product_id: int,
+    quantity: int = Query(..., gt=0),
+    machine_id: str = MACHINE_ID_PATH,
+    session: Session = Depends(get_session),
+):
+    with shard_router.stock_session(machine_id, session, create=True) as stock_session:
+        machine_stock = MachineService(session, machine_id, stock_session).restock(
+            product_id, quantity
+        )
+    if not machine_stock:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return machine_stock
@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session
-from typing import List
+from typing import List, Optional
 
+from src.core.http_cache import CacheValidator
+from src.core.pagination import InvalidCursor
 from src.model.product import ProductCreate, ProductUpdate, ProductResponse
-from src.service.product_service import ProductService
+from src.model.product_alias import ProductAliasCreate, ProductAliasResponse
+from src.service.product_service import AliasInUse, ProductService
 from src.db.database import get_session
 
 
 router = APIRouter(tags=["products"])
 
+
+def _not_modified(request: Request, validator: CacheValidator) -> Optional[Response]:
+    # Answers conditional reads before any product is loaded or serialized.
+    if validator.matches(request.headers):
+        return Response(status_code=304, headers=validator.headers())
+    return None
+
 @router.post("/products", response_model=ProductResponse, status_code=201)
 def create_product(product: ProductCreate, session: Session = Depends(get_session)):
     service = ProductService(session)
@@ -16,22 +26,48 @@ def create_product(product: ProductCreate, session: Session = Depends(get_sessio
 
 @router.get("/products", response_model=List[ProductResponse])
 def list_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; replaces skip"),
     available_only: bool = Query(False),
     session: Session = Depends(get_session)
 ):
     service = ProductService(session)
+    validator = service.get_cache_validator()
+    not_modified = _not_modified(request, validator)
+    if not_modified is not None:
+        return not_modified
+    response.headers.update(validator.headers())
     if available_only:
-        return service.get_available_products()
-    return service.get_all_products(skip, limit)
+        return service.get_available_products(validator.version)
+    try:
+        products, next_cursor = service.get_product_page(
+            skip, limit, cursor, validator.version
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return products
 
 @router.get("/products/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, session: Session = Depends(get_session)):
+def get_product(
+    product_id: int,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session)
+):
     service = ProductService(session)
+    validator = service.get_cache_validator()
+    not_modified = _not_modified(request, validator)
+    if not_modified is not None:
+        return not_modified
     product = service.get_product(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    response.headers.update(validator.headers())
     return product
 
 @router.put("/products/{product_id}", response_model=ProductResponse)
@@ -66,6 +102,47 @@ def restock_product(
     return product
 
 @router.get("/products/search/{name}", response_model=List[ProductResponse])
-def search_products(name: str, session: Session = Depends(get_session)):
+def search_products(
+    name: str,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session)
+):
+    service = ProductService(session)
+    validator = service.get_cache_validator()
+    not_modified = _not_modified(request, validator)
+    if not_modified is not None:
+        return not_modified
+    response.headers.update(validator.headers())
+    return service.search_products(name, validator.version)
+
+@router.get("/products/{product_id}/aliases", response_model=List[ProductAliasResponse])
+def list_product_aliases(product_id: int, session: Session = Depends(get_session)):
+    service = ProductService(session)
+    aliases = service.get_aliases(product_id)
+    if aliases is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return aliases
+
+@router.post(
+    "/products/{product_id}/aliases", response_model=ProductAliasResponse, status_code=201
+)
+def add_product_alias(
+    product_id: int,
+    alias: ProductAliasCreate,
+    session: Session = Depends(get_session)
+):
+    service = ProductService(session)
+    try:
+        product_alias = service.add_alias(product_id, alias)
+    except AliasInUse:
+        raise HTTPException(status_code=409, detail="Alias already in use")
+    if not product_alias:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product_alias
+
+@router.delete("/products/{product_id}/aliases/{alias}", status_code=204)
+def delete_product_alias(product_id: int, alias: str, session: Session = Depends(get_session)):
     service = ProductService(session)
-    return service.search_products(name)
+    if not service.delete_alias(product_id, alias):
+        raise HTTPException(status_code=404, detail="Alias not found")
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import JSONResponse
+from sqlmodel import Session
+from typing import Optional
+
+from src.core.idempotency import (
+    IdempotencyInProgress,
+    IdempotencyKeyReused,
+    fingerprint,
+    idempotency_store,
+)
+from src.db.database import get_session
+from src.db.shards import ShardNotFound, shard_router
+from src.model.purchase import BulkPurchaseRequest, BulkPurchaseResponse
+from src.service.purchase_service import (
+    InsufficientStock,
+    ProductNotFound,
+    PurchaseService,
+)
+
+router = APIRouter(tags=["purchases"])
+
+
+@router.post("/purchases/bulk", response_model=BulkPurchaseResponse, status_code=201)
+def purchase_bulk(
+    request: BulkPurchaseRequest,
+    session: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+):
+    def handler():
+        try:
+            with shard_router.stock_session(request.machine_id, session) as stock_session:
+                service = PurchaseService(session, request.machine_id, stock_session)
+                return 201, service.purchase_bulk(request).model_dump(mode="json")
+        except ShardNotFound:
+            return 404, {"detail": "Machine not found"}
+        except ProductNotFound as e:
+            return 404, {"detail": f"Product {e.args[0]} not found"}
+        except InsufficientStock:
+            return 409, {"detail": "Not enough stock for every item; nothing was sold"}
+
+    if idempotency_key is None:
+        status_code, body = handler()
+        return JSONResponse(body, status_code=status_code)
+
+    try:
+        stored = idempotency_store.execute(
+            session, "purchases_bulk", idempotency_key, fingerprint(request.model_dump()), handler
+        )
+    except IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=422, detail="Idempotency-Key was already used for a different request"
+        )
+    except IdempotencyInProgress:
+        raise HTTPException(
+            status_code=409, detail="A request with this Idempotency-Key is still in progress"
+        )
+    headers = {"Idempotent-Replayed": "true"} if stored.replayed else None
+    return JSONResponse(stored.body, status_code=stored.status_code, headers=headers)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+
+from src.db.database import get_session
+from src.db.shards import ShardNotFound, shard_router
+from src.model.purchase import ReservationResponse
+from src.service.reservation_service import ReservationService, reservation_machine_id
+
+
+router = APIRouter(tags=["reservations"])
+
+
+def _settle(reservation_id: str, session: Session, confirm: bool) -> ReservationResponse:
+    machine_id = reservation_machine_id(reservation_id)
+    reservation = None
+    if machine_id is not None:
+        try:
+            with shard_router.stock_session(machine_id, session) as stock_session:
+                service = ReservationService(session, stock_session)
+                if confirm:
+                    reservation = service.confirm(reservation_id)
+                else:
+                    reservation = service.release(reservation_id)
+        except ShardNotFound:
+            pass
+    if reservation is None:
+        raise HTTPException(
+            status_code=404, detail="Reservation not found, already settled or expired"
+        )
+    return reservation
+
+
+@router.post("/reservations/{reservation_id}/confirm", response_model=ReservationResponse)
+def confirm_reservation(reservation_id: str, session: Session = Depends(get_session)):
+    return _settle(reservation_id, session, confirm=True)
+
+
+@router.post("/reservations/{reservation_id}/release", response_model=ReservationResponse)
+def release_reservation(reservation_id: str, session: Session = Depends(get_session)):
+    return _settle(reservation_id, session, confirm=False)
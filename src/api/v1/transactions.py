@@ -1,33 +1,98 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Engine
 from sqlmodel import Session
-from typing import List, Optional
+from typing import Generator, List, Optional
 from datetime import datetime
 
-from src.model.transaction import TransactionResponse
+from src.core.pagination import InvalidCursor
+from src.model.machine_stock import MACHINE_ID_PATTERN
+from src.model.transaction import ExportFormat, TransactionResponse, TransactionStatus
 from src.service.transaction_service import TransactionService
-from src.db.database import get_session
+from src.db.shards import ShardNotFound, shard_router
 
 router = APIRouter(tags=["transactions"])
 
+MACHINE_ID_QUERY = Query(
+    None,
+    pattern=MACHINE_ID_PATTERN,
+    description="Apenas transações desta máquina. Sem ele, todas as máquinas do banco principal.",
+)
+
+
+def get_transaction_service(
+    machine_id: Optional[str] = MACHINE_ID_QUERY,
+) -> Generator[TransactionService, None, None]:
+    # Each machine's transactions live in its shard database.
+    with Session(_engine_for(machine_id)) as session:
+        yield TransactionService(session, machine_id)
+
+
+def _engine_for(machine_id: Optional[str]) -> Engine:
+    try:
+        return shard_router.engine_for(machine_id)
+    except ShardNotFound:
+        raise HTTPException(status_code=404, detail="Machine not found")
+
 
 @router.get("/transactions", response_model=List[TransactionResponse])
 def get_transaction_history(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    session: Session = Depends(get_session),
+    cursor: Optional[str] = Query(
+        None, description="Cursor do header X-Next-Cursor. Quando informado, ignora skip."
+    ),
+    service: TransactionService = Depends(get_transaction_service),
 ):
-    service = TransactionService(session)
-    return service.get_all_transactions(skip, limit)
+    try:
+        transactions, next_cursor = service.get_transaction_page(skip, limit, cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return transactions
+
+
+@router.get("/transactions/export")
+def export_transactions(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson ou csv."),
+    start_date: Optional[datetime] = Query(
+        None, description="Exportar transações a partir desta data (inclusive)."
+    ),
+    end_date: Optional[datetime] = Query(
+        None, description="Exportar transações até esta data (exclusive)."
+    ),
+    status: Optional[TransactionStatus] = Query(None, description="Filtrar por status."),
+    machine_id: Optional[str] = MACHINE_ID_QUERY,
+):
+    # The stream outlives the request handler, so it owns its session
+    # instead of borrowing one from get_transaction_service.
+    engine = _engine_for(machine_id)
+
+    def stream():
+        with Session(engine) as session:
+            yield from TransactionService(session, machine_id).export_transactions(
+                format, start_date, end_date, status
+            )
+
+    media_type = "text/csv" if format == ExportFormat.CSV else "application/x-ndjson"
+    filename = f"transactions.{'csv' if format == ExportFormat.CSV else 'ndjson'}"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/transactions/summary/daily", response_model=dict)
+@router.get("/transactions/analytics/daily", response_model=dict)
 def get_daily_summary(
     date: Optional[datetime] = Query(
         None, description="Data para o resumo (YYYY-MM-DD). Padrão é hoje."
     ),
-    session: Session = Depends(get_session),
+    service: TransactionService = Depends(get_transaction_service),
 ):
-    service = TransactionService(session)
     return service.get_daily_summary(date)
 
 
@@ -36,7 +101,32 @@ def get_recent_transactions(
     hours: int = Query(
         24, gt=0, description="Número de horas passadas para buscar transações."
     ),
-    session: Session = Depends(get_session),
+    service: TransactionService = Depends(get_transaction_service),
+):
+    return service.get_recent_transactions(hours) 
+
+
+@router.get("/transactions/analytics/total", response_model=dict)
+def get_total_sales(
+    start_date: Optional[datetime] = Query(
+        None, description="Considerar apenas vendas a partir desta data."
+    ),
+    service: TransactionService = Depends(get_transaction_service),
+):
+    return service.get_total_sales(start_date)
+
+
+@router.get("/transactions/analytics/popular-products", response_model=List[dict])
+def get_popular_products(
+    days: int = Query(7, gt=0, description="Número de dias passados a considerar."),
+    service: TransactionService = Depends(get_transaction_service),
+):
+    return service.get_popular_products(days)
+
+
+@router.get("/transactions/analytics/hourly", response_model=List[dict])
+def get_hourly_sales_pattern(
+    days: int = Query(7, gt=0, description="Número de dias passados a considerar."),
+    service: TransactionService = Depends(get_transaction_service),
 ):
-    service = TransactionService(session)
-    return service.get_recent_transactions(hours) 
\ No newline at end of file
+    return service.get_hourly_sales_pattern(days)
\ No newline at end of file
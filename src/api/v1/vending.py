@@ -1,23 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
+import json
+import time
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Optional
 
-from src.db.database import get_session
-from src.service.purchase_service import PurchaseService
-from src.model.purchase import AIResponse, ChatRequest
+from src.core.audit_log import chat_audit_log
+from src.core.idempotency import (
+    IdempotencyInProgress,
+    IdempotencyKeyReused,
+    fingerprint,
+    idempotency_store,
+)
+from src.db.database import get_async_session
+from src.service.purchase_service import AsyncPurchaseService
+from src.model.purchase import AIResponse, ChatRequest, PurchaseIntent
 
 router = APIRouter(tags=["vending-machine"])
 
 
 @router.post("/chat", response_model=AIResponse)
-def chat_with_vending_machine(
-    request: ChatRequest, session: Session = Depends(get_session)
+async def chat_with_vending_machine(
+    request: ChatRequest,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
 ):
+    if idempotency_key is None:
+        return await _chat(request, session)
+
+    async def handler():
+        return 200, (await _chat(request, session)).model_dump(mode="json")
+
+    try:
+        stored = await idempotency_store.execute_async(
+            session, "chat", idempotency_key, fingerprint(request.model_dump()), handler
+        )
+    except IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=422, detail="Idempotency-Key was already used for a different request"
+        )
+    except IdempotencyInProgress:
+        raise HTTPException(
+            status_code=409, detail="A request with this Idempotency-Key is still in progress"
+        )
+    if stored.replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return stored.body
+
+
+async def _chat(request: ChatRequest, session: AsyncSession) -> AIResponse:
+    started = time.perf_counter()
     try:
-        ai_service = PurchaseService()
-        purchase_service = PurchaseService(session)
-        intent = ai_service.parse_user_message(request.message)
-        response = purchase_service.process_purchase(intent, request.message)
-        return response
+        purchase_service = AsyncPurchaseService(session, request.machine_id)
+        intent = await purchase_service.parse_user_message(request.message)
+        parse_seconds = time.perf_counter() - started
+        response = await purchase_service.process_purchase(intent, request.message)
+        response.parse_path = purchase_service.last_parse_path
 
     except Exception as e:
         raise HTTPException(
@@ -26,6 +65,44 @@ def chat_with_vending_machine(
             message=str(e),
         )
 
+    if chat_audit_log is not None:
+        await chat_audit_log.record(
+            _audit_row(
+                request.message,
+                intent,
+                response,
+                parse_seconds,
+                time.perf_counter() - started,
+            )
+        )
+    return response
+
+
+def _audit_row(
+    message: str,
+    intent: PurchaseIntent,
+    response: AIResponse,
+    parse_seconds: float,
+    total_seconds: float,
+) -> dict:
+    items = intent.line_items()
+    transaction_ids = response.transaction_ids or (
+        [response.transaction_id] if response.transaction_id is not None else None
+    )
+    return {
+        "created_at": datetime.now(),
+        "user_message": message,
+        "intent": intent.intent,
+        "product_name": ", ".join(item.product_name for item in items) or intent.product_name,
+        "quantity": sum(item.quantity for item in items) or intent.quantity,
+        "confidence": intent.confidence,
+        "parse_path": response.parse_path.value if response.parse_path else None,
+        "success": response.success,
+        "transaction_ids": json.dumps(transaction_ids) if transaction_ids else None,
+        "parse_ms": parse_seconds * 1000,
+        "total_ms": total_seconds * 1000,
+    }
+
 
 @router.get("/health")
 def health_check():
@@ -1,6 +1,171 @@
+import time
+from types import SimpleNamespace
+
 import instructor
 import openai
-from src.settings import OPENAI_API_KEY
+from src.core.local_llm import LocalIntentModel
+from src.core.metrics import Counter, Histogram
+from src.core.resilience import CircuitBreaker, GuardedCall, RetryPolicy
+from src.core.tracing import Span
+from src.settings import (
+    LLM_ATTEMPT_TIMEOUT_SECONDS,
+    LLM_BACKEND,
+    LLM_BACKOFF_BASE_MS,
+    LLM_BACKOFF_MAX_MS,
+    LLM_BREAKER_FAILURE_THRESHOLD,
+    LLM_BREAKER_RESET_SECONDS,
+    LLM_HEDGE_AFTER_MS,
+    LLM_LOCAL_ERROR_RATE,
+    LLM_LOCAL_JITTER_MS,
+    LLM_LOCAL_LATENCY_MS,
+    LLM_LOCAL_SEED,
+    LLM_MAX_ATTEMPTS,
+    LLM_MOCK_BASE_URL,
+    LLM_TIMEOUT_SECONDS,
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+)
+
+
+llm_request_seconds = Histogram(
+    "llm_request_duration_seconds",
+    "Latency of structured-output calls to the model by response model and outcome",
+    labelnames=("backend", "response_model", "outcome"),
+)
+llm_tokens = Counter(
+    "llm_tokens_total",
+    "Tokens reported by the model's usage block",
+    labelnames=("backend", "kind"),
+)
+
+
+def build_clients(backend: str):
+    """Sync and async clients for `backend`; all share instructor's create()."""
+    if backend == "local":
+        model = LocalIntentModel(
+            latency_ms=LLM_LOCAL_LATENCY_MS,
+            jitter_ms=LLM_LOCAL_JITTER_MS,
+            error_rate=LLM_LOCAL_ERROR_RATE,
+            seed=LLM_LOCAL_SEED,
+        )
+        return model.client(), model.async_client()
+    if backend == "mock":
+        options = {"api_key": "sk-mock", "base_url": LLM_MOCK_BASE_URL}
+    elif backend == "openai":
+        options = {"api_key": OPENAI_API_KEY, "base_url": OPENAI_BASE_URL}
+    else:
+        raise ValueError(f"Unknown LLM_BACKEND: {backend!r}")
+    # Retries and timeouts are ours (see llm_guard), not the SDK's.
+    options.update(max_retries=0, timeout=LLM_TIMEOUT_SECONDS)
+    return (
+        instructor.from_openai(openai.OpenAI(**options)),
+        instructor.from_openai(openai.AsyncOpenAI(**options)),
+    )
+
+
+def _record(backend: str, response_model, started: float, response) -> None:
+    outcome = "error" if response is None else "ok"
+    llm_request_seconds.observe(
+        time.perf_counter() - started,
+        backend=backend,
+        response_model=getattr(response_model, "__name__", ""),
+        outcome=outcome,
+    )
+    # instructor keeps the raw completion on the parsed model.
+    usage = getattr(getattr(response, "_raw_response", None), "usage", None)
+    if usage is not None:
+        llm_tokens.inc(usage.prompt_tokens or 0, backend=backend, kind="prompt")
+        llm_tokens.inc(usage.completion_tokens or 0, backend=backend, kind="completion")
+
+
+def _completions(create):
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def _is_retryable(error: BaseException) -> bool:
+    # The request itself was rejected; sending it again cannot help.
+    return not isinstance(
+        error,
+        (
+            openai.BadRequestError,
+            openai.AuthenticationError,
+            openai.PermissionDeniedError,
+            openai.NotFoundError,
+        ),
+    )
+
+
+def instrument(client, backend: str):
+    """Wraps chat.completions.create with latency, token and span recording."""
+    create = client.chat.completions.create
+
+    def timed_create(**kwargs):
+        started, response = time.perf_counter(), None
+        try:
+            with Span("llm_call"):
+                response = create(**kwargs)
+            return response
+        finally:
+            _record(backend, kwargs.get("response_model"), started, response)
+
+    return _completions(timed_create)
+
+
+def instrument_async(client, backend: str):
+    create = client.chat.completions.create
+
+    async def timed_create(**kwargs):
+        started, response = time.perf_counter(), None
+        try:
+            with Span("llm_call"):
+                response = await create(**kwargs)
+            return response
+        finally:
+            _record(backend, kwargs.get("response_model"), started, response)
+
+    return _completions(timed_create)
+
+
+def guard(client, guarded_call: GuardedCall):
+    """Runs every create() under the deadline, retry policy and circuit breaker."""
+    create = client.chat.completions.create
+
+    def guarded_create(**kwargs):
+        return guarded_call.call(lambda remaining: create(**kwargs, timeout=remaining))
+
+    return _completions(guarded_create)
+
+
+def guard_async(client, guarded_call: GuardedCall):
+    create = client.chat.completions.create
+
+    async def guarded_create(**kwargs):
+        return await guarded_call.call_async(
+            lambda remaining: create(**kwargs, timeout=remaining)
+        )
+
+    return _completions(guarded_create)
+
 
+llm_breaker = CircuitBreaker(
+    "llm",
+    failure_threshold=LLM_BREAKER_FAILURE_THRESHOLD,
+    reset_seconds=LLM_BREAKER_RESET_SECONDS,
+)
+llm_guard = GuardedCall(
+    "llm",
+    RetryPolicy(
+        deadline_seconds=LLM_TIMEOUT_SECONDS,
+        attempt_timeout_seconds=LLM_ATTEMPT_TIMEOUT_SECONDS,
+        max_attempts=LLM_MAX_ATTEMPTS,
+        backoff_base_seconds=LLM_BACKOFF_BASE_MS / 1000,
+        backoff_max_seconds=LLM_BACKOFF_MAX_MS / 1000,
+        hedge_after_seconds=LLM_HEDGE_AFTER_MS / 1000 if LLM_HEDGE_AFTER_MS is not None else None,
+    ),
+    llm_breaker,
+    retry_on=_is_retryable,
+)
 
-client = instructor.from_openai(openai.OpenAI(api_key=OPENAI_API_KEY))
+_client, _async_client = build_clients(LLM_BACKEND)
+client = guard(instrument(_client, LLM_BACKEND), llm_guard)
+async_client = guard_async(instrument_async(_async_client, LLM_BACKEND), llm_guard)
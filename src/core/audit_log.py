@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.metrics import Counter, Gauge, Histogram
+from src.db.database import async_engine
+from src.db.repository.chat_audit_repository import ChatAuditRepository
+from src.settings import (
+    AUDIT_LOG_BATCH_SIZE,
+    AUDIT_LOG_ENABLED,
+    AUDIT_LOG_FLUSH_INTERVAL_MS,
+    AUDIT_LOG_PUT_TIMEOUT_MS,
+    AUDIT_LOG_QUEUE_SIZE,
+)
+
+
+logger = logging.getLogger(__name__)
+
+FLUSH_ROW_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+
+audit_log_queue_depth = Gauge(
+    "audit_log_queue_depth",
+    "Audit rows waiting for the background writer",
+    labelnames=("log",),
+)
+audit_log_rows = Counter(
+    "audit_log_rows_total",
+    "Audit rows by outcome: written, dropped when the queue stayed full, or failed to write",
+    labelnames=("log", "result"),
+)
+audit_log_flush_seconds = Histogram(
+    "audit_log_flush_seconds",
+    "Time to insert one batch of audit rows",
+    labelnames=("log",),
+)
+audit_log_flush_rows = Histogram(
+    "audit_log_flush_rows",
+    "Audit rows inserted per batch",
+    labelnames=("log",),
+    buckets=FLUSH_ROW_BUCKETS,
+)
+
+WriteRows = Callable[[List[dict]], Awaitable[None]]
+
+
+class AuditLog:
+    """Write-behind buffer that batch-inserts rows off the request path.
+
+    `record` only enqueues; a background task inserts everything queued
+    every `flush_interval` seconds, or as soon as `batch_size` rows are
+    waiting. When the bounded queue is full, callers wait up to
+    `put_timeout` for room (backpressure) and the row is dropped after that,
+    so a stalled database never stalls requests indefinitely. `close`
+    drains the queue. Lives on the worker's event loop; not thread-safe.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write: WriteRows,
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        put_timeout: float,
+    ):
+        self.name = name
+        self.write = write
+        self.max_queue_size = max(1, max_queue_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def record(self, row: dict) -> bool:
+        if self._task is None or self._closing:
+            audit_log_rows.inc(log=self.name, result="dropped")
+            return False
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(row), self.put_timeout)
+            except asyncio.TimeoutError:
+                audit_log_rows.inc(log=self.name, result="dropped")
+                return False
+        depth = self._queue.qsize()
+        audit_log_queue_depth.set(depth, log=self.name)
+        if depth >= self.batch_size:
+            self._wake.set()
+        return True
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._closing = True
+        self._wake.set()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._drain()
+            if self._closing:
+                return
+
+    async def _drain(self) -> None:
+        while not self._queue.empty():
+            count = min(self.batch_size, self._queue.qsize())
+            batch = [self._queue.get_nowait() for _ in range(count)]
+            audit_log_queue_depth.set(self._queue.qsize(), log=self.name)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[dict]) -> None:
+        started = time.perf_counter()
+        try:
+            await self.write(batch)
+        except Exception:
+            logger.exception("Writing %d %s audit rows failed", len(batch), self.name)
+            audit_log_rows.inc(len(batch), log=self.name, result="failed")
+            return
+        audit_log_flush_seconds.observe(time.perf_counter() - started, log=self.name)
+        audit_log_flush_rows.observe(len(batch), log=self.name)
+        audit_log_rows.inc(len(batch), log=self.name, result="written")
+
+
+async def _write_chat_rows(rows: List[dict]) -> None:
+    async with AsyncSession(async_engine) as session:
+        await session.run_sync(lambda sync_session: ChatAuditRepository(sync_session).insert_many(rows))
+
+
+chat_audit_log = (
+    AuditLog(
+        "chat",
+        _write_chat_rows,
+        max_queue_size=AUDIT_LOG_QUEUE_SIZE,
+        batch_size=AUDIT_LOG_BATCH_SIZE,
+        flush_interval=AUDIT_LOG_FLUSH_INTERVAL_MS / 1000,
+        put_timeout=AUDIT_LOG_PUT_TIMEOUT_MS / 1000,
+    )
+    if AUDIT_LOG_ENABLED
+    else None
+)
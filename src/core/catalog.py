@@ -0,0 +1,263 @@
+import threading
+import time
+from bisect import bisect_right
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import Row
+from sqlmodel import Session
+
+from src.core.intent_cache import invalidate_intent_cache
+from src.core.metrics import Counter
+from src.core.resolver import ProductResolver
+from src.core.text import fold
+from src.db.repository.catalog_state_repository import CatalogStateRepository
+from src.db.repository.inventory_event_repository import InventoryEventRepository
+from src.db.repository.product_alias_repository import ProductAliasRepository
+from src.db.repository.product_repository import ProductRepository
+from src.model.product import ProductResponse
+from src.settings import CATALOG_MAX_AGE_SECONDS, CATALOG_VERSION_CHECK_SECONDS
+
+# Beyond this many inventory events behind, reloading is cheaper than replaying.
+CATCH_UP_MAX_EVENTS = 1000
+
+catalog_requests = Counter(
+    "catalog_requests_total",
+    "Catalog snapshot lookups by whether they hit, revalidated, caught up or reloaded the snapshot",
+    labelnames=("result",),
+)
+
+
+class CatalogSnapshot:
+    """Point-in-time view of the products table with name, alias and SKU lookups.
+
+    `seq` is the last inventory event the snapshot reflects; it is read
+    before the products, so the snapshot is never older than it.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        seq: int,
+        products: List[ProductResponse],
+        aliases: Dict[int, Tuple[str, ...]],
+        resolver: ProductResolver,
+    ):
+        self.version = version
+        self.seq = seq
+        self.loaded_at = time.monotonic()
+        self.products: Tuple[ProductResponse, ...] = tuple(products)
+        self.ids = [p.id for p in self.products]
+        self.by_id: Dict[int, ProductResponse] = {p.id: p for p in self.products}
+        self.by_sku: Dict[str, ProductResponse] = {p.sku.casefold(): p for p in self.products}
+        self.active: Tuple[ProductResponse, ...] = tuple(p for p in self.products if p.is_active)
+        self.names: FrozenSet[str] = frozenset(p.name for p in self.active)
+        self.aliases: Dict[str, Tuple[str, ...]] = {
+            p.name: aliases.get(p.id, ()) for p in self.active
+        }
+        self.resolver = resolver
+        self._folded = [(fold(p.name), p) for p in self.active]
+
+    def get(self, product_id: int) -> Optional[ProductResponse]:
+        return self.by_id.get(product_id)
+
+    def page(self, skip: int = 0, limit: int = 100) -> List[ProductResponse]:
+        return list(self.products[skip : skip + limit])
+
+    def page_after(self, product_id: int, limit: int = 100) -> List[ProductResponse]:
+        start = bisect_right(self.ids, product_id)
+        return list(self.products[start : start + limit])
+
+    def available(self) -> List[ProductResponse]:
+        return [p for p in self.active if p.stock_quantity > 0]
+
+    def search(self, name: str) -> List[ProductResponse]:
+        needle = fold(name)
+        return [p for folded, p in self._folded if needle in folded]
+
+    def find(self, name: str) -> Optional[ProductResponse]:
+        match = self.resolver.resolve(name)
+        product = self.by_id.get(match.product_id) if match else None
+        return product if product is not None and product.is_active else None
+
+    def apply(self, events: List[Row]) -> bool:
+        """Applies logged stock and price changes in place.
+
+        Returns False, changing nothing, when an event adds, renames or
+        (de)activates a product: the lookups built from those need a reload.
+        """
+        for event in events:
+            product = self.by_id.get(event.product_id)
+            if product is None or (product.name, product.is_active) != (event.name, event.is_active):
+                return False
+        for event in events:
+            product = self.by_id[event.product_id]
+            product.stock_quantity = event.stock_quantity
+            product.price = event.price
+            product.updated_at = event.created_at
+        self.seq = events[-1].seq
+        return True
+
+
+class ProductCatalog:
+    """Process-local product snapshot shared by every request on this replica.
+
+    Writes bump `catalog_state.version` in the same transaction as the product
+    change. Readers compare that version at most once per `check_interval`
+    seconds and reload when it moved, so every replica converges without
+    per-request queries. Stock sold by other replicas does not bump the
+    version; `max_age` bounds how stale listed stock can get.
+    """
+
+    def __init__(self, check_interval: float = 1.0, max_age: float = 30.0):
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.resolver = ProductResolver()
+        self._resolver_entries: Dict[int, tuple] = {}
+
+    def get(self, session: Session, min_seq: int = 0) -> CatalogSnapshot:
+        """The shared snapshot; with `min_seq`, one reflecting at least that inventory event.
+
+        Catching up waits for a concurrent refresh, so only pass `min_seq`
+        outside AsyncSession.run_sync.
+        """
+        snapshot = self._get(session)
+        if snapshot.seq < min_seq:
+            snapshot = self._catch_up(session, min_seq)
+        return snapshot
+
+    def _get(self, session: Session) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and not self._is_due(snapshot):
+            catalog_requests.inc(result="hit")
+            return snapshot
+
+        # Never wait for another refresh: under AsyncSession.run_sync its
+        # queries may be parked on the event loop this thread is running.
+        if not self._lock.acquire(blocking=False):
+            if snapshot is None:
+                catalog_requests.inc(result="private")
+                return self._build_private(session)
+            catalog_requests.inc(result="hit")
+            return snapshot
+        try:
+            snapshot = self._snapshot
+            if snapshot is not None and not self._is_due(snapshot):
+                catalog_requests.inc(result="hit")
+                return snapshot
+            version = CatalogStateRepository(session).get_version()
+            if snapshot is None or version != snapshot.version or self._is_expired(snapshot):
+                catalog_requests.inc(result="reload")
+                snapshot = self._load(session, version)
+            else:
+                catalog_requests.inc(result="revalidated")
+            self._checked_at = time.monotonic()
+            return snapshot
+        finally:
+            self._lock.release()
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """The last loaded snapshot, without a version check; None before the first load."""
+        return self._snapshot
+
+    def _catch_up(self, session: Session, min_seq: int) -> CatalogSnapshot:
+        # Stock sold on other replicas does not bump the catalog version, but
+        # it is in inventory_events: replay those rows rather than reload.
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.seq >= min_seq:
+                return snapshot
+            if snapshot is not None:
+                events = InventoryEventRepository(session)
+                first, _ = events.get_seq_range()
+                if first is not None and first <= snapshot.seq + 1:
+                    rows = events.get_after(snapshot.seq, CATCH_UP_MAX_EVENTS)
+                    if rows and rows[-1].seq >= min_seq and snapshot.apply(rows):
+                        catalog_requests.inc(result="caught_up")
+                        return snapshot
+            catalog_requests.inc(result="reload")
+            snapshot = self._load(session, CatalogStateRepository(session).get_version())
+            self._checked_at = time.monotonic()
+            return snapshot
+
+    def _is_due(self, snapshot: CatalogSnapshot) -> bool:
+        return (
+            time.monotonic() - self._checked_at >= self.check_interval
+            or self._is_expired(snapshot)
+        )
+
+    def _is_expired(self, snapshot: CatalogSnapshot) -> bool:
+        return time.monotonic() - snapshot.loaded_at >= self.max_age
+
+    def _load(self, session: Session, version: int) -> CatalogSnapshot:
+        seq = self._last_seq(session)
+        products = ProductRepository(session).get_catalog()
+        aliases = ProductAliasRepository(session).get_all()
+        snapshot = CatalogSnapshot(
+            version,
+            seq,
+            [ProductResponse.model_validate(p) for p in products],
+            aliases,
+            self.resolver,
+        )
+        self._sync_resolver(snapshot, aliases)
+        previous, self._snapshot = self._snapshot, snapshot
+        # Cached intents name products, so they go stale with the catalog.
+        if previous is not None and previous.aliases != snapshot.aliases:
+            invalidate_intent_cache()
+        return snapshot
+
+    def _build_private(self, session: Session) -> CatalogSnapshot:
+        # Cold start while another caller loads: a throwaway snapshot with its
+        # own resolver, so the shared index is only ever touched under the lock.
+        version = CatalogStateRepository(session).get_version()
+        seq = self._last_seq(session)
+        products = ProductRepository(session).get_catalog()
+        aliases = ProductAliasRepository(session).get_all()
+        resolver = ProductResolver()
+        snapshot = CatalogSnapshot(
+            version,
+            seq,
+            [ProductResponse.model_validate(p) for p in products],
+            aliases,
+            resolver,
+        )
+        for p in snapshot.active:
+            resolver.add(p.id, p.name, p.sku, aliases.get(p.id, ()))
+        return snapshot
+
+    def _last_seq(self, session: Session) -> int:
+        last = InventoryEventRepository(session).get_last()
+        return last.seq if last is not None else 0
+
+    def _sync_resolver(
+        self, snapshot: CatalogSnapshot, aliases: Dict[int, Tuple[str, ...]]
+    ) -> None:
+        # Only products whose name, SKU or aliases changed are re-indexed.
+        entries = {
+            p.id: (p.name, p.sku, aliases.get(p.id, ())) for p in snapshot.active
+        }
+        for product_id in self._resolver_entries.keys() - entries.keys():
+            self.resolver.remove(product_id)
+        for product_id, entry in entries.items():
+            if self._resolver_entries.get(product_id) != entry:
+                self.resolver.add(product_id, *entry)
+        self._resolver_entries = entries
+
+    def invalidate(self) -> None:
+        # Force a version check on the next read; used right after local writes.
+        self._checked_at = 0.0
+
+    def update_stock(self, product_id: int, stock_quantity: int) -> None:
+        # Keeps listings on this replica exact after local sales without a reload.
+        snapshot = self._snapshot
+        product = snapshot.get(product_id) if snapshot is not None else None
+        if product is not None:
+            product.stock_quantity = stock_quantity
+
+
+catalog = ProductCatalog(
+    check_interval=CATALOG_VERSION_CHECK_SECONDS, max_age=CATALOG_MAX_AGE_SECONDS
+)
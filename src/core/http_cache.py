@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Mapping, NamedTuple, Optional
+
+
+class CacheValidator(NamedTuple):
+    """Strong ETag and Last-Modified for a representation at one version."""
+
+    version: int
+    last_modified: Optional[datetime]
+    cache_control: str
+
+    @property
+    def etag(self) -> str:
+        return f'"v{self.version}"'
+
+    def matches(self, headers: Mapping[str, str]) -> bool:
+        """True when the request's conditional headers say the client is current."""
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-None-Match wins over If-Modified-Since, and compares weakly.
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return self.etag in tags
+        if_modified_since = headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return self._last_modified_utc().replace(microsecond=0) <= since
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        last_modified = self._last_modified_utc()
+        # HTTP dates only have seconds: until this one is over, another write
+        # could land in it under the same date, so only the ETag is sent.
+        if last_modified is not None and (
+            datetime.now(timezone.utc).replace(microsecond=0)
+            > last_modified.replace(microsecond=0)
+        ):
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        return headers
+
+    def _last_modified_utc(self) -> Optional[datetime]:
+        # Timestamps are stored naive, in local time.
+        if self.last_modified is None:
+            return None
+        return self.last_modified.astimezone(timezone.utc)
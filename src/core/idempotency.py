@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, NamedTuple, Tuple
+
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.metrics import Counter
+from src.db.repository.idempotency_repository import IdempotencyRepository
+from src.model.idempotency import IdempotencyStatus
+from src.settings import (
+    IDEMPOTENCY_LOCK_SECONDS,
+    IDEMPOTENCY_POLL_SECONDS,
+    IDEMPOTENCY_TTL_SECONDS,
+    IDEMPOTENCY_WAIT_SECONDS,
+)
+
+
+idempotency_requests = Counter(
+    "idempotency_requests_total",
+    "Requests carrying an Idempotency-Key by outcome",
+    labelnames=("scope", "result"),
+)
+
+Handler = Callable[[], Tuple[int, dict]]
+AsyncHandler = Callable[[], Awaitable[Tuple[int, dict]]]
+
+
+class IdempotencyKeyReused(ValueError):
+    pass
+
+
+class IdempotencyInProgress(RuntimeError):
+    pass
+
+
+class StoredResponse(NamedTuple):
+    status_code: int
+    body: dict
+    replayed: bool
+
+
+_OWNED = object()
+
+
+def fingerprint(payload: dict) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """Runs a handler at most once per (scope, key) and replays its response.
+
+    The first request claims the key with an insert; duplicates that arrive
+    while it runs poll the row until the response is stored, on any replica.
+    Keys are released when the handler raises, so a retry can run it again.
+    In-progress claims expire after `lock_seconds` in case their owner died.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        lock_seconds: float,
+        wait_seconds: float,
+        poll_seconds: float,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+
+    def execute(
+        self, session: Session, scope: str, key: str, request_hash: str, handler: Handler
+    ) -> StoredResponse:
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            state = self._acquire(session, scope, key, request_hash)
+            if state is _OWNED:
+                break
+            if state is not None:
+                return state
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgress(key)
+            time.sleep(self.poll_seconds)
+
+        try:
+            status_code, body = handler()
+        except BaseException:
+            session.rollback()
+            IdempotencyRepository(session).release(scope, key)
+            raise
+        self._complete(session, scope, key, status_code, body)
+        return StoredResponse(status_code, body, replayed=False)
+
+    async def execute_async(
+        self,
+        session: AsyncSession,
+        scope: str,
+        key: str,
+        request_hash: str,
+        handler: AsyncHandler,
+    ) -> StoredResponse:
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            state = await session.run_sync(self._acquire, scope, key, request_hash)
+            if state is _OWNED:
+                break
+            if state is not None:
+                return state
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgress(key)
+            await asyncio.sleep(self.poll_seconds)
+
+        try:
+            status_code, body = await handler()
+        except BaseException:
+            await session.rollback()
+            await session.run_sync(
+                lambda sync_session: IdempotencyRepository(sync_session).release(scope, key)
+            )
+            raise
+        await session.run_sync(self._complete, scope, key, status_code, body)
+        return StoredResponse(status_code, body, replayed=False)
+
+    def sweep(self, session: Session) -> int:
+        return IdempotencyRepository(session).delete_expired()
+
+    def _acquire(self, session: Session, scope: str, key: str, request_hash: str):
+        # _OWNED when this request runs the handler, the stored response when
+        # a previous one finished, None while another request is running it.
+        repo = IdempotencyRepository(session)
+        expires_at = datetime.now() + timedelta(seconds=self.lock_seconds)
+        if repo.claim(scope, key, request_hash, expires_at):
+            idempotency_requests.inc(scope=scope, result="executed")
+            return _OWNED
+
+        record = repo.get(scope, key)
+        if record is None:
+            return None
+        if record.fingerprint != request_hash:
+            idempotency_requests.inc(scope=scope, result="reused")
+            raise IdempotencyKeyReused(key)
+        if record.status != IdempotencyStatus.COMPLETED:
+            return None
+        idempotency_requests.inc(scope=scope, result="replayed")
+        return StoredResponse(record.status_code, json.loads(record.response), replayed=True)
+
+    def _complete(
+        self, session: Session, scope: str, key: str, status_code: int, body: dict
+    ) -> None:
+        expires_at = datetime.now() + timedelta(seconds=self.ttl_seconds)
+        IdempotencyRepository(session).complete(
+            scope, key, status_code, json.dumps(body), expires_at
+        )
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=IDEMPOTENCY_TTL_SECONDS,
+    lock_seconds=IDEMPOTENCY_LOCK_SECONDS,
+    wait_seconds=IDEMPOTENCY_WAIT_SECONDS,
+    poll_seconds=IDEMPOTENCY_POLL_SECONDS,
+)
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+from src.core.metrics import Histogram
+from src.model.purchase import PurchaseIntent
+
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+intent_batch_size = Histogram(
+    "intent_batch_size",
+    "Messages sent to the LLM per batched call",
+    buckets=BATCH_SIZE_BUCKETS,
+)
+intent_batch_wait_seconds = Histogram(
+    "intent_batch_wait_seconds",
+    "Time a message waited in the batching window before its call was sent",
+)
+
+SendBatch = Callable[[List[str]], Awaitable[List[PurchaseIntent]]]
+
+
+class IntentBatcher:
+    """Coalesces concurrent LLM intent requests into one call per window.
+
+    Messages wait at most `window_seconds` (or until `max_batch_size` are
+    queued), then `send` parses them together and each caller gets back the
+    intent for its own message. A failed call fails every message in the
+    batch, so callers keep their usual fallback. Lives on the worker's event
+    loop; it is not thread-safe.
+    """
+
+    def __init__(self, send: SendBatch, window_seconds: float, max_batch_size: int):
+        self.send = send
+        self.window_seconds = window_seconds
+        self.max_batch_size = max(1, max_batch_size)
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    async def parse(self, message: str) -> PurchaseIntent:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((message, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        sent_at = time.perf_counter()
+        intent_batch_size.observe(len(batch))
+        for _, _, queued_at in batch:
+            intent_batch_wait_seconds.observe(sent_at - queued_at)
+
+        try:
+            intents = await self.send([message for message, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), intent in zip(batch, intents):
+            if not future.done():
+                future.set_result(intent)
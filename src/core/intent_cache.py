@@ -0,0 +1,176 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from src.core.metrics import Counter
+from src.core.text import normalize_message
+from src.model.purchase import PurchaseIntent
+from src.settings import (
+    INTENT_CACHE_BACKEND,
+    INTENT_CACHE_MAX_SIZE,
+    INTENT_CACHE_PATH,
+    INTENT_CACHE_TTL_SECONDS,
+)
+
+
+intent_cache_requests = Counter(
+    "intent_cache_requests_total",
+    "Intent cache lookups by result",
+    labelnames=("backend", "result"),
+)
+intent_cache_evictions = Counter(
+    "intent_cache_evictions_total",
+    "Intent cache entries evicted by reason",
+    labelnames=("backend", "reason"),
+)
+
+
+class MemoryIntentCache:
+    """Per-process LRU cache with a TTL, keyed on the normalized message."""
+
+    backend = "memory"
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, message: str) -> Optional[PurchaseIntent]:
+        key = normalize_message(message)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                intent_cache_evictions.inc(backend=self.backend, reason="ttl")
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            intent_cache_requests.inc(backend=self.backend, result="miss")
+            return None
+        intent_cache_requests.inc(backend=self.backend, result="hit")
+        return PurchaseIntent.model_validate_json(entry[1])
+
+    def set(self, message: str, intent: PurchaseIntent) -> None:
+        key = normalize_message(message)
+        value = intent.model_dump_json()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                intent_cache_evictions.inc(backend=self.backend, reason="lru")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteIntentCache:
+    """LRU/TTL cache stored in a SQLite file shared by every replica on the host."""
+
+    backend = "sqlite"
+
+    def __init__(self, path: str, max_size: int, ttl_seconds: float):
+        self.path = path
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS intent_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_intent_cache_last_access "
+                "ON intent_cache (last_access)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, message: str) -> Optional[PurchaseIntent]:
+        key = normalize_message(message)
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, created_at FROM intent_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None and now - row[1] > self.ttl_seconds:
+            conn.execute("DELETE FROM intent_cache WHERE key = ?", (key,))
+            intent_cache_evictions.inc(backend=self.backend, reason="ttl")
+            row = None
+        if row is None:
+            intent_cache_requests.inc(backend=self.backend, result="miss")
+            return None
+        conn.execute(
+            "UPDATE intent_cache SET last_access = ? WHERE key = ?", (now, key)
+        )
+        intent_cache_requests.inc(backend=self.backend, result="hit")
+        return PurchaseIntent.model_validate_json(row[0])
+
+    def set(self, message: str, intent: PurchaseIntent) -> None:
+        key = normalize_message(message)
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO intent_cache (key, value, created_at, last_access) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+            "value = excluded.value, created_at = excluded.created_at, "
+            "last_access = excluded.last_access",
+            (key, intent.model_dump_json(), now, now),
+        )
+        evicted = conn.execute(
+            "DELETE FROM intent_cache WHERE key IN ("
+            "SELECT key FROM intent_cache ORDER BY last_access "
+            "LIMIT max(0, (SELECT COUNT(*) FROM intent_cache) - ?))",
+            (self.max_size,),
+        ).rowcount
+        if evicted > 0:
+            intent_cache_evictions.inc(evicted, backend=self.backend, reason="lru")
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM intent_cache")
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM intent_cache").fetchone()[0]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_intent_cache():
+    global _cache
+    if _cache is None and INTENT_CACHE_BACKEND != "none":
+        with _cache_lock:
+            if _cache is None:
+                if INTENT_CACHE_BACKEND == "sqlite":
+                    _cache = SQLiteIntentCache(
+                        INTENT_CACHE_PATH, INTENT_CACHE_MAX_SIZE, INTENT_CACHE_TTL_SECONDS
+                    )
+                else:
+                    _cache = MemoryIntentCache(
+                        INTENT_CACHE_MAX_SIZE, INTENT_CACHE_TTL_SECONDS
+                    )
+    return _cache
+
+
+def invalidate_intent_cache() -> None:
+    cache = get_intent_cache()
+    if cache is not None:
+        cache.clear()
@@ -0,0 +1,255 @@
+import difflib
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from src.core.text import parse_number, singularize, tokenize
+from src.model.purchase import LineItem, PurchaseIntent, UserIntent
+
+
+FILLER_WORDS = {
+    "i", "im", "id", "ill", "me", "my", "us", "we", "please", "pls", "plz", "just",
+    "the", "some", "of", "for", "to", "can", "could", "would", "may", "you",
+    "thanks", "thank", "ok", "okay", "um", "uh", "hey", "hi", "hello", "now",
+    "cans", "bottle", "bottles", "soda", "sodas", "drink", "drinks", "x",
+}
+BUY_WORDS = {
+    "buy", "want", "wanna", "give", "gimme", "get", "take", "need", "purchase",
+    "order", "like", "grab", "ll",
+}
+STOCK_WORDS = {
+    "how", "many", "much", "left", "stock", "remaining", "available", "inventory",
+    "there", "are", "is", "any", "in", "still", "do", "you", "have", "got", "a", "an",
+}
+STOCK_TRIGGERS = {"left", "stock", "remaining", "inventory"}
+LIST_WORDS = {
+    "what", "whats", "which", "do", "you", "have", "got", "sell", "offer",
+    "available", "in", "stock", "is", "are", "there", "today", "all", "products",
+    "your", "s", "on", "menu", "list", "options", "selection", "kind", "kinds", "sort",
+    "flavors", "flavours",
+}
+LIST_VERBS = {"have", "got", "sell", "offer", "available", "stock"}
+LIST_TRIGGERS = {"menu", "list", "options", "selection", "flavors", "flavours"}
+GREETING_WORDS = {"hello", "hi", "hey", "hola", "oi", "good", "morning", "afternoon", "evening"}
+JOIN_WORDS = {"and", "plus"}
+NEGATION_WORDS = {"not", "no", "dont", "without", "cancel", "never", "instead", "but"}
+
+FUZZY_MIN_LENGTH = 4
+FUZZY_CUTOFF = 0.8
+
+
+class _ProductIndex:
+    def __init__(
+        self,
+        product_names: Tuple[str, ...],
+        aliases: Mapping[str, Sequence[str]],
+    ):
+        self.phrases: Dict[Tuple[str, ...], str] = {}
+        for name in product_names:
+            for phrase in [name, *aliases.get(name, ())]:
+                tokens = tuple(singularize(t) for t in tokenize(phrase))
+                if tokens:
+                    self.phrases.setdefault(tokens, name)
+        self.max_length = max((len(p) for p in self.phrases), default=0)
+        self.single_tokens = [p[0] for p in self.phrases if len(p) == 1]
+
+    def match(self, tokens: List[str], start: int) -> Optional[Tuple[str, int]]:
+        for length in range(min(self.max_length, len(tokens) - start), 0, -1):
+            phrase = tuple(singularize(t) for t in tokens[start : start + length])
+            name = self.phrases.get(phrase)
+            if name:
+                return name, length
+        return None
+
+    def fuzzy_match(self, token: str) -> Optional[str]:
+        if len(token) < FUZZY_MIN_LENGTH:
+            return None
+        candidates = difflib.get_close_matches(
+            singularize(token), self.single_tokens, n=1, cutoff=FUZZY_CUTOFF
+        )
+        return self.phrases[(candidates[0],)] if candidates else None
+
+
+class FastIntentParser:
+    """Rule-based parser that resolves unambiguous messages without the LLM.
+
+    `parse` returns None whenever a message contains anything it does not fully
+    understand, so the caller can fall back to the model.
+    """
+
+    def __init__(self, min_confidence: float = 0.85):
+        self.min_confidence = min_confidence
+        self._index: Optional[_ProductIndex] = None
+        self._index_key: tuple = ()
+        self._index_sources: tuple = (None, None)
+        self._lock = threading.Lock()
+
+    def _get_index(
+        self, product_names: Iterable[str], aliases: Mapping[str, Sequence[str]]
+    ) -> _ProductIndex:
+        index = self._index
+        # Catalog snapshots hand us the same objects until they reload.
+        if index is not None and self._index_sources == (product_names, aliases):
+            return index
+        with self._lock:
+            names = tuple(sorted(product_names))
+            key = (names, tuple((name, tuple(aliases.get(name, ()))) for name in names))
+            if self._index is None or key != self._index_key:
+                self._index, self._index_key = _ProductIndex(names, aliases), key
+            self._index_sources = (product_names, aliases)
+            return self._index
+
+    def parse(
+        self,
+        message: str,
+        product_names: Iterable[str],
+        aliases: Optional[Mapping[str, Sequence[str]]] = None,
+    ) -> Optional[PurchaseIntent]:
+        tokens = tokenize(message)
+        if not tokens or any(t in NEGATION_WORDS for t in tokens):
+            return None
+
+        if all(t in GREETING_WORDS for t in tokens):
+            return self._accept(UserIntent.UNKNOWN, confidence=0.9)
+
+        index = self._get_index(product_names, aliases or {})
+        products: List[str] = []
+        words: List[str] = []
+        # The words before each product, then the words after the last one.
+        segments: List[List[str]] = [[]]
+        fuzzy = False
+        position = 0
+        while position < len(tokens):
+            matched = index.match(tokens, position)
+            if matched:
+                products.append(matched[0])
+                segments.append([])
+                position += matched[1]
+                continue
+            token = tokens[position]
+            if not self._is_known_word(token):
+                name = index.fuzzy_match(token)
+                if name is None:
+                    return None
+                products.append(name)
+                segments.append([])
+                fuzzy = True
+            else:
+                words.append(token)
+                segments[-1].append(token)
+            position += 1
+
+        if len(products) > 1:
+            return self._parse_basket(products, segments, fuzzy)
+
+        word_set = set(words)
+        if not products:
+            return self._parse_list(word_set)
+
+        product_name = products[0]
+        confidence = 0.85 if fuzzy else 0.95
+
+        if self._is_stock_question(word_set):
+            if word_set <= FILLER_WORDS | STOCK_WORDS:
+                return self._accept(
+                    UserIntent.CHECK_STOCK, product_name, confidence=confidence
+                )
+            return None
+
+        if not word_set <= FILLER_WORDS | BUY_WORDS | {"a", "an"} | self._numbers(words):
+            return None
+
+        quantity = self._quantity(words, has_buy_word=bool(word_set & BUY_WORDS))
+        if quantity is None:
+            return None
+        return self._accept(
+            UserIntent.PURCHASE, product_name, quantity[0], confidence * quantity[1]
+        )
+
+    def _parse_basket(
+        self, products: List[str], segments: List[List[str]], fuzzy: bool
+    ) -> Optional[PurchaseIntent]:
+        # "two cokes and a sprite": every product takes the quantity right
+        # before it; anything after the last product must be filler.
+        words = [word for segment in segments for word in segment]
+        word_set = set(words)
+        if self._is_stock_question(word_set) or self._numbers(segments[-1]):
+            return None
+        allowed = FILLER_WORDS | BUY_WORDS | JOIN_WORDS | {"a", "an"} | self._numbers(words)
+        if not word_set <= allowed:
+            return None
+
+        has_buy_word = bool(word_set & BUY_WORDS)
+        confidence = 0.85 if fuzzy else 0.95
+        quantities: Dict[str, int] = {}
+        for product_name, segment in zip(products, segments):
+            quantity = self._quantity(segment, has_buy_word)
+            if quantity is None:
+                return None
+            quantities[product_name] = quantities.get(product_name, 0) + quantity[0]
+            confidence *= quantity[1]
+
+        items = [LineItem(product_name=name, quantity=q) for name, q in quantities.items()]
+        if len(items) == 1:
+            return self._accept(
+                UserIntent.PURCHASE, items[0].product_name, items[0].quantity, confidence
+            )
+        return self._accept(UserIntent.PURCHASE, confidence=confidence, items=items)
+
+    def _parse_list(self, words: set) -> Optional[PurchaseIntent]:
+        if not words <= FILLER_WORDS | LIST_WORDS:
+            return None
+        asks_what = bool(words & {"what", "whats", "which"}) and bool(words & LIST_VERBS)
+        if asks_what or words & LIST_TRIGGERS:
+            return self._accept(UserIntent.LIST_PRODUCTS, confidence=0.95)
+        return None
+
+    def _is_known_word(self, token: str) -> bool:
+        return (
+            token in FILLER_WORDS
+            or token in BUY_WORDS
+            or token in STOCK_WORDS
+            or token in LIST_WORDS
+            or token in JOIN_WORDS
+            or parse_number(token) is not None
+        )
+
+    @staticmethod
+    def _is_stock_question(words: set) -> bool:
+        return bool(words & STOCK_TRIGGERS) or {"how", "many"} <= words
+
+    @staticmethod
+    def _numbers(words: List[str]) -> set:
+        return {w for w in words if parse_number(w) is not None}
+
+    @staticmethod
+    def _quantity(words: List[str], has_buy_word: bool) -> Optional[Tuple[int, float]]:
+        explicit = {parse_number(w) for w in words if w not in ("a", "an")}
+        explicit.discard(None)
+        if len(explicit) > 1:
+            return None
+        if explicit:
+            quantity = explicit.pop()
+            return (quantity, 1.0) if quantity > 0 else None
+        if "a" in words or "an" in words:
+            return 1, 1.0
+        if has_buy_word:
+            return 1, 0.95
+        return None
+
+    def _accept(
+        self,
+        intent: UserIntent,
+        product_name: Optional[str] = None,
+        quantity: Optional[int] = None,
+        confidence: float = 0.95,
+        items: Optional[List[LineItem]] = None,
+    ) -> Optional[PurchaseIntent]:
+        if confidence < self.min_confidence:
+            return None
+        return PurchaseIntent(
+            intent=intent,
+            product_name=product_name,
+            quantity=quantity,
+            confidence=round(confidence, 3),
+            items=items or [],
+        )
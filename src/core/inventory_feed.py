@@ -0,0 +1,253 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import suppress
+from decimal import Decimal
+from typing import AsyncIterator, List, Optional, Set, Tuple
+
+from sqlalchemy import Row
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.metrics import Counter, Gauge
+from src.db.database import async_engine
+from src.db.repository.inventory_event_repository import InventoryEventRepository
+from src.db.repository.product_repository import ProductRepository
+from src.settings import (
+    INVENTORY_FEED_HEARTBEAT_SECONDS,
+    INVENTORY_FEED_POLL_MS,
+    INVENTORY_FEED_QUEUE_SIZE,
+    INVENTORY_FEED_RETAIN_EVENTS,
+)
+
+
+logger = logging.getLogger(__name__)
+
+REPLAY_BATCH_SIZE = 500
+PRUNE_INTERVAL_SECONDS = 60.0
+
+inventory_feed_subscribers = Gauge(
+    "inventory_feed_subscribers",
+    "Open inventory feed streams on this worker",
+)
+inventory_feed_messages = Counter(
+    "inventory_feed_messages_total",
+    "Inventory feed messages sent: live from the poller, replayed on resume, or snapshots",
+    labelnames=("kind",),
+)
+inventory_feed_resyncs = Counter(
+    "inventory_feed_resyncs_total",
+    "Streams that fell a whole queue behind and caught up from inventory_events",
+)
+
+# (seq, encoded server-sent event)
+Message = Tuple[int, str]
+
+
+def encode_event(event: str, seq: int, data: dict) -> str:
+    return f"id: {seq}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def _product_state(
+    product_id: int, name: str, stock_quantity: int, price: Decimal, is_active: bool
+) -> dict:
+    # Prices as strings, like the product endpoints return them.
+    return {
+        "product_id": product_id,
+        "name": name,
+        "stock_quantity": stock_quantity,
+        "price": str(price),
+        "is_active": is_active,
+    }
+
+
+def _product_event(row: Row) -> Message:
+    data = {
+        "seq": row.seq,
+        **_product_state(
+            row.product_id, row.name, row.stock_quantity, row.price, row.is_active
+        ),
+    }
+    return row.seq, encode_event("product", row.seq, data)
+
+
+class _Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Set when the queue overflowed: the stream stops receiving live
+        # events and catches up from the table once it has drained the queue.
+        self.lagging = False
+        self.closed = False
+
+
+class InventoryFeed:
+    """Fans product changes out to this worker's server-sent event streams.
+
+    Product writes append to inventory_events in their own transaction, so
+    the table is both the bridge between replicas and the log clients resume
+    from. One task per worker polls it every `poll_interval` seconds and
+    hands each new row, encoded once, to every subscriber's bounded queue.
+    Lives on the worker's event loop; not thread-safe.
+    """
+
+    def __init__(
+        self, poll_interval: float, retain: int, queue_size: int, heartbeat: float
+    ):
+        self.poll_interval = poll_interval
+        self.retain = max(1, retain)
+        self.queue_size = max(1, queue_size)
+        self.heartbeat = heartbeat
+        self.last_seq = 0
+        self._subscribers: Set[_Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        # Start at the newest event. Streams subscribe before they replay
+        # older events, so nothing falls between the two.
+        async with AsyncSession(async_engine) as session:
+            self.last_seq = await session.run_sync(
+                lambda sync_session: InventoryEventRepository(sync_session).get_seq_range()[1]
+            )
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        # Ends the open streams too, so shutdown does not wait on them.
+        for subscriber in self._subscribers:
+            subscriber.closed = True
+            with suppress(asyncio.QueueFull):
+                subscriber.queue.put_nowait(None)
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def poll(self) -> int:
+        """Publishes the events committed since the last poll; returns how many."""
+        published = 0
+        while True:
+            async with AsyncSession(async_engine) as session:
+                rows = await session.run_sync(self._read_new)
+            for row in rows:
+                self._publish(_product_event(row))
+            published += len(rows)
+            if len(rows) < REPLAY_BATCH_SIZE:
+                return published
+
+    async def stream(self, since: Optional[int]) -> AsyncIterator[str]:
+        """Events after `since`, then live ones until the feed closes.
+
+        Without `since`, or when its successors were already pruned, the
+        stream starts with a snapshot of every product instead.
+        """
+        subscriber = _Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        inventory_feed_subscribers.set(len(self._subscribers))
+        try:
+            # Subscribed first, so whatever the replay misses is queued; the
+            # seq check drops what it sent twice.
+            last_sent = since or 0
+            async for seq, message, kind in self._replay(since):
+                inventory_feed_messages.inc(kind=kind)
+                last_sent = seq
+                yield message
+            while not subscriber.closed:
+                if subscriber.lagging and subscriber.queue.empty():
+                    inventory_feed_resyncs.inc()
+                    subscriber.lagging = False
+                    async for seq, message, kind in self._replay(last_sent):
+                        inventory_feed_messages.inc(kind=kind)
+                        last_sent = seq
+                        yield message
+                    continue
+                try:
+                    item = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:
+                    return
+                seq, message = item
+                if seq > last_sent:
+                    inventory_feed_messages.inc(kind="live")
+                    last_sent = seq
+                    yield message
+        finally:
+            self._subscribers.discard(subscriber)
+            inventory_feed_subscribers.set(len(self._subscribers))
+
+    async def _run(self) -> None:
+        pruned_at = time.monotonic()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll()
+                if time.monotonic() - pruned_at >= PRUNE_INTERVAL_SECONDS:
+                    pruned_at = time.monotonic()
+                    async with AsyncSession(async_engine) as session:
+                        await session.run_sync(
+                            lambda sync_session: InventoryEventRepository(sync_session).prune(
+                                self.retain
+                            )
+                        )
+            except Exception:
+                logger.exception("Inventory feed poll failed")
+
+    def _read_new(self, session: Session) -> List[Row]:
+        rows = InventoryEventRepository(session).get_after(self.last_seq, REPLAY_BATCH_SIZE)
+        if rows:
+            self.last_seq = rows[-1].seq
+        return rows
+
+    def _publish(self, message: Message) -> None:
+        for subscriber in self._subscribers:
+            if subscriber.lagging:
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscriber.lagging = True
+
+    async def _replay(self, since: Optional[int]) -> AsyncIterator[Tuple[int, str, str]]:
+        # One short session per batch: a slow client must not pin a connection.
+        while True:
+            async with AsyncSession(async_engine) as session:
+                messages, done = await session.run_sync(self._read_replay, since)
+            for message in messages:
+                yield message
+            if done:
+                return
+            since = messages[-1][0]
+
+    def _read_replay(
+        self, session: Session, since: Optional[int]
+    ) -> Tuple[List[Tuple[int, str, str]], bool]:
+        repository = InventoryEventRepository(session)
+        messages = []
+        first, last = repository.get_seq_range()
+        if since is None or since > last or (first is not None and since < first - 1):
+            # Seq before products: events after it are replayed on top and
+            # carry whole values, so a write landing between the two reads
+            # still converges.
+            since = last
+            products = ProductRepository(session).get_catalog()
+            data = {
+                "seq": since,
+                "products": [
+                    _product_state(p.id, p.name, p.stock_quantity, p.price, p.is_active)
+                    for p in products
+                ],
+            }
+            messages.append((since, encode_event("snapshot", since, data), "snapshot"))
+        rows = repository.get_after(since, REPLAY_BATCH_SIZE)
+        messages.extend((*_product_event(row), "replayed") for row in rows)
+        return messages, len(rows) < REPLAY_BATCH_SIZE
+
+
+inventory_feed = InventoryFeed(
+    poll_interval=INVENTORY_FEED_POLL_MS / 1000,
+    retain=INVENTORY_FEED_RETAIN_EVENTS,
+    queue_size=INVENTORY_FEED_QUEUE_SIZE,
+    heartbeat=INVENTORY_FEED_HEARTBEAT_SECONDS,
+)
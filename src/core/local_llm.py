@@ -0,0 +1,134 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from src.core.intent_parser import FastIntentParser
+from src.model.purchase import PurchaseIntent, UserIntent
+
+
+# The "- Name: [aliases]" lines the prompt builder lists the catalog with.
+PRODUCT_LINE = re.compile(r"^- ([^:\n]+): (\[.*\])$", re.MULTILINE)
+BATCH_LINE = re.compile(r"^\[(\d+)\] (.*)$", re.MULTILINE)
+
+intent_parser = FastIntentParser(min_confidence=0.0)
+
+
+class LocalModelError(RuntimeError):
+    pass
+
+
+def catalog_from_prompt(prompt: str) -> Tuple[frozenset, Dict[str, Tuple[str, ...]]]:
+    aliases = {}
+    for name, alias_list in PRODUCT_LINE.findall(prompt):
+        try:
+            aliases[name] = tuple(json.loads(alias_list))
+        except ValueError:
+            aliases[name] = ()
+    return frozenset(aliases), aliases
+
+
+def parse(message: str, names: frozenset, aliases: dict) -> PurchaseIntent:
+    intent = intent_parser.parse(message, names, aliases)
+    if intent is None:
+        return PurchaseIntent(
+            intent=UserIntent.UNKNOWN, product_name=None, quantity=None, confidence=0.3
+        )
+    return intent
+
+
+def tool_arguments(tool: str, messages: List[dict]) -> dict:
+    """Arguments a model would return for `tool`, read off the chat messages."""
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    names, aliases = catalog_from_prompt(system)
+    if tool == "IntentBatch":
+        return {
+            "intents": [
+                {**parse(text, names, aliases).model_dump(mode="json"), "message_index": int(i)}
+                for i, text in BATCH_LINE.findall(user)
+            ]
+        }
+    return parse(user, names, aliases).model_dump(mode="json")
+
+
+class LocalIntentModel:
+    """Deterministic stand-in for the chat model, with injectable latency.
+
+    Answers the same structured requests as the instructor client, using the
+    rule-based parser over the catalog listed in the system prompt, so the
+    app runs offline and its own overhead can be measured without the
+    model's. Each call waits `latency_ms` +/- `jitter_ms` and fails with
+    probability `error_rate`; a fixed `seed` makes the sequence repeatable.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self) -> Tuple[float, bool]:
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            failed = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return max(0.0, self.latency_ms + jitter) / 1000, failed
+
+    def _respond(self, response_model: Type[BaseModel], messages: List[dict], failed: bool):
+        if failed:
+            raise LocalModelError("Injected failure")
+        return response_model.model_validate(
+            tool_arguments(response_model.__name__, messages)
+        )
+
+    def create(
+        self,
+        response_model: Type[BaseModel],
+        messages: List[dict],
+        timeout: Optional[float] = None,
+        **kwargs,
+    ):
+        delay, failed = self._draw()
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("Local model timed out")
+        if delay:
+            time.sleep(delay)
+        return self._respond(response_model, messages, failed)
+
+    async def create_async(
+        self,
+        response_model: Type[BaseModel],
+        messages: List[dict],
+        timeout: Optional[float] = None,
+        **kwargs,
+    ):
+        delay, failed = self._draw()
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError("Local model timed out")
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(response_model, messages, failed)
+
+    def client(self):
+        """Sync client exposing the `chat.completions.create` call we use."""
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self.create)))
+
+    def async_client(self):
+        return SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=self.create_async))
+        )
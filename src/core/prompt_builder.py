@@ -0,0 +1,108 @@
+import json
+import logging
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.core.catalog import CatalogSnapshot
+from src.core.metrics import Histogram
+from src.core.prompts import (
+    BATCH_INSTRUCTIONS,
+    CANDIDATES_HEADER,
+    CATALOG_HEADER,
+    PURCHASE_INSTRUCTIONS,
+)
+
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUCKETS = (100, 250, 500, 750, 1000, 1500, 2500, 5000, 10000, 25000, 50000)
+
+prompt_tokens = Histogram(
+    "llm_prompt_tokens_estimated",
+    "Estimated system prompt tokens per LLM request, by catalog mode",
+    labelnames=("mode",),
+    buckets=TOKEN_BUCKETS,
+)
+prompt_products = Histogram(
+    "llm_prompt_products",
+    "Products listed in the system prompt per LLM request, by catalog mode",
+    labelnames=("mode",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for English text with OpenAI tokenizers.
+    return math.ceil(len(text) / 4)
+
+
+def product_line(name: str, aliases: Sequence[str]) -> str:
+    # "- Name: [aliases]"; src/core/local_llm.py reads the catalog back from it.
+    return f"- {name}: {json.dumps(list(aliases))}"
+
+
+def _product_lines(snapshot: Optional[CatalogSnapshot], names: Sequence[str]) -> str:
+    return "".join(
+        product_line(name, snapshot.aliases.get(name, ())) + "\n" for name in names
+    )
+
+
+class PromptBuilder:
+    """Renders the system prompt from the live catalog.
+
+    Catalogs with up to `max_products` active products are listed in full;
+    that section only changes with the catalog and is rendered once per
+    snapshot. Larger catalogs list just the `top_k` products the resolver
+    finds in each message. Either way the catalog comes after the static
+    instructions, so the prompt prefix stays identical across calls.
+    """
+
+    def __init__(self, max_products: int, top_k: int):
+        self.max_products = max_products
+        self.top_k = top_k
+        self._full: Tuple[Optional[CatalogSnapshot], str] = (None, "")
+
+    def build(
+        self, snapshot: Optional[CatalogSnapshot], messages: Sequence[str], batch: bool = False
+    ) -> str:
+        instructions = PURCHASE_INSTRUCTIONS + BATCH_INSTRUCTIONS if batch else PURCHASE_INSTRUCTIONS
+        if snapshot is None or len(snapshot.active) <= self.max_products:
+            mode = "full"
+            count = len(snapshot.active) if snapshot is not None else 0
+            section = self._full_section(snapshot)
+        else:
+            mode = "top_k"
+            names = self._candidates(snapshot, messages)
+            count = len(names)
+            section = CANDIDATES_HEADER + _product_lines(snapshot, names)
+
+        prompt = instructions + section
+        tokens = estimate_tokens(prompt)
+        prompt_tokens.observe(tokens, mode=mode)
+        prompt_products.observe(count, mode=mode)
+        logger.debug(
+            "LLM prompt for %d message(s): %s catalog, %d products, ~%d tokens",
+            len(messages), mode, count, tokens,
+        )
+        return prompt
+
+    def _full_section(self, snapshot: Optional[CatalogSnapshot]) -> str:
+        cached_for, section = self._full
+        if cached_for is snapshot and section:
+            return section
+        names = sorted(snapshot.names) if snapshot is not None else []
+        section = CATALOG_HEADER + _product_lines(snapshot, names)
+        self._full = (snapshot, section)
+        return section
+
+    def _candidates(self, snapshot: CatalogSnapshot, messages: Sequence[str]) -> List[str]:
+        # Best score per product across all messages, capped at max_products.
+        scores: Dict[str, float] = {}
+        for message in messages:
+            for match in snapshot.resolver.candidates(message, self.top_k):
+                product = snapshot.by_id.get(match.product_id)
+                if product is None or not product.is_active:
+                    continue
+                scores[product.name] = max(scores.get(product.name, 0.0), match.score)
+        ranked = sorted(scores, key=lambda name: (-scores[name], name))
+        return ranked[: self.max_products]
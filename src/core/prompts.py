@@ -1,18 +1,17 @@
-PURCHASE_PROMPT = """
+# Static instructions come first and the catalog last, so every call shares the
+# longest possible prefix and provider-side prompt caching can reuse it.
+PURCHASE_INSTRUCTIONS = """
 You are an AI assistant for a soda vending machine.
 Your goal is to accurately parse user messages to understand their intent and extract purchase details.
 Handle grammatical errors, typos, and variations in phrasing gracefully.
 Recognize number words (e.g., 'one', 'two', 'a') and convert them to digits.
-
-Available products and their aliases:
-- Coca-Cola: ["coke", "coca cola", "cola"]
-- Pepsi: ["pepsi"]
-- Sprite: ["sprite"]
-- Fanta Orange: ["fanta", "fanta orange"]
-- Guarana Antarctica: ["guarana", "guarana antarctica"]
+Always answer with product names exactly as listed under "Available products" at
+the end of this prompt; the examples below use sample names.
 
 Here are the possible intents:
-- 'purchase': When the user wants to buy something.
+- 'purchase': When the user wants to buy something. If they order more than one
+  product, list every product and quantity in items and leave product_name and
+  quantity empty.
 - 'list_products': When the user asks what is available.
 - 'check_stock': When the user asks about the quantity of a specific product.
 - 'unknown': If the intent is unclear.
@@ -21,7 +20,22 @@ Examples:
 - "I want buy one coke" -> intent: purchase, product_name: "Coca-Cola", quantity: 1
 - "gimme a sprite please" -> intent: purchase, product_name: "Sprite", quantity: 1
 - "two fantas" -> intent: purchase, product_name: "Fanta Orange", quantity: 2
+- "two cokes and a sprite" -> intent: purchase, items: [{product_name: "Coca-Cola", quantity: 2}, {product_name: "Sprite", quantity: 1}]
 - "What sodas you got?" -> intent: list_products
 - "how many pepsis are there" -> intent: check_stock, product_name: "Pepsi"
 - "hello" -> intent: unknown
 """
+
+BATCH_INSTRUCTIONS = """
+You will receive several independent customer messages, each on its own line
+prefixed with its number in square brackets, e.g. "[0] two cokes".
+Parse every message on its own and return exactly one intent per message,
+with message_index set to that message's number.
+"""
+
+CATALOG_HEADER = "\nAvailable products and their aliases:\n"
+
+CANDIDATES_HEADER = (
+    "\nAvailable products and their aliases (only those that may match the "
+    "message; if none fits, the product is not sold here):\n"
+)
@@ -0,0 +1,259 @@
+import asyncio
+import random
+import threading
+import time
+from enum import Enum
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+from src.core.metrics import Counter, Gauge
+
+
+T = TypeVar("T")
+
+circuit_state = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state: 0 closed, 1 half-open, 2 open",
+    labelnames=("name",),
+)
+circuit_trips = Counter(
+    "circuit_breaker_trips_total",
+    "Times the circuit breaker opened",
+    labelnames=("name",),
+)
+circuit_rejections = Counter(
+    "circuit_breaker_rejections_total",
+    "Calls failed fast because the circuit was open",
+    labelnames=("name",),
+)
+call_attempts = Counter(
+    "resilient_call_attempts_total",
+    "Attempts made by guarded calls, by kind and outcome",
+    labelnames=("name", "kind", "outcome"),
+)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitOpen(RuntimeError):
+    pass
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class CircuitBreaker:
+    """Fails calls fast while a dependency keeps failing.
+
+    `failure_threshold` consecutive failures open the circuit for
+    `reset_seconds`; after that a single trial call is let through
+    (half-open), and its outcome closes the circuit or opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+        circuit_state.set(0, name=name)
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return
+            if (
+                self._state == CircuitState.OPEN
+                and time.monotonic() - self._opened_at >= self.reset_seconds
+            ):
+                self._set_state(CircuitState.HALF_OPEN)
+            # A trial that never reported back (e.g. it was cancelled) is
+            # given up on after another reset period.
+            now = time.monotonic()
+            if self._state == CircuitState.HALF_OPEN and (
+                self._trial_started is None or now - self._trial_started >= self.reset_seconds
+            ):
+                self._trial_started = now
+                return
+        circuit_rejections.inc(name=self.name)
+        raise CircuitOpen(self.name)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_started = None
+            if self._state != CircuitState.CLOSED:
+                self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_started = None
+            if self._state == CircuitState.HALF_OPEN or (
+                self._state == CircuitState.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._set_state(CircuitState.OPEN)
+                circuit_trips.inc(name=self.name)
+
+    def _set_state(self, state: CircuitState) -> None:
+        self._state = state
+        circuit_state.set(STATE_VALUES[state], name=self.name)
+
+
+class RetryPolicy:
+    """Deadline, retry and hedging settings for a guarded call.
+
+    Every call gets `deadline_seconds` in total, shared by up to
+    `max_attempts` tries of at most `attempt_timeout_seconds` each, with
+    full-jitter exponential backoff in between.
+    Async calls also start a hedge request when an attempt has not answered
+    after `hedge_after_seconds` and take whichever finishes first.
+    """
+
+    def __init__(
+        self,
+        deadline_seconds: float,
+        attempt_timeout_seconds: Optional[float] = None,
+        max_attempts: int = 1,
+        backoff_base_seconds: float = 0.1,
+        backoff_max_seconds: float = 2.0,
+        hedge_after_seconds: Optional[float] = None,
+    ):
+        self.deadline_seconds = deadline_seconds
+        self.attempt_timeout_seconds = attempt_timeout_seconds or deadline_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hedge_after_seconds = hedge_after_seconds
+        self._rng = random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        cap = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt)
+        return self._rng.uniform(0, cap)
+
+
+class GuardedCall:
+    """Runs calls to one dependency under a RetryPolicy and a CircuitBreaker.
+
+    `retry_on` decides which errors are worth another attempt; the others
+    (bad requests, auth failures) are raised at once and do not count
+    against the circuit. Functions receive the seconds the attempt may take
+    so they can pass it on as their own timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        policy: RetryPolicy,
+        breaker: CircuitBreaker,
+        retry_on: Callable[[BaseException], bool] = lambda e: True,
+    ):
+        self.name = name
+        self.policy = policy
+        self.breaker = breaker
+        self.retry_on = retry_on
+
+    def call(self, fn: Callable[[float], T]) -> T:
+        deadline = time.monotonic() + self.policy.deadline_seconds
+        for attempt in range(self.policy.max_attempts):
+            remaining = self._attempt_timeout(deadline)
+            if remaining <= 0:
+                break
+            self.breaker.before_call()
+            try:
+                result = fn(remaining)
+            except Exception as e:
+                if not self._failed(e, attempt, deadline):
+                    raise
+                time.sleep(self._pause(attempt, deadline))
+                continue
+            self._succeeded()
+            return result
+        raise DeadlineExceeded(self.name)
+
+    async def call_async(self, fn: Callable[[float], Awaitable[T]]) -> T:
+        deadline = time.monotonic() + self.policy.deadline_seconds
+        for attempt in range(self.policy.max_attempts):
+            remaining = self._attempt_timeout(deadline)
+            if remaining <= 0:
+                break
+            self.breaker.before_call()
+            attempt_deadline = time.monotonic() + remaining
+            try:
+                result = await asyncio.wait_for(self._hedged(fn, attempt_deadline), remaining)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    e = DeadlineExceeded(self.name)
+                if not self._failed(e, attempt, deadline):
+                    raise e
+                await asyncio.sleep(self._pause(attempt, deadline))
+                continue
+            self._succeeded()
+            return result
+        raise DeadlineExceeded(self.name)
+
+    async def _hedged(self, fn: Callable[[float], Awaitable[T]], deadline: float) -> T:
+        tasks: List[asyncio.Future] = [
+            asyncio.ensure_future(fn(deadline - time.monotonic()))
+        ]
+        try:
+            hedge_after = self.policy.hedge_after_seconds
+            if hedge_after is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    call_attempts.inc(name=self.name, kind="hedge", outcome="sent")
+                    tasks.append(asyncio.ensure_future(fn(deadline - time.monotonic())))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _attempt_timeout(self, deadline: float) -> float:
+        return min(self.policy.attempt_timeout_seconds, deadline - time.monotonic())
+
+    def _succeeded(self) -> None:
+        call_attempts.inc(name=self.name, kind="attempt", outcome="ok")
+        self.breaker.record_success()
+
+    def _failed(self, error: BaseException, attempt: int, deadline: float) -> bool:
+        # True when the caller should try again.
+        if not self.retry_on(error):
+            # The dependency answered; the request itself was at fault.
+            call_attempts.inc(name=self.name, kind="attempt", outcome="rejected")
+            self.breaker.record_success()
+            return False
+        call_attempts.inc(name=self.name, kind="attempt", outcome="error")
+        self.breaker.record_failure()
+        return (
+            attempt + 1 < self.policy.max_attempts
+            and self.breaker.state != CircuitState.OPEN
+            and time.monotonic() < deadline
+        )
+
+    def _pause(self, attempt: int, deadline: float) -> float:
+        return max(0.0, min(self.policy.backoff(attempt), deadline - time.monotonic()))
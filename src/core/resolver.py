@@ -0,0 +1,297 @@
+import heapq
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from src.core.text import singularize, tokenize
+
+
+# Match scores: a full name, SKU or alias beats a single word of a longer name.
+EXACT_SCORE = 1.0
+TOKEN_SCORE = 0.9
+PREFIX_SCORE = 0.85
+FUZZY_SCORE = 0.8
+
+PREFIX_MIN_LENGTH = 3
+FUZZY_MIN_LENGTH = 4
+FUZZY_CANDIDATES = 8
+FUZZY_MIN_SIMILARITY = 0.75
+# Longest name or alias, in words, that candidates() looks for in a message.
+CANDIDATE_MAX_WORDS = 6
+
+
+class ResolvedProduct(NamedTuple):
+    product_id: int
+    term: str
+    score: float
+
+
+def _words(text: str) -> List[str]:
+    return [singularize(token) for token in tokenize(text)]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_words(text))
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(a: str, b: str) -> float:
+    # Optimal string alignment distance: Levenshtein plus adjacent
+    # transpositions, so "spirte" is one edit away from "sprite".
+    if a == b:
+        return 1.0
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return 1.0 - previous[-1] / max(len(a), len(b))
+
+
+class _TrieNode:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.terminal = False
+
+
+class ProductResolver:
+    """Resolves free-text product names to product ids.
+
+    Names, SKUs and aliases are folded (case, accents, plurals) and indexed as
+    terms: a dict for exact hits and a trie for prefixes. Typos are corrected
+    word by word against the catalog vocabulary through a trigram index
+    ranked by edit distance. Products are added and removed one at a time, so
+    catalog changes never rebuild the whole index.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # Full names, SKUs and aliases; and single words of names.
+        self._phrases: Dict[str, Set[int]] = {}
+        self._name_words: Dict[str, Set[int]] = {}
+        self._product_terms: Dict[int, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+        self._term_refs: Dict[str, int] = {}
+        self._trie = _TrieNode()
+        # word -> number of terms using it, and trigram -> words
+        self._words: Dict[str, int] = {}
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._product_terms)
+
+    def add(
+        self, product_id: int, name: str, sku: str = "", aliases: Iterable[str] = ()
+    ) -> None:
+        name_words = _words(name)
+        phrases = {" ".join(name_words), *(_normalize(p or "") for p in (sku, *aliases))}
+        phrases.discard("")
+        words = set(name_words) if len(name_words) > 1 else set()
+
+        with self._lock:
+            self.remove(product_id)
+            for index, terms in ((self._phrases, phrases), (self._name_words, words)):
+                for term in terms:
+                    index.setdefault(term, set()).add(product_id)
+                    self._ref_term(term)
+            self._product_terms[product_id] = (tuple(phrases), tuple(words))
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            phrases, words = self._product_terms.pop(product_id, ((), ()))
+            for index, terms in ((self._phrases, phrases), (self._name_words, words)):
+                for term in terms:
+                    ids = index[term]
+                    ids.discard(product_id)
+                    if not ids:
+                        del index[term]
+                    self._unref_term(term)
+
+    def resolve(self, query: str) -> Optional[ResolvedProduct]:
+        term = _normalize(query)
+        if not term:
+            return None
+        with self._lock:
+            return self._lookup(term) or self._fuzzy(term)
+
+    def candidates(self, query: str, limit: int) -> List[ResolvedProduct]:
+        """Products a free-text message may mention, best first.
+
+        Every name, SKU, alias or name word found in the message counts, after
+        correcting typos word by word, so one message can yield several.
+        """
+        words = _words(query)
+        best: Dict[int, ResolvedProduct] = {}
+        with self._lock:
+            # (word, similarity); 0 marks a word that matches nothing.
+            corrected = []
+            for word in words:
+                if word in self._words:
+                    corrected.append((word, 1.0))
+                else:
+                    corrected.append(self._closest_word(word) or (word, 0.0))
+
+            for length in range(1, min(len(corrected), CANDIDATE_MAX_WORDS) + 1):
+                for start in range(len(corrected) - length + 1):
+                    window = corrected[start : start + length]
+                    similarity = min(score for _, score in window)
+                    if not similarity:
+                        continue
+                    phrase = " ".join(word for word, _ in window)
+                    factor = 1.0 if similarity == 1.0 else FUZZY_SCORE * similarity
+                    matches = [(self._phrases.get(phrase, ()), EXACT_SCORE)]
+                    if length == 1:
+                        matches.append((self._name_words.get(phrase, ()), TOKEN_SCORE))
+                    for ids, score in matches:
+                        for product_id in ids:
+                            current = best.get(product_id)
+                            if current is None or current.score < score * factor:
+                                best[product_id] = ResolvedProduct(product_id, phrase, score * factor)
+        return heapq.nlargest(limit, best.values(), key=lambda m: (m.score, -m.product_id))
+
+    def _lookup(self, term: str) -> Optional[ResolvedProduct]:
+        return self._exact(term) or self._within(term) or self._prefix(term)
+
+    def _exact(self, term: str) -> Optional[ResolvedProduct]:
+        ids = self._phrases.get(term)
+        if ids:
+            return ResolvedProduct(min(ids), term, EXACT_SCORE)
+        ids = self._name_words.get(term)
+        if ids:
+            return ResolvedProduct(min(ids), term, TOKEN_SCORE)
+        return None
+
+    def _within(self, term: str) -> Optional[ResolvedProduct]:
+        # "a cold coke please": the longest full name, SKU or alias inside the
+        # query. Single words of longer names are too ambiguous to count here.
+        tokens = term.split()
+        for length in range(len(tokens) - 1, 0, -1):
+            for start in range(len(tokens) - length + 1):
+                phrase = " ".join(tokens[start : start + length])
+                ids = self._phrases.get(phrase)
+                if ids:
+                    return ResolvedProduct(min(ids), phrase, EXACT_SCORE * TOKEN_SCORE)
+        return None
+
+    def _prefix(self, term: str) -> Optional[ResolvedProduct]:
+        if len(term) < PREFIX_MIN_LENGTH:
+            return None
+        node = self._trie
+        for char in term:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        # Breadth-first, so the shortest completion wins.
+        level = [(node, term)]
+        while level:
+            completions = sorted(text for node, text in level if node.terminal)
+            if completions:
+                match = self._exact(completions[0])
+                return match._replace(score=match.score * PREFIX_SCORE)
+            level = [
+                (child, text + char)
+                for node, text in level
+                for char, child in node.children.items()
+            ]
+        return None
+
+    def _fuzzy(self, term: str) -> Optional[ResolvedProduct]:
+        corrected = []
+        similarities = []
+        for word in term.split():
+            if word in self._words:
+                corrected.append(word)
+                continue
+            match = self._closest_word(word)
+            if match is None:
+                return None
+            corrected.append(match[0])
+            similarities.append(match[1])
+        if not similarities:
+            return None
+        match = self._lookup(" ".join(corrected))
+        if match is None:
+            return None
+        similarity = sum(similarities) / len(similarities)
+        return match._replace(score=match.score * FUZZY_SCORE * similarity)
+
+    def _closest_word(self, word: str) -> Optional[Tuple[str, float]]:
+        if len(word) < FUZZY_MIN_LENGTH:
+            return None
+        overlap: Dict[str, int] = defaultdict(int)
+        for gram in _trigrams(word):
+            for candidate in self._trigrams.get(gram, ()):
+                overlap[candidate] += 1
+        ranked = heapq.nsmallest(
+            FUZZY_CANDIDATES, overlap, key=lambda w: (-overlap[w], abs(len(w) - len(word)), w)
+        )
+        best = None
+        # An unknown word is at least one edit away from every candidate.
+        ceiling = 1.0 - 1.0 / len(word)
+        for candidate in ranked:
+            longest = max(len(word), len(candidate))
+            if 1.0 - abs(len(word) - len(candidate)) / longest < FUZZY_MIN_SIMILARITY:
+                continue
+            similarity = _similarity(word, candidate)
+            if similarity >= FUZZY_MIN_SIMILARITY and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+                if similarity >= ceiling:
+                    break
+        return best
+
+    def _ref_term(self, term: str) -> None:
+        count = self._term_refs.get(term, 0)
+        self._term_refs[term] = count + 1
+        if not count:
+            self._index_term(term)
+
+    def _unref_term(self, term: str) -> None:
+        count = self._term_refs.pop(term) - 1
+        if count:
+            self._term_refs[term] = count
+        else:
+            self._unindex_term(term)
+
+    def _index_term(self, term: str) -> None:
+        node = self._trie
+        for char in term:
+            node = node.children.setdefault(char, _TrieNode())
+        node.terminal = True
+        for word in term.split():
+            count = self._words.get(word, 0)
+            self._words[word] = count + 1
+            if not count:
+                for gram in _trigrams(word):
+                    self._trigrams[gram].add(word)
+
+    def _unindex_term(self, term: str) -> None:
+        path = [self._trie]
+        for char in term:
+            path.append(path[-1].children[char])
+        path[-1].terminal = False
+        for depth in range(len(term), 0, -1):
+            node = path[depth]
+            if node.terminal or node.children:
+                break
+            del path[depth - 1].children[term[depth - 1]]
+        for word in term.split():
+            count = self._words.pop(word) - 1
+            if count:
+                self._words[word] = count
+                continue
+            for gram in _trigrams(word):
+                words = self._trigrams.get(gram)
+                if words is not None:
+                    words.discard(word)
+                    if not words:
+                        del self._trigrams[gram]
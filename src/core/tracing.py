@@ -0,0 +1,165 @@
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+
+from src.core.metrics import Counter, Histogram
+
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+
+http_requests = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    labelnames=("method", "route", "status"),
+)
+http_request_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending its response headers, by route",
+    labelnames=("method", "route"),
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while serving a request, by route",
+    labelnames=("route",),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+db_seconds_per_request = Histogram(
+    "db_query_seconds_per_request",
+    "Time spent executing SQL while serving a request, by route",
+    labelnames=("route",),
+)
+db_query_seconds = Histogram(
+    "db_query_duration_seconds",
+    "Time spent executing a single SQL statement",
+)
+span_seconds = Histogram(
+    "span_duration_seconds",
+    "Time spent in each traced section of a request",
+    labelnames=("span",),
+)
+
+
+class RequestTrace:
+    """Per-request totals that spans and SQL statements add to."""
+
+    __slots__ = ("db_queries", "db_seconds", "spans")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.spans: Dict[str, float] = {}
+
+    def server_timing(self, total_seconds: float) -> str:
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.spans.items()]
+        entries.append(f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_queries} queries"')
+        entries.append(f"total;dur={total_seconds * 1000:.2f}")
+        return ", ".join(entries)
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+class Span:
+    """Times a block into `span_duration_seconds` and the current request trace.
+
+    A plain class rather than a generator context manager: a span costs two
+    perf_counter calls and one histogram observation.
+    """
+
+    __slots__ = ("name", "_started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "Span":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self._started
+        span_seconds.observe(elapsed, span=self.name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.spans[self.name] = trace.spans.get(self.name, 0.0) + elapsed
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    db_query_seconds.observe(elapsed)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.db_queries += 1
+        trace.db_seconds += elapsed
+
+
+def before_commit(session) -> None:
+    session.info["commit_started"] = time.perf_counter()
+
+
+def after_commit(session) -> None:
+    started = session.info.pop("commit_started", None)
+    if started is None:
+        return
+    # Includes the flush commit() performs before the COMMIT itself.
+    elapsed = time.perf_counter() - started
+    span_seconds.observe(elapsed, span="db_commit")
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.spans["db_commit"] = trace.spans.get("db_commit", 0.0) + elapsed
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    # Raw paths would give every product id its own series.
+    return getattr(route, "path", None) or "unmatched"
+
+
+class TracingMiddleware:
+    """Records per-route latency and DB usage, and a Server-Timing header.
+
+    Pure ASGI rather than BaseHTTPMiddleware, so it adds no extra task or
+    body buffering to each request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+        started = time.perf_counter()
+        status_code = 500
+        elapsed = None
+
+        async def send_with_timing(message):
+            nonlocal status_code, elapsed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = time.perf_counter() - started
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", trace.server_timing(elapsed)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            if elapsed is None:
+                elapsed = time.perf_counter() - started
+            route = _route_template(scope)
+            method = scope["method"]
+            http_requests.inc(method=method, route=route, status=str(status_code))
+            http_request_seconds.observe(elapsed, method=method, route=route)
+            db_queries_per_request.observe(trace.db_queries, route=route)
+            db_seconds_per_request.observe(trace.db_seconds, route=route)
@@ -1,5 +1,13 @@
 from sqlmodel import SQLModel
 from src.model.product import Product
 from src.model.transaction import Transaction
+from src.model.sales_rollup import DailySalesRollup, HourlySalesRollup
+from src.model.catalog_state import CatalogState
+from src.model.product_alias import ProductAlias
+from src.model.idempotency import IdempotencyKey
+from src.model.chat_audit import ChatAudit
+from src.model.machine_stock import MachineStock
+from src.model.stock_hold import StockHold
+from src.model.inventory_event import InventoryEvent
 
 Base = SQLModel
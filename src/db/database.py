@@ -1,11 +1,120 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session as OrmSession
 from sqlmodel import SQLModel, Session, create_engine
-from typing import Generator
-from src.settings import DATABASE_URL
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import AsyncGenerator, Generator, List, Tuple
+from src.core.tracing import (
+    after_commit,
+    after_cursor_execute,
+    before_commit,
+    before_cursor_execute,
+)
+from src.settings import (
+    ASYNC_DATABASE_URL,
+    DATABASE_URL,
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_TEMP_STORE,
+)
 
 
-sql_engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}, echo=True
-)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+SQLITE_PRAGMAS: List[Tuple[str, str]] = [
+    (name, value)
+    for name, value in (
+        # journal_mode first: WAL lets readers run alongside the single writer.
+        ("journal_mode", SQLITE_JOURNAL_MODE),
+        ("synchronous", SQLITE_SYNCHRONOUS),
+        ("busy_timeout", SQLITE_BUSY_TIMEOUT_MS),
+        ("mmap_size", SQLITE_MMAP_SIZE),
+        ("cache_size", SQLITE_CACHE_SIZE),
+        ("temp_store", SQLITE_TEMP_STORE),
+    )
+    if value
+]
+
+
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _engine_options(url: str) -> dict:
+    options = {"echo": DB_ECHO, "pool_pre_ping": DB_POOL_PRE_PING}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory databases live in a single connection; keep SQLAlchemy's pool.
+        return options
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def build_engine(url: str = DATABASE_URL) -> Engine:
+    options = _engine_options(url)
+    if _is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}
+    engine = create_engine(url, **options)
+    if _is_sqlite(url):
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    instrument_engine(engine)
+    return engine
+
+
+def build_async_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(url, **_engine_options(url))
+    if _is_sqlite(url):
+        event.listen(engine.sync_engine, "connect", apply_sqlite_pragmas)
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+# Every Session, including the ones behind AsyncSession, times its commits.
+event.listen(OrmSession, "before_commit", before_commit)
+event.listen(OrmSession, "after_commit", after_commit)
+
+sql_engine = build_engine(DATABASE_URL)
+
+async_engine = build_async_engine(ASYNC_DATABASE_URL or to_async_url(DATABASE_URL))
 
 
 def create_tables():
@@ -17,8 +126,15 @@ def get_session() -> Generator[Session, None, None]:
         yield session
 
 
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+
 def seed_initial_data():
-    from model.product import Product
+    from src.db.repository.product_alias_repository import ProductAliasRepository
+    from src.model.product import Product
+    from src.model.product_alias import DEFAULT_ALIASES
     
     with Session(sql_engine) as session:
         existing_products = session.query(Product).first()
@@ -67,4 +183,8 @@ def seed_initial_data():
             session.add(product)
 
         session.commit()
+
+        alias_repo = ProductAliasRepository(session)
+        for product in initial_products:
+            alias_repo.create_missing(product.id, DEFAULT_ALIASES.get(product.name.casefold(), ()))
         print("Initial products added to database!")
@@ -0,0 +1,25 @@
+from sqlalchemy import Table, func, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session
+
+
+# Both have on_conflict_do_nothing / on_conflict_do_update and excluded.
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def dialect_name(session: Session) -> str:
+    return session.get_bind().dialect.name
+
+
+def dialect_insert(session: Session, table: Table):
+    """INSERT for the session's database, with its ON CONFLICT clauses."""
+    return _INSERTS[dialect_name(session)](table)
+
+
+def hour_bucket(session: Session, column) -> ColumnElement:
+    """`column` truncated to the hour: a timestamp on Postgres, text on SQLite."""
+    if dialect_name(session) == "postgresql":
+        # Inlined: a bound 'hour' would differ between SELECT and GROUP BY.
+        return func.date_trunc(literal_column("'hour'"), column)
+    return func.strftime("%Y-%m-%d %H:00:00.000000", column)
@@ -18,11 +18,15 @@ down_revision: Union[str, Sequence[str], None] = '965c0eeeb19f'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+USER_INTENT = sa.Enum('PURCHASE', 'CHECK_STOCK', 'LIST_PRODUCTS', 'UNKNOWN', name='userintent')
+
 
 def upgrade() -> None:
     """Upgrade schema."""
+    # Postgres needs the enum type before a column can use it; no-op on SQLite.
+    USER_INTENT.create(op.get_bind(), checkfirst=True)
     # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('transactions', sa.Column('intent', sa.Enum('PURCHASE', 'CHECK_STOCK', 'LIST_PRODUCTS', 'UNKNOWN', name='userintent'), nullable=False))
+    op.add_column('transactions', sa.Column('intent', USER_INTENT, nullable=False))
     op.add_column('transactions', sa.Column('confidence', sa.Float(), nullable=True))
     # ### end Alembic commands ###
 
@@ -33,3 +37,4 @@ def downgrade() -> None:
     op.drop_column('transactions', 'confidence')
     op.drop_column('transactions', 'intent')
     # ### end Alembic commands ###
+    USER_INTENT.drop(op.get_bind(), checkfirst=True)
@@ -56,3 +56,4 @@ def downgrade() -> None:
     op.drop_table('transactions')
     op.drop_table('products')
     # ### end Alembic commands ###
+    sa.Enum(name='transactionstatus').drop(op.get_bind(), checkfirst=True)
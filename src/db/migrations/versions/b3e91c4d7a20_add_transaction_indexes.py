@@ -0,0 +1,33 @@
+"""add transaction indexes
+
+Revision ID: b3e91c4d7a20
+Revises: 6fab15271046
+Create Date: 2026-10-17 16:20:11.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e91c4d7a20'
+down_revision: Union[str, Sequence[str], None] = '6fab15271046'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_transactions_created_at', 'transactions', ['created_at'], unique=False)
+    op.create_index('ix_transactions_intent', 'transactions', ['intent'], unique=False)
+    op.create_index('ix_transactions_status_created_at', 'transactions', ['status', 'created_at', 'product_id', 'quantity', 'total_price'], unique=False)
+    op.create_index('ix_transactions_product_id_status', 'transactions', ['product_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_product_id_status', table_name='transactions')
+    op.drop_index('ix_transactions_status_created_at', table_name='transactions')
+    op.drop_index('ix_transactions_intent', table_name='transactions')
+    op.drop_index('ix_transactions_created_at', table_name='transactions')
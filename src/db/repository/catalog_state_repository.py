@@ -0,0 +1,24 @@
+from sqlalchemy import update
+from sqlmodel import Session
+from datetime import datetime
+
+from src.model.catalog_state import CatalogState
+
+
+class CatalogStateRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_version(self) -> int:
+        state = self.session.get(CatalogState, 1, populate_existing=True)
+        return state.version if state else 0
+
+    def bump(self) -> None:
+        # No commit: the bump rides in the same transaction as the product write.
+        result = self.session.execute(
+            update(CatalogState)
+            .where(CatalogState.id == 1)
+            .values(version=CatalogState.version + 1, updated_at=datetime.now())
+        )
+        if result.rowcount == 0:
+            self.session.add(CatalogState(id=1, version=1))
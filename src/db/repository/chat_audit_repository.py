@@ -0,0 +1,16 @@
+from sqlalchemy import insert
+from sqlmodel import Session
+from typing import List
+
+from src.model.chat_audit import ChatAudit
+
+
+class ChatAuditRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def insert_many(self, rows: List[dict]) -> None:
+        # A list of parameter sets runs as one executemany.
+        self.session.execute(insert(ChatAudit.__table__), rows)
+        self.session.commit()
+
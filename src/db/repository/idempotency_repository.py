@@ -0,0 +1,72 @@
+from sqlalchemy import delete, update
+from sqlmodel import Session
+from typing import Optional
+from datetime import datetime
+
+from src.db.dialect import dialect_insert
+from src.model.idempotency import IdempotencyKey, IdempotencyStatus
+
+
+class IdempotencyRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def claim(self, scope: str, key: str, fingerprint: str, expires_at: datetime) -> bool:
+        # Expired rows, including in-progress ones whose owner died, free the key.
+        self.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at < datetime.now(),
+            )
+        )
+        statement = (
+            dialect_insert(self.session, IdempotencyKey.__table__)
+            .values(
+                scope=scope,
+                key=key,
+                fingerprint=fingerprint,
+                status=IdempotencyStatus.IN_PROGRESS,
+                created_at=datetime.now(),
+                expires_at=expires_at,
+            )
+            .on_conflict_do_nothing(index_elements=["scope", "key"])
+        )
+        claimed = self.session.execute(statement).rowcount == 1
+        self.session.commit()
+        return claimed
+
+    def get(self, scope: str, key: str) -> Optional[IdempotencyKey]:
+        return self.session.get(IdempotencyKey, (scope, key), populate_existing=True)
+
+    def complete(
+        self, scope: str, key: str, status_code: int, response: str, expires_at: datetime
+    ) -> None:
+        self.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            .values(
+                status=IdempotencyStatus.COMPLETED,
+                status_code=status_code,
+                response=response,
+                expires_at=expires_at,
+            )
+        )
+        self.session.commit()
+
+    def release(self, scope: str, key: str) -> None:
+        self.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS,
+            )
+        )
+        self.session.commit()
+
+    def delete_expired(self) -> int:
+        result = self.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.now())
+        )
+        self.session.commit()
+        return result.rowcount
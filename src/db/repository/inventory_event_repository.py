@@ -0,0 +1,78 @@
+from sqlalchemy import Row, delete, func, insert, select
+from sqlmodel import Session
+from typing import List, Optional, Tuple
+from decimal import Decimal
+from datetime import datetime
+
+from src.model.inventory_event import InventoryEvent
+
+
+EVENT_COLUMNS = (
+    InventoryEvent.seq,
+    InventoryEvent.product_id,
+    InventoryEvent.name,
+    InventoryEvent.stock_quantity,
+    InventoryEvent.price,
+    InventoryEvent.is_active,
+    InventoryEvent.created_at,
+)
+
+
+class InventoryEventRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def record(
+        self,
+        product_id: int,
+        name: str,
+        stock_quantity: int,
+        price: Decimal,
+        is_active: bool,
+        changed_at: datetime,
+    ) -> None:
+        # No commit: the event rides in the transaction of the write it
+        # describes, so it is visible exactly when the write is. `changed_at`
+        # is the product's new updated_at.
+        self.session.execute(
+            insert(InventoryEvent.__table__).values(
+                product_id=product_id,
+                name=name,
+                stock_quantity=stock_quantity,
+                price=price,
+                is_active=is_active,
+                created_at=changed_at,
+            )
+        )
+
+    def get_after(self, seq: int, limit: int) -> List[Row]:
+        statement = (
+            select(*EVENT_COLUMNS)
+            .where(InventoryEvent.seq > seq)
+            .order_by(InventoryEvent.seq)
+            .limit(limit)
+        )
+        return self.session.execute(statement).all()
+
+    def get_last(self) -> Optional[Row]:
+        statement = (
+            select(InventoryEvent.seq, InventoryEvent.created_at)
+            .order_by(InventoryEvent.seq.desc())
+            .limit(1)
+        )
+        return self.session.execute(statement).first()
+
+    def get_seq_range(self) -> Tuple[Optional[int], int]:
+        # (oldest seq still stored or None, newest seq or 0); both ends of the
+        # primary key, so no scan.
+        first = self.session.execute(select(func.min(InventoryEvent.seq))).scalar()
+        last = self.session.execute(select(func.max(InventoryEvent.seq))).scalar()
+        return first, last or 0
+
+    def prune(self, keep: int) -> int:
+        _, last = self.get_seq_range()
+        result = self.session.execute(
+            delete(InventoryEvent).where(InventoryEvent.seq <= last - keep)
+        )
+        self.session.commit()
+        return result.rowcount
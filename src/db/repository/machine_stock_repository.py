@@ -0,0 +1,94 @@
+from sqlalchemy import Row, update
+from sqlmodel import Session, select
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from src.db.dialect import dialect_insert
+from src.model.machine_stock import MachineStock
+
+
+class MachineStockRepository:
+    """Stock rows of one machine; a missing row means none loaded."""
+
+    def __init__(self, session: Session, machine_id: str):
+        self.session = session
+        self.machine_id = machine_id
+
+    def get(self, product_id: int) -> Optional[MachineStock]:
+        return self.session.get(MachineStock, (self.machine_id, product_id))
+
+    def get_all(self) -> List[MachineStock]:
+        statement = (
+            select(MachineStock)
+            .where(MachineStock.machine_id == self.machine_id)
+            .order_by(MachineStock.product_id)
+        )
+        return self.session.exec(statement).all()
+
+    def get_levels(self) -> Dict[int, int]:
+        statement = select(MachineStock.product_id, MachineStock.stock_quantity).where(
+            MachineStock.machine_id == self.machine_id
+        )
+        return dict(self.session.exec(statement).all())
+
+    def decrement_stock(self, product_id: int, quantity: int) -> Optional[Row]:
+        # Same contract as ProductRepository.decrement_stock: no commit, and
+        # None when the machine is short on stock.
+        statement = (
+            update(MachineStock)
+            .where(
+                MachineStock.machine_id == self.machine_id,
+                MachineStock.product_id == product_id,
+                MachineStock.stock_quantity >= quantity,
+            )
+            .values(
+                stock_quantity=MachineStock.stock_quantity - quantity,
+                updated_at=datetime.now(),
+            )
+            .returning(MachineStock.product_id, MachineStock.stock_quantity)
+        )
+        return self.session.execute(statement).first()
+
+    def increment_stock(self, product_id: int, quantity: int) -> Optional[Row]:
+        # Puts held units back; no commit.
+        statement = (
+            update(MachineStock)
+            .where(
+                MachineStock.machine_id == self.machine_id,
+                MachineStock.product_id == product_id,
+            )
+            .values(
+                stock_quantity=MachineStock.stock_quantity + quantity,
+                updated_at=datetime.now(),
+            )
+            .returning(MachineStock.product_id, MachineStock.stock_quantity)
+        )
+        return self.session.execute(statement).first()
+
+    def set_stock(self, product_id: int, quantity: int) -> Row:
+        return self._upsert(product_id, quantity, add=False)
+
+    def restock(self, product_id: int, quantity: int) -> Row:
+        return self._upsert(product_id, quantity, add=True)
+
+    def _upsert(self, product_id: int, quantity: int, add: bool) -> Row:
+        table = MachineStock.__table__
+        now = datetime.now()
+        statement = dialect_insert(self.session, table).values(
+            machine_id=self.machine_id,
+            product_id=product_id,
+            stock_quantity=quantity,
+            updated_at=now,
+        )
+        stock_quantity = statement.excluded.stock_quantity
+        statement = statement.on_conflict_do_update(
+            index_elements=["machine_id", "product_id"],
+            set_={
+                "stock_quantity": table.c.stock_quantity + stock_quantity if add else stock_quantity,
+                "updated_at": now,
+            },
+        )
+        # The stored row comes back with the write; nothing to re-read.
+        stock = self.session.execute(statement.returning(*table.columns)).one()
+        self.session.commit()
+        return stock
@@ -0,0 +1,68 @@
+from sqlmodel import Session, select
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.db.repository.catalog_state_repository import CatalogStateRepository
+from src.model.product_alias import ProductAlias
+
+
+class ProductAliasRepository:
+    def __init__(self, session: Session):
+        self.session = session
+        self.catalog_state = CatalogStateRepository(session)
+
+    def get_all(self) -> Dict[int, Tuple[str, ...]]:
+        statement = select(ProductAlias.product_id, ProductAlias.alias).order_by(
+            ProductAlias.id
+        )
+        aliases: Dict[int, List[str]] = {}
+        for product_id, alias in self.session.exec(statement):
+            aliases.setdefault(product_id, []).append(alias)
+        return {product_id: tuple(names) for product_id, names in aliases.items()}
+
+    def get_for_product(self, product_id: int) -> List[ProductAlias]:
+        statement = (
+            select(ProductAlias)
+            .where(ProductAlias.product_id == product_id)
+            .order_by(ProductAlias.id)
+        )
+        return self.session.exec(statement).all()
+
+    def get_by_alias(self, alias: str) -> Optional[ProductAlias]:
+        statement = select(ProductAlias).where(ProductAlias.alias == alias)
+        return self.session.exec(statement).first()
+
+    def create(self, product_id: int, alias: str) -> ProductAlias:
+        product_alias = ProductAlias(product_id=product_id, alias=alias)
+        self.session.add(product_alias)
+        self.catalog_state.bump()
+        self.session.commit()
+        self.session.refresh(product_alias)
+        return product_alias
+
+    def create_missing(self, product_id: int, aliases: Iterable[str]) -> List[ProductAlias]:
+        # Aliases already taken by any product are skipped; one commit for all.
+        aliases = list(aliases)
+        if not aliases:
+            return []
+        taken = set(
+            self.session.exec(select(ProductAlias.alias).where(ProductAlias.alias.in_(aliases)))
+        )
+        created = [
+            ProductAlias(product_id=product_id, alias=alias)
+            for alias in aliases
+            if alias not in taken
+        ]
+        if created:
+            self.session.add_all(created)
+            self.catalog_state.bump()
+            self.session.commit()
+        return created
+
+    def delete(self, product_id: int, alias: str) -> bool:
+        product_alias = self.get_by_alias(alias)
+        if product_alias is None or product_alias.product_id != product_id:
+            return False
+        self.session.delete(product_alias)
+        self.catalog_state.bump()
+        self.session.commit()
+        return True
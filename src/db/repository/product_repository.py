@@ -1,17 +1,25 @@
+from sqlalchemy import Row, update
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime
 
+from src.db.repository.catalog_state_repository import CatalogStateRepository
+from src.db.repository.inventory_event_repository import InventoryEventRepository
 from src.model.product import Product, ProductCreate, ProductUpdate
 
 
 class ProductRepository:
     def __init__(self, session: Session):
         self.session = session
+        self.catalog_state = CatalogStateRepository(session)
+        self.inventory_events = InventoryEventRepository(session)
 
     def create(self, product_data: ProductCreate) -> Product:
         product = Product(**product_data.model_dump())
         self.session.add(product)
+        self.session.flush()
+        self._record_change(product)
+        self.catalog_state.bump()
         self.session.commit()
         self.session.refresh(product)
         return product
@@ -30,19 +38,72 @@ class ProductRepository:
         )
         return self.session.exec(statement).all()
 
+    def get_catalog(self) -> List[Product]:
+        statement = select(Product).order_by(Product.id)
+        return self.session.exec(statement).all()
+
+    def get_active_products(self) -> List[Product]:
+        statement = select(Product).where(Product.is_active == True)
+        return self.session.exec(statement).all()
+
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Product]:
-        statement = select(Product).offset(skip).limit(limit)
+        statement = select(Product).order_by(Product.id).offset(skip).limit(limit)
         return self.session.exec(statement).all()
 
+    def get_page_after(self, product_id: int, limit: int = 100) -> List[Product]:
+        statement = (
+            select(Product).where(Product.id > product_id).order_by(Product.id).limit(limit)
+        )
+        return self.session.exec(statement).all()
+
+    def decrement_stock(self, product_id: int, quantity: int) -> Optional[Row]:
+        # No commit here: callers record the sale in the same transaction.
+        # Returns None when the product is inactive or short on stock.
+        now = datetime.now()
+        statement = (
+            update(Product)
+            .where(
+                Product.id == product_id,
+                Product.is_active == True,
+                Product.stock_quantity >= quantity,
+            )
+            .values(stock_quantity=Product.stock_quantity - quantity, updated_at=now)
+            .returning(Product.id, Product.name, Product.price, Product.stock_quantity)
+        )
+        row = self.session.execute(statement).first()
+        if row is not None:
+            self.inventory_events.record(
+                row.id, row.name, row.stock_quantity, row.price, True, now
+            )
+        return row
+
+    def increment_stock(self, product_id: int, quantity: int) -> Optional[Row]:
+        # Puts held units back; no commit and, unlike restock, no catalog bump.
+        now = datetime.now()
+        statement = (
+            update(Product)
+            .where(Product.id == product_id)
+            .values(stock_quantity=Product.stock_quantity + quantity, updated_at=now)
+            .returning(
+                Product.id,
+                Product.name,
+                Product.price,
+                Product.stock_quantity,
+                Product.is_active,
+            )
+        )
+        row = self.session.execute(statement).first()
+        if row is not None:
+            self.inventory_events.record(
+                row.id, row.name, row.stock_quantity, row.price, row.is_active, now
+            )
+        return row
+
     def update_stock(self, product_id: int, quantity_sold: int) -> Optional[Product]:
-        product = self.get_by_id(product_id)
-        if product and product.stock_quantity >= quantity_sold:
-            product.stock_quantity -= quantity_sold
-            product.updated_at = datetime.now()
-            self.session.commit()
-            self.session.refresh(product)
-            return product
-        return None
+        if self.decrement_stock(product_id, quantity_sold) is None:
+            return None
+        self.session.commit()
+        return self.get_by_id(product_id)
 
     def search_by_name(self, name: str) -> List[Product]:
         statement = select(Product).where(
@@ -57,6 +118,8 @@ class ProductRepository:
             for field, value in product_data.model_dump(exclude_unset=True).items():
                 setattr(product, field, value)
             product.updated_at = datetime.now()
+            self._record_change(product)
+            self.catalog_state.bump()
             self.session.commit()
             self.session.refresh(product)
         return product
@@ -66,6 +129,8 @@ class ProductRepository:
         if product:
             product.is_active = False
             product.updated_at = datetime.now()
+            self._record_change(product)
+            self.catalog_state.bump()
             self.session.commit()
             return True
         return False
@@ -75,9 +140,21 @@ class ProductRepository:
         if product:
             product.stock_quantity += quantity
             product.updated_at = datetime.now()
+            self._record_change(product)
+            self.catalog_state.bump()
             self.session.commit()
             self.session.refresh(product)
         return product
 
+    def _record_change(self, product: Product) -> None:
+        self.inventory_events.record(
+            product.id,
+            product.name,
+            product.stock_quantity,
+            product.price,
+            product.is_active,
+            product.updated_at,
+        )
+
 
 
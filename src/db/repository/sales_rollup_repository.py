@@ -0,0 +1,185 @@
+from sqlalchemy import Integer, cast, delete, extract, func
+from sqlmodel import Session, select
+from typing import List, Optional
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from src.db.dialect import dialect_insert, hour_bucket
+from src.model.machine_stock import DEFAULT_MACHINE_ID
+from src.model.sales_rollup import DailySalesRollup, HourlySalesRollup
+from src.model.transaction import Transaction, TransactionStatus
+
+
+class SalesRollupRepository:
+    """Rollups of one machine when `machine_id` is set, else of every machine."""
+
+    def __init__(self, session: Session, machine_id: Optional[str] = None):
+        self.session = session
+        self.machine_id = machine_id
+
+    def _scoped(self, statement, model):
+        if self.machine_id is None:
+            return statement
+        return statement.where(model.machine_id == self.machine_id)
+
+    def record_sale(
+        self, product_id: int, quantity: int, revenue: Decimal, sold_at: datetime
+    ) -> None:
+        # Upserts only; the caller commits together with the sale itself.
+        hour = sold_at.replace(minute=0, second=0, microsecond=0)
+        buckets = (
+            (HourlySalesRollup, "bucket", hour),
+            (DailySalesRollup, "day", sold_at.date()),
+        )
+        for model, key, value in buckets:
+            table = model.__table__
+            statement = dialect_insert(self.session, table).values(
+                {
+                    key: value,
+                    "product_id": product_id,
+                    "machine_id": self.machine_id or DEFAULT_MACHINE_ID,
+                    "transaction_count": 1,
+                    "items_sold": quantity,
+                    "revenue": revenue,
+                }
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[key, "product_id", "machine_id"],
+                set_={
+                    "transaction_count": table.c.transaction_count + 1,
+                    "items_sold": table.c.items_sold + statement.excluded.items_sold,
+                    "revenue": table.c.revenue + statement.excluded.revenue,
+                },
+            )
+            self.session.execute(statement)
+
+    def get_daily_summary(self, day: date) -> dict:
+        statement = select(
+            func.coalesce(func.sum(DailySalesRollup.transaction_count), 0),
+            func.coalesce(func.sum(DailySalesRollup.revenue), 0),
+            func.coalesce(func.sum(DailySalesRollup.items_sold), 0),
+        ).where(DailySalesRollup.day == day)
+
+        count, revenue, items = self.session.exec(
+            self._scoped(statement, DailySalesRollup)
+        ).one()
+
+        return {
+            "date": day.strftime("%Y-%m-%d"),
+            "total_transactions": int(count),
+            "total_revenue": float(revenue),
+            "total_items_sold": int(items),
+        }
+
+    def get_popular_products(self, days: int = 7) -> List[dict]:
+        since = (datetime.now() - timedelta(days=days)).date()
+        total_quantity = func.sum(DailySalesRollup.items_sold)
+        statement = (
+            select(
+                DailySalesRollup.product_id,
+                total_quantity,
+                func.sum(DailySalesRollup.revenue),
+                func.sum(DailySalesRollup.transaction_count),
+            )
+            .where(DailySalesRollup.day >= since)
+            .group_by(DailySalesRollup.product_id)
+            .order_by(total_quantity.desc())
+        )
+
+        return [
+            {
+                "product_id": product_id,
+                "total_quantity": int(quantity),
+                "total_revenue": float(revenue),
+                "transaction_count": int(count),
+            }
+            for product_id, quantity, revenue, count in self.session.exec(
+                self._scoped(statement, DailySalesRollup)
+            )
+        ]
+
+    def get_hourly_sales_pattern(self, days: int = 7) -> List[dict]:
+        since = (datetime.now() - timedelta(days=days)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        hour = cast(extract("hour", HourlySalesRollup.bucket), Integer)
+        statement = (
+            select(
+                hour,
+                func.sum(HourlySalesRollup.transaction_count),
+                func.sum(HourlySalesRollup.revenue),
+                func.sum(HourlySalesRollup.items_sold),
+            )
+            .where(HourlySalesRollup.bucket >= since)
+            .group_by(hour)
+            .order_by(hour)
+        )
+
+        return [
+            {
+                "hour": hour_of_day,
+                "transaction_count": int(count),
+                "total_revenue": float(revenue),
+                "total_items": int(items),
+            }
+            for hour_of_day, count, revenue, items in self.session.exec(
+                self._scoped(statement, HourlySalesRollup)
+            )
+        ]
+
+    def rebuild(self) -> int:
+        # Recompute both rollups from the transactions table in one transaction.
+        self.session.execute(self._scoped(delete(HourlySalesRollup), HourlySalesRollup))
+        self.session.execute(self._scoped(delete(DailySalesRollup), DailySalesRollup))
+
+        hour = hour_bucket(self.session, Transaction.created_at)
+        statement = (
+            select(
+                hour,
+                Transaction.product_id,
+                Transaction.machine_id,
+                func.count(Transaction.id),
+                func.sum(Transaction.quantity),
+                func.sum(Transaction.total_price),
+            )
+            .where(Transaction.status == TransactionStatus.SUCCESS)
+            .group_by(hour, Transaction.product_id, Transaction.machine_id)
+        )
+        statement = self._scoped(statement, Transaction)
+
+        daily = {}
+        buckets = 0
+        for bucket, product_id, machine_id, count, items, revenue in self.session.exec(statement):
+            if isinstance(bucket, str):
+                bucket = datetime.fromisoformat(bucket)
+            self.session.add(
+                HourlySalesRollup(
+                    bucket=bucket,
+                    product_id=product_id,
+                    machine_id=machine_id,
+                    transaction_count=count,
+                    items_sold=items,
+                    revenue=revenue,
+                )
+            )
+            key = (bucket.date(), product_id, machine_id)
+            totals = daily.setdefault(key, [0, 0, 0])
+            totals[0] += count
+            totals[1] += items
+            totals[2] += revenue
+            buckets += 1
+
+        for (day, product_id, machine_id), (count, items, revenue) in daily.items():
+            self.session.add(
+                DailySalesRollup(
+                    day=day,
+                    product_id=product_id,
+                    machine_id=machine_id,
+                    transaction_count=count,
+                    items_sold=items,
+                    revenue=revenue,
+                )
+            )
+
+        self.session.commit()
+        return buckets
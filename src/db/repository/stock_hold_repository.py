@@ -0,0 +1,48 @@
+from sqlalchemy import Row, delete, insert, select
+from sqlmodel import Session
+from typing import List
+from datetime import datetime
+
+from src.model.stock_hold import StockHold
+
+
+HOLD_COLUMNS = (
+    StockHold.machine_id,
+    StockHold.product_id,
+    StockHold.transaction_id,
+    StockHold.quantity,
+)
+
+
+class StockHoldRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add_many(self, holds: List[dict]) -> None:
+        # No commit: holds are written with the sale that places them.
+        self.session.execute(insert(StockHold.__table__), holds)
+
+    def claim(self, reservation_id: str) -> List[Row]:
+        # DELETE ... RETURNING: whoever deletes a hold settles it, so a
+        # confirm racing the sweeper can never both restock and sell.
+        statement = (
+            delete(StockHold)
+            .where(StockHold.reservation_id == reservation_id)
+            .returning(*HOLD_COLUMNS)
+        )
+        return self.session.execute(statement).all()
+
+    def claim_expired(self, now: datetime, limit: int) -> List[Row]:
+        # Oldest first through the expires_at index; never scans open holds.
+        expired = (
+            select(StockHold.id)
+            .where(StockHold.expires_at <= now)
+            .order_by(StockHold.expires_at)
+            .limit(limit)
+        )
+        statement = (
+            delete(StockHold)
+            .where(StockHold.id.in_(expired.scalar_subquery()))
+            .returning(*HOLD_COLUMNS)
+        )
+        return self.session.execute(statement).all()
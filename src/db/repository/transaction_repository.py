@@ -1,5 +1,6 @@
+from sqlalchemy import Integer, Row, cast, extract, func, tuple_, update
 from sqlmodel import Session, select
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from datetime import datetime, timedelta
 
 from src.model.transaction import (
@@ -11,8 +12,16 @@ from src.model.transaction import (
 
 
 class TransactionRepository:
-    def __init__(self, session: Session):
+    """Transactions of one machine when `machine_id` is set, else of every machine."""
+
+    def __init__(self, session: Session, machine_id: Optional[str] = None):
         self.session = session
+        self.machine_id = machine_id
+
+    def _scoped(self, statement):
+        if self.machine_id is None:
+            return statement
+        return statement.where(Transaction.machine_id == self.machine_id)
 
     def create(self, transaction_data: TransactionCreate) -> Transaction:
         transaction = Transaction(**transaction_data.model_dump())
@@ -21,14 +30,62 @@ class TransactionRepository:
         self.session.refresh(transaction)
         return transaction
 
+    def add(
+        self,
+        transaction_data: TransactionCreate,
+        status: TransactionStatus = TransactionStatus.PENDING,
+    ) -> Transaction:
+        transaction = Transaction(**transaction_data.model_dump(), status=status)
+        self.session.add(transaction)
+        return transaction
+
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Transaction]:
         statement = (
             select(Transaction)
             .offset(skip)
             .limit(limit)
-            .order_by(Transaction.created_at.desc())
+            .order_by(Transaction.created_at.desc(), Transaction.id.desc())
         )
-        return self.session.exec(statement).all()
+        return self.session.exec(self._scoped(statement)).all()
+
+    def get_page_after(
+        self, created_at: datetime, transaction_id: int, limit: int = 100
+    ) -> List[Transaction]:
+        # Keyset pagination: seeks straight to (created_at, id) through the
+        # created_at index, so deep pages cost the same as the first one.
+        statement = (
+            select(Transaction)
+            .where(
+                tuple_(Transaction.created_at, Transaction.id)
+                < tuple_(created_at, transaction_id)
+            )
+            .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+            .limit(limit)
+        )
+        return self.session.exec(self._scoped(statement)).all()
+
+    def stream(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        status: Optional[TransactionStatus] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Row]:
+        # Plain column rows fetched batch_size at a time: no ORM identity map,
+        # and memory stays flat however many rows match.
+        statement = self._scoped(
+            select(*Transaction.__table__.columns).order_by(
+                Transaction.created_at, Transaction.id
+            )
+        )
+        if start_date:
+            statement = statement.where(Transaction.created_at >= start_date)
+        if end_date:
+            statement = statement.where(Transaction.created_at < end_date)
+        if status:
+            statement = statement.where(Transaction.status == status)
+        statement = statement.execution_options(stream_results=True, yield_per=batch_size)
+        yield from self.session.execute(statement)
 
     def get_by_id(self, transaction_id: int) -> Optional[Transaction]:
         return self.session.get(Transaction, transaction_id)
@@ -40,36 +97,35 @@ class TransactionRepository:
             .where(Transaction.created_at >= since)
             .order_by(Transaction.created_at.desc())
         )
-        return self.session.exec(statement).all()
+        return self.session.exec(self._scoped(statement)).all()
 
     def get_successful_transactions(
         self, start_date: Optional[datetime] = None
     ) -> List[Transaction]:
-        statement = select(Transaction).where(
-            Transaction.status == TransactionStatus.SUCCESS
+        statement = (
+            select(Transaction)
+            .where(Transaction.status == TransactionStatus.SUCCESS)
+            .order_by(Transaction.created_at.desc())
         )
         if start_date:
             statement = statement.where(Transaction.created_at >= start_date)
-        return (
-            self.session.exec(statement).order_by(Transaction.created_at.desc()).all()
-        )
+        return self.session.exec(self._scoped(statement)).all()
 
     def get_sales_by_product(self, product_id: int) -> List[Transaction]:
         statement = select(Transaction).where(
             Transaction.product_id == product_id,
             Transaction.status == TransactionStatus.SUCCESS,
         )
-        return self.session.exec(statement).all()
+        return self.session.exec(self._scoped(statement)).all()
 
     def get_total_sales(self, start_date: Optional[datetime] = None) -> float:
-        statement = select(Transaction).where(
+        statement = select(func.coalesce(func.sum(Transaction.total_price), 0)).where(
             Transaction.status == TransactionStatus.SUCCESS
         )
         if start_date:
             statement = statement.where(Transaction.created_at >= start_date)
 
-        transactions = self.session.exec(statement).all()
-        return sum(float(t.total_price) for t in transactions)
+        return float(self.session.exec(self._scoped(statement)).one())
 
     def get_daily_sales_summary(self, date: Optional[datetime] = None) -> dict:
         if date is None:
@@ -78,20 +134,23 @@ class TransactionRepository:
         start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
         end_of_day = start_of_day + timedelta(days=1)
 
-        statement = select(Transaction).where(
+        statement = select(
+            func.count(Transaction.id),
+            func.coalesce(func.sum(Transaction.total_price), 0),
+            func.coalesce(func.sum(Transaction.quantity), 0),
+        ).where(
             Transaction.created_at >= start_of_day,
             Transaction.created_at < end_of_day,
             Transaction.status == TransactionStatus.SUCCESS,
         )
 
-        transactions = self.session.exec(statement).all()
+        count, revenue, items = self.session.exec(self._scoped(statement)).one()
 
         return {
             "date": date.strftime("%Y-%m-%d"),
-            "total_transactions": len(transactions),
-            "total_revenue": sum(float(t.total_price) for t in transactions),
-            "total_items_sold": sum(t.quantity for t in transactions),
-            "transactions": transactions,
+            "total_transactions": count,
+            "total_revenue": float(revenue),
+            "total_items_sold": int(items),
         }
 
     def get_failed_transactions(self, hours: int = 24) -> List[Transaction]:
@@ -104,11 +163,11 @@ class TransactionRepository:
             )
             .order_by(Transaction.created_at.desc())
         )
-        return self.session.exec(statement).all()
+        return self.session.exec(self._scoped(statement)).all()
 
     def get_transactions_by_intent(self, intent: UserIntent) -> List[Transaction]:
         statement = select(Transaction).where(Transaction.intent == intent)
-        return self.session.exec(statement).all()
+        return self.session.exec(self._scoped(statement)).all()
 
     def update_status(
         self, transaction_id: int, status: TransactionStatus
@@ -120,54 +179,85 @@ class TransactionRepository:
             self.session.refresh(transaction)
         return transaction
 
+    def resolve_pending(
+        self, transaction_ids: List[int], status: TransactionStatus
+    ) -> List[Row]:
+        # No commit; only PENDING rows move, so a sale is never settled twice.
+        statement = (
+            update(Transaction)
+            .where(
+                Transaction.id.in_(transaction_ids),
+                Transaction.status == TransactionStatus.PENDING,
+            )
+            .values(status=status)
+            .returning(
+                Transaction.id,
+                Transaction.machine_id,
+                Transaction.product_id,
+                Transaction.quantity,
+                Transaction.unit_price,
+                Transaction.total_price,
+                Transaction.created_at,
+            )
+        )
+        return self.session.execute(statement).all()
+
     def get_popular_products(self, days: int = 7) -> List[dict]:
         since = datetime.now() - timedelta(days=days)
-        statement = select(Transaction).where(
-            Transaction.status == TransactionStatus.SUCCESS,
-            Transaction.created_at >= since,
+        total_quantity = func.sum(Transaction.quantity)
+        statement = (
+            select(
+                Transaction.product_id,
+                total_quantity,
+                func.sum(Transaction.total_price),
+                func.count(Transaction.id),
+            )
+            .where(
+                Transaction.status == TransactionStatus.SUCCESS,
+                Transaction.created_at >= since,
+            )
+            .group_by(Transaction.product_id)
+            .order_by(total_quantity.desc())
         )
 
-        transactions = self.session.exec(statement).all()
-
-        product_sales = {}
-        for transaction in transactions:
-            product_id = transaction.product_id
-            if product_id not in product_sales:
-                product_sales[product_id] = {
-                    "product_id": product_id,
-                    "total_quantity": 0,
-                    "total_revenue": 0.0,
-                    "transaction_count": 0,
-                }
-            product_sales[product_id]["total_quantity"] += transaction.quantity
-            product_sales[product_id]["total_revenue"] += float(transaction.total_price)
-            product_sales[product_id]["transaction_count"] += 1
-
-        return sorted(
-            product_sales.values(), key=lambda x: x["total_quantity"], reverse=True
-        )
+        return [
+            {
+                "product_id": product_id,
+                "total_quantity": int(quantity),
+                "total_revenue": float(revenue),
+                "transaction_count": count,
+            }
+            for product_id, quantity, revenue, count in self.session.exec(
+                self._scoped(statement)
+            )
+        ]
 
     def get_hourly_sales_pattern(self, days: int = 7) -> List[dict]:
         since = datetime.now() - timedelta(days=days)
-        statement = select(Transaction).where(
-            Transaction.status == TransactionStatus.SUCCESS,
-            Transaction.created_at >= since,
+        hour = cast(extract("hour", Transaction.created_at), Integer)
+        statement = (
+            select(
+                hour,
+                func.count(Transaction.id),
+                func.sum(Transaction.total_price),
+                func.sum(Transaction.quantity),
+            )
+            .where(
+                Transaction.status == TransactionStatus.SUCCESS,
+                Transaction.created_at >= since,
+            )
+            .group_by(hour)
+            .order_by(hour)
         )
 
-        transactions = self.session.exec(statement).all()
-
-        hourly_sales = {}
-        for transaction in transactions:
-            hour = transaction.created_at.hour
-            if hour not in hourly_sales:
-                hourly_sales[hour] = {
-                    "hour": hour,
-                    "transaction_count": 0,
-                    "total_revenue": 0.0,
-                    "total_items": 0,
-                }
-            hourly_sales[hour]["transaction_count"] += 1
-            hourly_sales[hour]["total_revenue"] += float(transaction.total_price)
-            hourly_sales[hour]["total_items"] += transaction.quantity
-
-        return sorted(hourly_sales.values(), key=lambda x: x["hour"])
+        return [
+            {
+                "hour": hour_of_day,
+                "transaction_count": count,
+                "total_revenue": float(revenue),
+                "total_items": int(items),
+            }
+            for hour_of_day, count, revenue, items in self.session.exec(
+                self._scoped(statement)
+            )
+        ]
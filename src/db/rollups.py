@@ -0,0 +1,17 @@
+import time
+from sqlmodel import Session
+
+import src.db.base  # noqa: F401
+from src.db.database import sql_engine
+from src.db.repository.sales_rollup_repository import SalesRollupRepository
+
+
+def rebuild_sales_rollups() -> int:
+    with Session(sql_engine) as session:
+        return SalesRollupRepository(session).rebuild()
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    buckets = rebuild_sales_rollups()
+    print(f"Rebuilt {buckets} hourly sales buckets in {time.perf_counter() - started:.2f}s")
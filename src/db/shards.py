@@ -0,0 +1,147 @@
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel, Session
+
+from src.db.database import (
+    async_engine,
+    build_async_engine,
+    build_engine,
+    sql_engine,
+    to_async_url,
+)
+from src.model.machine_stock import DEFAULT_MACHINE_ID, MachineStock
+from src.model.sales_rollup import DailySalesRollup, HourlySalesRollup
+from src.model.stock_hold import StockHold
+from src.model.transaction import Transaction
+from src.settings import SHARD_COUNT, SHARD_DATABASE_URL, SHARD_ENGINE_CACHE_SIZE
+
+
+# Everything a sale writes. Products, aliases and the catalog version stay in
+# DATABASE_URL and are read through the catalog snapshot.
+SHARD_TABLES = [
+    MachineStock.__table__,
+    Transaction.__table__,
+    HourlySalesRollup.__table__,
+    DailySalesRollup.__table__,
+    StockHold.__table__,
+]
+
+
+class ShardNotFound(LookupError):
+    """The machine's shard database has not been created yet."""
+
+
+class ShardRouter:
+    """Picks the database that holds a machine's stock, transactions and rollups.
+
+    The default machine, and every machine when there is no `url_template`,
+    live in DATABASE_URL. Otherwise "{machine_id}" in the template gives each
+    machine its own database and "{shard}" hashes machines onto `shard_count`
+    of them, so sales on different machines take different write locks.
+
+    Shard databases and their tables are only created by stock writes
+    (`create=True`); any other lookup of a missing one raises ShardNotFound.
+    At most `max_engines` shards keep their engines open, least recently used
+    first out.
+    """
+
+    def __init__(self, url_template: Optional[str], shard_count: int, max_engines: int):
+        self.url_template = url_template
+        self.shard_count = max(1, shard_count)
+        self.max_engines = max(1, max_engines)
+        self._engines: "OrderedDict[str, Tuple[Engine, AsyncEngine]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def url_for(self, machine_id: Optional[str]) -> Optional[str]:
+        # None means DATABASE_URL.
+        if self.url_template is None or machine_id in (None, DEFAULT_MACHINE_ID):
+            return None
+        if "{machine_id}" in self.url_template:
+            return self.url_template.replace("{machine_id}", machine_id)
+        # crc32 rather than hash(): every replica has to agree on the shard.
+        shard = zlib.crc32(machine_id.encode()) % self.shard_count
+        return self.url_template.replace("{shard}", str(shard))
+
+    def engine_for(self, machine_id: Optional[str], create: bool = False) -> Engine:
+        url = self.url_for(machine_id)
+        return sql_engine if url is None else self._engines_for(url, create)[0]
+
+    def async_engine_for(self, machine_id: Optional[str], create: bool = False) -> AsyncEngine:
+        url = self.url_for(machine_id)
+        return async_engine if url is None else self._engines_for(url, create)[1]
+
+    @contextmanager
+    def stock_session(
+        self, machine_id: Optional[str], session: Session, create: bool = False
+    ) -> Iterator[Session]:
+        # Machines in DATABASE_URL reuse the caller's session, so a sale stays
+        # a single commit there.
+        if self.url_for(machine_id) is None:
+            yield session
+            return
+        with Session(self.engine_for(machine_id, create)) as stock_session:
+            yield stock_session
+
+    def async_engines(self) -> List[AsyncEngine]:
+        """DATABASE_URL and the shard databases this replica has open."""
+        # "{shard}" shards are all known up front; "{machine_id}" ones only
+        # while a recent request for that machine keeps them open.
+        if self.url_template is not None and "{machine_id}" not in self.url_template:
+            for shard in range(self.shard_count):
+                try:
+                    self._engines_for(self.url_template.replace("{shard}", str(shard)))
+                except ShardNotFound:
+                    pass
+        with self._lock:
+            shard_engines = [engines[1] for engines in self._engines.values()]
+        return [async_engine] + shard_engines
+
+    async def dispose(self) -> None:
+        with self._lock:
+            open_engines = list(self._engines.values())
+            self._engines.clear()
+        for engine, shard_async_engine in open_engines:
+            engine.dispose()
+            await shard_async_engine.dispose()
+
+    def _engines_for(self, url: str, create: bool = False) -> Tuple[Engine, AsyncEngine]:
+        with self._lock:
+            engines = self._engines.get(url)
+            if engines is not None:
+                self._engines.move_to_end(url)
+                return engines
+            if not create and not _database_exists(url):
+                raise ShardNotFound(url)
+            engine = build_engine(url)
+            SQLModel.metadata.create_all(engine, tables=SHARD_TABLES)
+            engines = (engine, build_async_engine(to_async_url(url)))
+            self._engines[url] = engines
+            while len(self._engines) > self.max_engines:
+                _close(self._engines.popitem(last=False)[1])
+        return engines
+
+
+def _database_exists(url: str) -> bool:
+    parsed = make_url(url)
+    # Server databases are provisioned outside the app; only files can be missing.
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        return True
+    return os.path.exists(parsed.database)
+
+
+def _close(engines: Tuple[Engine, AsyncEngine]) -> None:
+    engine, shard_async_engine = engines
+    engine.dispose()
+    # AsyncEngine.dispose() needs the event loop. Dropping the pool is enough:
+    # its aiosqlite connections close once the requests using them are done.
+    shard_async_engine.sync_engine.dispose(close=False)
+
+
+shard_router = ShardRouter(SHARD_DATABASE_URL, SHARD_COUNT, SHARD_ENGINE_CACHE_SIZE)
@@ -1,10 +1,83 @@
+import asyncio
+import logging
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from src.api import api_router
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src.core.audit_log import chat_audit_log
+from src.core.idempotency import idempotency_store
+from src.core.inventory_feed import inventory_feed
+from src.core.tracing import TracingMiddleware
+from src.db.database import async_engine
+from src.db.shards import shard_router
+from src.service.reservation_service import ReservationService
+from src.settings import (
+    IDEMPOTENCY_SWEEP_SECONDS,
+    LOG_LEVEL,
+    RESERVATION_SWEEP_BATCH_SIZE,
+    RESERVATION_SWEEP_SECONDS,
+    RESERVATIONS_ENABLED,
+)
 
-app = FastAPI(title="Modular Boilerplate")
+# Only the application's loggers; SQLAlchemy and uvicorn configure their own.
+_handler = logging.StreamHandler()
+_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+logging.getLogger("src").addHandler(_handler)
+logging.getLogger("src").setLevel(LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+
+async def sweep_idempotency_keys():
+    while True:
+        await asyncio.sleep(IDEMPOTENCY_SWEEP_SECONDS)
+        try:
+            async with AsyncSession(async_engine) as session:
+                await session.run_sync(idempotency_store.sweep)
+        except Exception:
+            logger.exception("Idempotency key sweep failed")
+
+
+def _sweep_stock_hold_batch(session) -> int:
+    return ReservationService(session).sweep(RESERVATION_SWEEP_BATCH_SIZE)
+
+
+async def sweep_stock_holds():
+    while True:
+        await asyncio.sleep(RESERVATION_SWEEP_SECONDS)
+        for engine in shard_router.async_engines():
+            try:
+                async with AsyncSession(engine) as session:
+                    # A short batch means this database has caught up.
+                    while await session.run_sync(_sweep_stock_hold_batch) == RESERVATION_SWEEP_BATCH_SIZE:
+                        pass
+            except Exception:
+                logger.exception("Stock hold sweep failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweepers = [asyncio.create_task(sweep_idempotency_keys())]
+    if RESERVATIONS_ENABLED:
+        sweepers.append(asyncio.create_task(sweep_stock_holds()))
+    if chat_audit_log is not None:
+        chat_audit_log.start()
+    await inventory_feed.start()
+    yield
+    await inventory_feed.close()
+    for sweeper in sweepers:
+        sweeper.cancel()
+    if chat_audit_log is not None:
+        # Write out whatever is still queued before the engine goes away.
+        await chat_audit_log.close()
+    await async_engine.dispose()
+    await shard_router.dispose()
+
+
+app = FastAPI(title="Modular Boilerplate", lifespan=lifespan)
+app.add_middleware(TracingMiddleware)
 
 app.include_router(api_router, prefix="/api")
 
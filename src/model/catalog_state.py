@@ -0,0 +1,10 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+
+class CatalogState(SQLModel, table=True):
+    __tablename__ = "catalog_state"
+
+    id: int = Field(default=1, primary_key=True)
+    version: int = Field(default=0, description="Bumped on every catalog write")
+    updated_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,23 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+from src.model.transaction import UserIntent
+
+
+class ChatAudit(SQLModel, table=True):
+    __tablename__ = "chat_audit"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
+    user_message: str = Field(description="Original user message")
+    intent: UserIntent = Field(index=True)
+    product_name: Optional[str] = Field(default=None)
+    quantity: Optional[int] = Field(default=None)
+    confidence: Optional[float] = Field(default=None, description="AI confidence level")
+    parse_path: Optional[str] = Field(default=None, max_length=20)
+    success: bool
+    transaction_ids: Optional[str] = Field(default=None, description="JSON list of transaction ids")
+    parse_ms: float = Field(description="Time spent parsing the message")
+    total_ms: float = Field(description="Time spent serving the chat request")
+
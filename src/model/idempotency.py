@@ -0,0 +1,22 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+
+
+class IdempotencyStatus(str, Enum):
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+
+
+class IdempotencyKey(SQLModel, table=True):
+    __tablename__ = "idempotency_keys"
+
+    scope: str = Field(primary_key=True, max_length=50, description="Endpoint the key belongs to")
+    key: str = Field(primary_key=True, max_length=255)
+    fingerprint: str = Field(max_length=64, description="SHA-256 of the request body")
+    status: IdempotencyStatus = Field(default=IdempotencyStatus.IN_PROGRESS)
+    status_code: Optional[int] = Field(default=None)
+    response: Optional[str] = Field(default=None, description="Stored response body as JSON")
+    created_at: datetime = Field(default_factory=datetime.now)
+    expires_at: datetime = Field(index=True)
@@ -0,0 +1,25 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from decimal import Decimal
+from datetime import datetime
+
+
+class InventoryEvent(SQLModel, table=True):
+    """A product write, as the inventory feed streams it.
+
+    Rows carry the product's new stock, price and active flag rather than a
+    difference, so applying one twice is harmless. `seq` is the event id
+    feed clients resume from; AUTOINCREMENT keeps it from being reused once
+    old rows are pruned.
+    """
+
+    __tablename__ = "inventory_events"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq: Optional[int] = Field(default=None, primary_key=True)
+    product_id: int = Field(foreign_key="products.id")
+    name: str = Field(max_length=100)
+    stock_quantity: int
+    price: Decimal = Field(decimal_places=2)
+    is_active: bool
+    created_at: datetime
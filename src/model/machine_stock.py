@@ -0,0 +1,29 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+
+# The machine whose stock is Product.stock_quantity; every other machine
+# keeps its own rows in machine_stock.
+DEFAULT_MACHINE_ID = "default"
+# Machine ids end up in shard database file names.
+MACHINE_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+
+
+class MachineStock(SQLModel, table=True):
+    __tablename__ = "machine_stock"
+
+    machine_id: str = Field(primary_key=True, max_length=64)
+    product_id: int = Field(primary_key=True, foreign_key="products.id")
+    stock_quantity: int = Field(default=0, ge=0, description="Units loaded in this machine")
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+class MachineStockUpdate(SQLModel):
+    stock_quantity: int = Field(ge=0)
+
+
+class MachineStockResponse(SQLModel):
+    machine_id: str
+    product_id: int
+    stock_quantity: int
+    updated_at: datetime
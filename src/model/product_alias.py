@@ -0,0 +1,36 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+# Aliases every product with one of these names starts with, keyed by the
+# casefolded name. Products created before the aliases table got them in its
+# migration (d2b6e8a41f57).
+DEFAULT_ALIASES = {
+    "coca-cola": ("coke", "coca cola", "cola"),
+    "fanta orange": ("fanta",),
+    "guarana antarctica": ("guarana",),
+}
+
+
+class ProductAliasBase(SQLModel):
+    alias: str = Field(min_length=1, max_length=100, description="Alternative name customers use")
+
+
+class ProductAlias(ProductAliasBase, table=True):
+    __tablename__ = "product_aliases"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    product_id: int = Field(foreign_key="products.id", index=True)
+    alias: str = Field(max_length=100, unique=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class ProductAliasCreate(ProductAliasBase):
+    pass
+
+
+class ProductAliasResponse(ProductAliasBase):
+    id: int
+    product_id: int
+    created_at: datetime
@@ -1,7 +1,10 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
+from datetime import datetime
 from enum import Enum
 
+from src.model.machine_stock import MACHINE_ID_PATTERN
+
 
 class UserIntent(str, Enum):
     PURCHASE = "purchase"
@@ -10,11 +13,27 @@ class UserIntent(str, Enum):
     UNKNOWN = "unknown"
 
 
+class ParsePath(str, Enum):
+    FAST = "fast"
+    CACHE = "cache"
+    LLM = "llm"
+    FALLBACK = "fallback"
+
+
+class LineItem(BaseModel):
+    product_name: str = Field(description="Name of the soda product")
+    quantity: int = Field(description="Quantity requested", ge=1)
+
+
 class PurchaseIntent(BaseModel):
     intent: UserIntent = Field(description="User's intent")
     product_name: Optional[str] = Field(description="Name of the soda product")
     quantity: Optional[int] = Field(description="Quantity requested", ge=1)
     confidence: float = Field(description="Confidence level 0-1", ge=0, le=1)
+    items: List[LineItem] = Field(
+        default_factory=list,
+        description="Every product and quantity when the user orders more than one product",
+    )
 
     class Config:
         json_schema_extra = {
@@ -28,9 +47,29 @@ class PurchaseIntent(BaseModel):
             ]
         }
 
+    def line_items(self) -> List[LineItem]:
+        if self.items:
+            return list(self.items)
+        if self.product_name and self.quantity:
+            return [LineItem(product_name=self.product_name, quantity=self.quantity)]
+        return []
+
+
+class BatchedIntent(PurchaseIntent):
+    message_index: int = Field(description="Number of the message this intent answers", ge=0)
+
+
+class IntentBatch(BaseModel):
+    intents: List[BatchedIntent] = Field(description="One intent per numbered message")
+
 
 class ChatRequest(BaseModel):
     message: str
+    machine_id: Optional[str] = Field(
+        default=None,
+        pattern=MACHINE_ID_PATTERN,
+        description="Machine to sell from; the default machine when omitted",
+    )
 
 
 class AIResponse(BaseModel):
@@ -38,5 +77,54 @@ class AIResponse(BaseModel):
     message: str
     purchase_intent: Optional[PurchaseIntent] = None
     transaction_id: Optional[int] = None
+    transaction_ids: Optional[List[int]] = None
     total_price: Optional[float] = None
     products: Optional[List[dict]] = None
+    parse_path: Optional[ParsePath] = None
+    reservation_id: Optional[str] = None
+    reserved_until: Optional[datetime] = None
+
+
+class BulkPurchaseItem(BaseModel):
+    product_id: int
+    quantity: int = Field(ge=1)
+
+
+class BulkPurchaseRequest(BaseModel):
+    items: List[BulkPurchaseItem] = Field(min_length=1)
+    reference: Optional[str] = Field(
+        default=None, max_length=255, description="POS order reference stored on each transaction"
+    )
+    machine_id: Optional[str] = Field(
+        default=None,
+        pattern=MACHINE_ID_PATTERN,
+        description="Machine to sell from; the default machine when omitted",
+    )
+
+
+class PurchasedItem(BaseModel):
+    product_id: int
+    product_name: str
+    quantity: int
+    unit_price: float
+    total_price: float
+    transaction_id: int
+
+
+class BulkPurchaseResponse(BaseModel):
+    items: List[PurchasedItem]
+    total_price: float
+    reservation_id: Optional[str] = None
+    reserved_until: Optional[datetime] = None
+
+
+class ReservationStatus(str, Enum):
+    CONFIRMED = "confirmed"
+    RELEASED = "released"
+
+
+class ReservationResponse(BaseModel):
+    reservation_id: str
+    status: ReservationStatus
+    items: List[PurchasedItem]
+    total_price: float
@@ -0,0 +1,27 @@
+from sqlmodel import SQLModel, Field
+from datetime import date, datetime
+from decimal import Decimal
+
+from src.model.machine_stock import DEFAULT_MACHINE_ID
+
+
+class HourlySalesRollup(SQLModel, table=True):
+    __tablename__ = "sales_rollup_hourly"
+
+    bucket: datetime = Field(primary_key=True, description="Start of the hour")
+    product_id: int = Field(primary_key=True, foreign_key="products.id")
+    machine_id: str = Field(primary_key=True, default=DEFAULT_MACHINE_ID, max_length=64)
+    transaction_count: int = Field(default=0)
+    items_sold: int = Field(default=0)
+    revenue: Decimal = Field(default=0, decimal_places=2)
+
+
+class DailySalesRollup(SQLModel, table=True):
+    __tablename__ = "sales_rollup_daily"
+
+    day: date = Field(primary_key=True)
+    product_id: int = Field(primary_key=True, foreign_key="products.id")
+    machine_id: str = Field(primary_key=True, default=DEFAULT_MACHINE_ID, max_length=64)
+    transaction_count: int = Field(default=0)
+    items_sold: int = Field(default=0)
+    revenue: Decimal = Field(default=0, decimal_places=2)
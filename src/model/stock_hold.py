@@ -0,0 +1,22 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class StockHold(SQLModel, table=True):
+    """Units taken off a machine's stock until the dispenser reports back.
+
+    Only open holds are stored: confirming, releasing or expiring one deletes
+    its row, and the PENDING transaction it guards records the outcome.
+    """
+
+    __tablename__ = "stock_holds"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    reservation_id: str = Field(index=True, max_length=100)
+    machine_id: str = Field(max_length=64)
+    product_id: int = Field(foreign_key="products.id")
+    transaction_id: int = Field(foreign_key="transactions.id")
+    quantity: int = Field(gt=0)
+    expires_at: datetime = Field(index=True)
+
@@ -1,9 +1,12 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
 
+from src.model.machine_stock import DEFAULT_MACHINE_ID
+
 if TYPE_CHECKING:
     from src.model.product import Product
 
@@ -14,6 +17,11 @@ class TransactionStatus(str, Enum):
     PENDING = "pending"
 
 
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
 class UserIntent(str, Enum):
     PURCHASE = "purchase"
     CHECK_STOCK = "check_stock"
@@ -27,16 +35,41 @@ class TransactionBase(SQLModel):
     unit_price: Decimal = Field(decimal_places=2, description="Unit price at sale time")
     total_price: Decimal = Field(decimal_places=2, description="Total price")
     user_message: str = Field(description="Original user message")
+    machine_id: str = Field(
+        default=DEFAULT_MACHINE_ID, max_length=64, description="Machine that made the sale"
+    )
 
 
 class Transaction(TransactionBase, table=True):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Trailing columns make the analytics aggregates index-only.
+        Index(
+            "ix_transactions_status_created_at",
+            "status",
+            "created_at",
+            "product_id",
+            "quantity",
+            "total_price",
+        ),
+        Index("ix_transactions_product_id_status", "product_id", "status"),
+        Index(
+            "ix_transactions_machine_id_status_created_at",
+            "machine_id",
+            "status",
+            "created_at",
+            "product_id",
+            "quantity",
+            "total_price",
+        ),
+        Index("ix_transactions_machine_id_created_at", "machine_id", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     status: TransactionStatus = Field(default=TransactionStatus.PENDING)
-    intent: UserIntent = Field(default=UserIntent.PURCHASE)
+    intent: UserIntent = Field(default=UserIntent.PURCHASE, index=True)
     confidence: Optional[float] = Field(default=None, description="AI confidence level")
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
 
     product: Optional["Product"] = Relationship(back_populates="transactions")
 
@@ -0,0 +1,63 @@
+from sqlmodel import Session
+from typing import List, Optional
+
+from src.core.catalog import catalog
+from src.db.repository.machine_stock_repository import MachineStockRepository
+from src.db.repository.product_repository import ProductRepository
+from src.model.machine_stock import DEFAULT_MACHINE_ID, MachineStockResponse
+from src.model.product import ProductResponse, ProductUpdate
+
+
+class MachineService:
+    """Stock of one machine; the default machine's is Product.stock_quantity."""
+
+    def __init__(self, session: Session, machine_id: str, stock_session: Optional[Session] = None):
+        self.session = session
+        self.machine_id = machine_id
+        self.product_repo = ProductRepository(session)
+        self.stock_repo = MachineStockRepository(
+            stock_session if stock_session is not None else session, machine_id
+        )
+
+    @property
+    def is_default(self) -> bool:
+        return self.machine_id == DEFAULT_MACHINE_ID
+
+    def list_products(self, available_only: bool = False) -> List[ProductResponse]:
+        snapshot = catalog.get(self.session)
+        if self.is_default:
+            return snapshot.available() if available_only else list(snapshot.active)
+        levels = self.stock_repo.get_levels()
+        products = [
+            product.model_copy(update={"stock_quantity": levels.get(product.id, 0)})
+            for product in snapshot.active
+        ]
+        if available_only:
+            return [product for product in products if product.stock_quantity > 0]
+        return products
+
+    def set_stock(self, product_id: int, quantity: int) -> Optional[MachineStockResponse]:
+        product = self.product_repo.get_by_id(product_id)
+        if not product or not product.is_active:
+            return None
+        if self.is_default:
+            update = ProductUpdate(stock_quantity=quantity)
+            return self._restocked(self.product_repo.update(product_id, update))
+        return MachineStockResponse.model_validate(self.stock_repo.set_stock(product_id, quantity))
+
+    def restock(self, product_id: int, quantity: int) -> Optional[MachineStockResponse]:
+        product = self.product_repo.get_by_id(product_id)
+        if not product or not product.is_active:
+            return None
+        if self.is_default:
+            return self._restocked(self.product_repo.restock(product_id, quantity))
+        return MachineStockResponse.model_validate(self.stock_repo.restock(product_id, quantity))
+
+    def _restocked(self, product) -> MachineStockResponse:
+        catalog.invalidate()
+        return MachineStockResponse(
+            machine_id=self.machine_id,
+            product_id=product.id,
+            stock_quantity=product.stock_quantity,
+            updated_at=product.updated_at,
+        )
@@ -1,18 +1,46 @@
 from sqlmodel import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from src.core.catalog import catalog
+from src.core.http_cache import CacheValidator
+from src.core.pagination import InvalidCursor, decode_cursor, next_cursor
+
+from src.db.repository.inventory_event_repository import InventoryEventRepository
+from src.db.repository.product_alias_repository import ProductAliasRepository
 from src.db.repository.product_repository import ProductRepository
 from src.model.product import Product, ProductCreate, ProductUpdate, ProductResponse
+from src.model.product_alias import DEFAULT_ALIASES, ProductAliasCreate, ProductAliasResponse
+from src.settings import PRODUCTS_CACHE_MAX_AGE_SECONDS
+
+
+class AliasInUse(ValueError):
+    pass
 
 
 class ProductService:
     def __init__(self, session: Session):
+        self.session = session
         self.repo = ProductRepository(session)
+        self.alias_repo = ProductAliasRepository(session)
 
     def create_product(self, product_data: ProductCreate) -> ProductResponse:
         product = self.repo.create(product_data)
+        self.alias_repo.create_missing(product.id, DEFAULT_ALIASES.get(product.name.casefold(), ()))
+        catalog.invalidate()
         return ProductResponse.model_validate(product)
 
+    def get_cache_validator(self) -> CacheValidator:
+        # Every product write, sales included, logs an inventory event, so the
+        # newest one versions all product reads; one primary key lookup.
+        last = InventoryEventRepository(self.session).get_last()
+        seq, changed_at = (last.seq, last.created_at) if last is not None else (0, None)
+        cache_control = (
+            f"public, max-age={PRODUCTS_CACHE_MAX_AGE_SECONDS}"
+            if PRODUCTS_CACHE_MAX_AGE_SECONDS > 0
+            else "no-cache"
+        )
+        return CacheValidator(seq, changed_at, cache_control)
+
     def get_product(self, product_id: int) -> Optional[ProductResponse]:
         product = self.repo.get_by_id(product_id)
         return ProductResponse.model_validate(product) if product else None
@@ -20,28 +48,68 @@ class ProductService:
     def get_all_products(
         self, skip: int = 0, limit: int = 100
     ) -> List[ProductResponse]:
-        products = self.repo.get_all(skip, limit)
-        return [ProductResponse.model_validate(p) for p in products]
+        return catalog.get(self.session).page(skip, limit)
 
-    def get_available_products(self) -> List[ProductResponse]:
-        products = self.repo.get_available_products()
-        return [ProductResponse.model_validate(p) for p in products]
+    def get_product_page(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        min_seq: int = 0,
+    ) -> Tuple[List[ProductResponse], Optional[str]]:
+        if cursor:
+            (product_id,) = decode_cursor(cursor, 1)
+            if not isinstance(product_id, int):
+                raise InvalidCursor("Malformed cursor")
+            products = catalog.get(self.session, min_seq).page_after(product_id, limit)
+        else:
+            products = catalog.get(self.session, min_seq).page(skip, limit)
+        return products, next_cursor(products, limit, "id")
+
+    def get_available_products(self, min_seq: int = 0) -> List[ProductResponse]:
+        return catalog.get(self.session, min_seq).available()
 
     def update_product(
         self, product_id: int, product_data: ProductUpdate
     ) -> Optional[ProductResponse]:
         product = self.repo.update(product_id, product_data)
+        catalog.invalidate()
         return ProductResponse.model_validate(product) if product else None
 
     def delete_product(self, product_id: int) -> bool:
-        return self.repo.delete(product_id)
+        deleted = self.repo.delete(product_id)
+        catalog.invalidate()
+        return deleted
 
     def restock_product(
         self, product_id: int, quantity: int
     ) -> Optional[ProductResponse]:
         product = self.repo.restock(product_id, quantity)
+        catalog.invalidate()
         return ProductResponse.model_validate(product) if product else None
 
-    def search_products(self, name: str) -> List[ProductResponse]:
-        products = self.repo.search_by_name(name)
-        return [ProductResponse.model_validate(p) for p in products]
+    def search_products(self, name: str, min_seq: int = 0) -> List[ProductResponse]:
+        return catalog.get(self.session, min_seq).search(name)
+
+    def get_aliases(self, product_id: int) -> Optional[List[ProductAliasResponse]]:
+        if not self.repo.get_by_id(product_id):
+            return None
+        aliases = self.alias_repo.get_for_product(product_id)
+        return [ProductAliasResponse.model_validate(a) for a in aliases]
+
+    def add_alias(
+        self, product_id: int, alias_data: ProductAliasCreate
+    ) -> Optional[ProductAliasResponse]:
+        if not self.repo.get_by_id(product_id):
+            return None
+        alias = " ".join(alias_data.alias.split()).casefold()
+        if self.alias_repo.get_by_alias(alias):
+            raise AliasInUse(alias)
+        product_alias = self.alias_repo.create(product_id, alias)
+        catalog.invalidate()
+        return ProductAliasResponse.model_validate(product_alias)
+
+    def delete_alias(self, product_id: int, alias: str) -> bool:
+        deleted = self.alias_repo.delete(product_id, " ".join(alias.split()).casefold())
+        catalog.invalidate()
+        return deleted
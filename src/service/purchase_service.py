@@ -1,122 +1,386 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
 from sqlmodel import Session
-from typing import Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
+from src.db.repository.machine_stock_repository import MachineStockRepository
 from src.db.repository.product_repository import ProductRepository
+from src.db.repository.sales_rollup_repository import SalesRollupRepository
+from src.db.repository.stock_hold_repository import StockHoldRepository
 from src.db.repository.transaction_repository import TransactionRepository
+from src.db.shards import ShardNotFound, shard_router
+from src.model.machine_stock import DEFAULT_MACHINE_ID
 from src.model.transaction import (
     TransactionCreate,
     TransactionStatus,
 )
-from src.model.purchase import PurchaseIntent, UserIntent, AIResponse
-from src.model.product import Product
-from src.core.ai_client import client
-from src.core.prompts import PURCHASE_PROMPT
+from src.model.purchase import (
+    AIResponse,
+    BulkPurchaseRequest,
+    BulkPurchaseResponse,
+    IntentBatch,
+    ParsePath,
+    PurchasedItem,
+    PurchaseIntent,
+    UserIntent,
+)
+from src.model.product import ProductResponse
+from src.core.ai_client import async_client, client
+from src.core.catalog import catalog
+from src.core.intent_batcher import IntentBatcher
+from src.core.intent_cache import get_intent_cache
+from src.core.intent_parser import FastIntentParser
+from src.core.metrics import Histogram
+from src.core.resilience import CircuitOpen
+from src.core.tracing import Span
+from src.core.prompt_builder import PromptBuilder
+from src.service.reservation_service import new_reservation_id, stock_holds
+from src.settings import (
+    FAST_PARSER_ENABLED,
+    FAST_PARSER_MIN_CONFIDENCE,
+    INTENT_BATCH_ENABLED,
+    INTENT_BATCH_MAX_SIZE,
+    INTENT_BATCH_WINDOW_MS,
+    LLM_FALLBACK_MIN_CONFIDENCE,
+    PROMPT_MAX_PRODUCTS,
+    PROMPT_TOP_K,
+    RESERVATION_TTL_SECONDS,
+    RESERVATIONS_ENABLED,
+)
+
+
+logger = logging.getLogger(__name__)
+
+fast_parser = FastIntentParser(min_confidence=FAST_PARSER_MIN_CONFIDENCE)
+fallback_parser = FastIntentParser(min_confidence=LLM_FALLBACK_MIN_CONFIDENCE)
+prompt_builder = PromptBuilder(max_products=PROMPT_MAX_PRODUCTS, top_k=PROMPT_TOP_K)
+
+intent_parse_seconds = Histogram(
+    "intent_parse_seconds",
+    "Time spent turning a chat message into a PurchaseIntent",
+    labelnames=("path",),
+)
+
+
+class ProductNotFound(LookupError):
+    pass
+
+
+class InsufficientStock(ValueError):
+    pass
+
+
+class StockRow(NamedTuple):
+    id: int
+    name: str
+    price: object
+    stock_quantity: int
 
 
 class PurchaseService:
-    def __init__(self, session: Session = None):
+    """Parses chat messages and sells from one machine's stock.
+
+    `session` reads the catalog; the machine's stock, transactions and
+    rollups are written through `stock_session`, which is the same session
+    unless the machine lives in a shard database. The default machine sells
+    from Product.stock_quantity, every other one from its machine_stock rows.
+    """
+
+    def __init__(
+        self,
+        session: Session = None,
+        machine_id: Optional[str] = None,
+        stock_session: Optional[Session] = None,
+    ):
         self.session = session
+        self.machine_id = machine_id or DEFAULT_MACHINE_ID
+        self.stock_session = stock_session if stock_session is not None else session
         self.product_repo = ProductRepository(session)
-        self.transaction_repo = TransactionRepository(session)
+        self.machine_stock = (
+            MachineStockRepository(self.stock_session, self.machine_id)
+            if self.machine_id != DEFAULT_MACHINE_ID
+            else None
+        )
+        self.transaction_repo = TransactionRepository(self.stock_session, self.machine_id)
+        self.rollup_repo = SalesRollupRepository(self.stock_session, self.machine_id)
+        self.hold_repo = StockHoldRepository(self.stock_session)
         self.client = client
+        self.last_parse_path: Optional[ParsePath] = None
+        # Set by a sale when RESERVATIONS_ENABLED: (reservation id, hold expiry).
+        self.last_reservation: Optional[Tuple[str, datetime]] = None
 
     def parse_user_message(self, user_message: str) -> PurchaseIntent:
+        started = time.perf_counter()
+        with Span("intent_parse"):
+            intent = self._parse_without_llm(user_message)
+            if intent is None:
+                intent = self._parse_with_llm(user_message)
+                if self.last_parse_path == ParsePath.LLM:
+                    _cache_intent(user_message, intent)
+        intent_parse_seconds.observe(
+            time.perf_counter() - started, path=self.last_parse_path.value
+        )
+        return intent
+
+    def _parse_without_llm(self, user_message: str) -> Optional[PurchaseIntent]:
+        intent = self._parse_locally(user_message)
+        if intent is not None:
+            self.last_parse_path = ParsePath.FAST
+            return intent
+        return self._parse_cached(user_message)
+
+    def _parse_locally(self, user_message: str) -> Optional[PurchaseIntent]:
+        if not FAST_PARSER_ENABLED or self.session is None:
+            return None
+        snapshot = catalog.get(self.session)
+        return fast_parser.parse(user_message, snapshot.names, snapshot.aliases)
+
+    def _parse_cached(self, user_message: str) -> Optional[PurchaseIntent]:
+        cache = get_intent_cache()
+        intent = cache.get(user_message) if cache is not None else None
+        if intent is not None:
+            self.last_parse_path = ParsePath.CACHE
+        return intent
+
+    def _parse_with_llm(self, user_message: str) -> PurchaseIntent:
         try:
+            if self.session is not None:
+                # The prompt lists the catalog from the current snapshot.
+                catalog.get(self.session)
             response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                response_model=PurchaseIntent,
-                messages=[
-                    {"role": "system", "content": PURCHASE_PROMPT},
-                    {"role": "user", "content": user_message},
-                ],
-                temperature=0.1,
+                **_llm_request(user_message)
             )
+            self.last_parse_path = ParsePath.LLM
             return response
 
         except Exception as e:
-            return PurchaseIntent(
-                intent=UserIntent.UNKNOWN,
-                product_name=None,
-                quantity=None,
-                confidence=0.0,
-            )
+            _log_llm_failure(e)
+            self.last_parse_path = ParsePath.FALLBACK
+            return self._parse_fallback(user_message)
+
+    def _parse_fallback(self, user_message: str) -> PurchaseIntent:
+        # Keeps plain orders selling while the model is down or too slow.
+        if self.session is None:
+            return _unknown_intent()
+        snapshot = catalog.get(self.session)
+        intent = fallback_parser.parse(user_message, snapshot.names, snapshot.aliases)
+        return intent if intent is not None else _unknown_intent()
 
     def process_purchase(self, intent: PurchaseIntent, user_message: str) -> AIResponse:
         if intent.intent != UserIntent.PURCHASE:
             return self._handle_non_purchase_intent(intent)
 
-        if not intent.product_name or not intent.quantity:
+        line_items = intent.line_items()
+        if not line_items:
             return AIResponse(
                 success=False,
                 message="Please specify which product and how many you want. For example: 'I want 2 cokes'",
                 purchase_intent=intent,
             )
 
-        product = self._find_product_by_name(intent.product_name)
-        if not product:
-            available_products = self._get_available_products_list()
+        basket: Dict[int, Tuple[ProductResponse, int]] = {}
+        for item in line_items:
+            product = self._find_product_by_name(item.product_name)
+            if not product:
+                available_products = self._get_available_products_list()
+                return AIResponse(
+                    success=False,
+                    message=f"Sorry, I don't have '{item.product_name}'. Available products: {available_products}",
+                    purchase_intent=intent,
+                )
+            quantity = basket.get(product.id, (product, 0))[1] + item.quantity
+            basket[product.id] = (product, quantity)
+
+        # The snapshot only knows the default machine's stock; elsewhere the
+        # conditional update in _dispense is the only check.
+        if self.machine_stock is None:
+            for product, quantity in basket.values():
+                if product.stock_quantity < quantity:
+                    return AIResponse(
+                        success=False,
+                        message=f"Sorry, we only have {product.stock_quantity} {product.name} in stock.",
+                        purchase_intent=intent,
+                    )
+
+        try:
+            sold = self._dispense(list(basket.values()), user_message, intent.confidence)
+        except Exception as e:
+            self.stock_session.rollback()
             return AIResponse(
                 success=False,
-                message=f"Sorry, I don't have '{intent.product_name}'. Available products: {available_products}",
+                message="Sorry, a critical error occurred with your purchase. Please try again.",
                 purchase_intent=intent,
             )
 
-        if product.stock_quantity < intent.quantity:
+        if sold is None:
             return AIResponse(
                 success=False,
-                message=f"Sorry, we only have {product.stock_quantity} {product.name} in stock.",
+                message="Transaction failed due to a stock issue. Please try again.",
                 purchase_intent=intent,
             )
 
-        unit_price = product.price
-        print(
-            f"DEBUG: Product '{product.name}' found with price: {unit_price} (type: {type(unit_price)})"
-        )
-
-        total_price = unit_price * intent.quantity
-
-        transaction_data = TransactionCreate(
-            product_id=product.id,
-            quantity=intent.quantity,
-            unit_price=unit_price,
+        total_price = sum(item.total_price for item in sold)
+        dispensed = " and ".join(f"{item.quantity} {item.product_name}" for item in sold)
+        reservation_id, reserved_until = self.last_reservation or (None, None)
+        return AIResponse(
+            success=True,
+            message=f"Great! I've dispensed {dispensed} for ${total_price:.2f}. Enjoy your drink{'s' if len(sold) > 1 else ''}!",
+            purchase_intent=intent,
+            transaction_id=sold[0].transaction_id,
+            transaction_ids=[item.transaction_id for item in sold],
             total_price=total_price,
-            user_message=user_message,
-            intent=intent.intent,
-            confidence=intent.confidence,
+            reservation_id=reservation_id,
+            reserved_until=reserved_until,
         )
 
+    def purchase_bulk(self, request: BulkPurchaseRequest) -> BulkPurchaseResponse:
+        snapshot = catalog.get(self.session)
+        basket: Dict[int, Tuple[ProductResponse, int]] = {}
+        for item in request.items:
+            product = snapshot.get(item.product_id)
+            if product is None or not product.is_active:
+                raise ProductNotFound(item.product_id)
+            quantity = basket.get(product.id, (product, 0))[1] + item.quantity
+            basket[product.id] = (product, quantity)
+
+        user_message = request.reference or "POS bulk purchase"
         try:
-            transaction = self.transaction_repo.create(transaction_data)
-            updated_product = self.product_repo.update_stock(
-                product.id, intent.quantity
-            )
-
-            if not updated_product:
-                transaction.status = TransactionStatus.FAILED
-                self.session.commit()
-                return AIResponse(
-                    success=False,
-                    message="Transaction failed due to a stock issue. Please try again.",
-                    purchase_intent=intent,
-                )
-
-            transaction.status = TransactionStatus.SUCCESS
-            self.session.commit()
+            sold = self._dispense(list(basket.values()), user_message)
+        except Exception:
+            self.stock_session.rollback()
+            raise
+        if sold is None:
+            raise InsufficientStock()
+        reservation_id, reserved_until = self.last_reservation or (None, None)
+        return BulkPurchaseResponse(
+            items=sold,
+            total_price=sum(item.total_price for item in sold),
+            reservation_id=reservation_id,
+            reserved_until=reserved_until,
+        )
 
-            return AIResponse(
-                success=True,
-                message=f"Great! I've dispensed {intent.quantity} {product.name} for ${total_price:.2f}. Enjoy your drink!",
-                purchase_intent=intent,
-                transaction_id=transaction.id,
-                total_price=float(total_price),
+    def _dispense(
+        self,
+        basket: List[Tuple[ProductResponse, int]],
+        user_message: str,
+        confidence: Optional[float] = None,
+    ) -> Optional[List[PurchasedItem]]:
+        # Every line is sold in one transaction with one commit, or none is.
+        # Product id order keeps concurrent baskets from locking in a cycle.
+        basket = sorted(basket, key=lambda line: line[0].id)
+        sold = []
+        for product, quantity in basket:
+            # Conditional UPDATE ... RETURNING: the stock check and decrement are
+            # one statement, so concurrent buyers on any replica cannot oversell.
+            with Span("stock_update"):
+                row = self._decrement_stock(product, quantity)
+            if row is None:
+                self.stock_session.rollback()
+                for product, quantity in basket:
+                    self.transaction_repo.add(
+                        self._transaction_data(
+                            product.id, product.price, quantity, user_message, confidence
+                        ),
+                        status=TransactionStatus.FAILED,
+                    )
+                self.stock_session.commit()
+                if self.machine_stock is None:
+                    # Our snapshot stock was stale; re-read it on the next request.
+                    catalog.invalidate()
+                return None
+            sold.append((row, quantity))
+
+        # With reservations the sale stays PENDING, and out of the rollups,
+        # until the dispenser confirms it.
+        status = TransactionStatus.PENDING if RESERVATIONS_ENABLED else TransactionStatus.SUCCESS
+        transactions = []
+        for row, quantity in sold:
+            transaction = self.transaction_repo.add(
+                self._transaction_data(row.id, row.price, quantity, user_message, confidence),
+                status=status,
             )
-
-        except Exception as e:
-            return AIResponse(
-                success=False,
-                message="Sorry, a critical error occurred with your purchase. Please try again.",
-                purchase_intent=intent,
+            if not RESERVATIONS_ENABLED:
+                self.rollup_repo.record_sale(
+                    row.id, quantity, row.price * quantity, transaction.created_at
+                )
+            transactions.append(transaction)
+        self.stock_session.flush()
+        transaction_ids = [transaction.id for transaction in transactions]
+        if RESERVATIONS_ENABLED:
+            self.last_reservation = self._hold(sold, transaction_ids)
+        self.stock_session.commit()
+        if RESERVATIONS_ENABLED:
+            stock_holds.inc(len(sold), result="placed")
+
+        if self.machine_stock is None:
+            for row, _ in sold:
+                catalog.update_stock(row.id, row.stock_quantity)
+        return [
+            PurchasedItem(
+                product_id=row.id,
+                product_name=row.name,
+                quantity=quantity,
+                unit_price=float(row.price),
+                total_price=float(row.price * quantity),
+                transaction_id=transaction_id,
             )
+            for (row, quantity), transaction_id in zip(sold, transaction_ids)
+        ]
+
+    def _hold(
+        self, sold: List[Tuple[StockRow, int]], transaction_ids: List[int]
+    ) -> Tuple[str, datetime]:
+        # The units are already off the stock count, so available stock never
+        # has to look at holds; the rows only say what to give back.
+        reservation_id = new_reservation_id(self.machine_id)
+        expires_at = datetime.now() + timedelta(seconds=RESERVATION_TTL_SECONDS)
+        self.hold_repo.add_many(
+            [
+                {
+                    "reservation_id": reservation_id,
+                    "machine_id": self.machine_id,
+                    "product_id": row.id,
+                    "transaction_id": transaction_id,
+                    "quantity": quantity,
+                    "expires_at": expires_at,
+                }
+                for (row, quantity), transaction_id in zip(sold, transaction_ids)
+            ]
+        )
+        return reservation_id, expires_at
+
+    def _decrement_stock(
+        self, product: ProductResponse, quantity: int
+    ) -> Optional[StockRow]:
+        if self.machine_stock is None:
+            return self.product_repo.decrement_stock(product.id, quantity)
+        row = self.machine_stock.decrement_stock(product.id, quantity)
+        if row is None:
+            return None
+        # Machine stock rows carry no price; sell at the catalog's.
+        return StockRow(product.id, product.name, product.price, row.stock_quantity)
+
+    def _transaction_data(
+        self,
+        product_id: int,
+        unit_price,
+        quantity: int,
+        user_message: str,
+        confidence: Optional[float] = None,
+    ) -> TransactionCreate:
+        return TransactionCreate(
+            product_id=product_id,
+            quantity=quantity,
+            unit_price=unit_price,
+            total_price=unit_price * quantity,
+            user_message=user_message,
+            intent=UserIntent.PURCHASE,
+            confidence=confidence,
+            machine_id=self.machine_id,
+        )
 
     def _handle_non_purchase_intent(self, intent: PurchaseIntent) -> AIResponse:
         if intent.intent == UserIntent.LIST_PRODUCTS:
@@ -140,7 +404,7 @@ class PurchaseService:
             )
 
     def get_available_products(self) -> AIResponse:
-        products = self.product_repo.get_available_products()
+        products = self._available_products()
 
         if not products:
             return AIResponse(
@@ -180,38 +444,225 @@ class PurchaseService:
                 message=f"I don't have '{product_name}'. Available: {available_products}",
             )
 
-        if product.stock_quantity == 0:
+        # Names come from the snapshot, but stock answers are always read live.
+        if self.machine_stock is None:
+            product = self.product_repo.get_by_id(product.id)
+            catalog.update_stock(product.id, product.stock_quantity)
+            stock_quantity = product.stock_quantity
+        else:
+            stock = self.machine_stock.get(product.id)
+            stock_quantity = stock.stock_quantity if stock is not None else 0
+
+        if stock_quantity == 0:
             message = f"Sorry, {product.name} is out of stock."
         else:
-            message = f"{product.name}: {product.stock_quantity} units available at ${product.price:.2f} each"
+            message = f"{product.name}: {stock_quantity} units available at ${product.price:.2f} each"
 
         return AIResponse(success=True, message=message)
 
-    def _find_product_by_name(self, name: str) -> Optional[Product]:
-        name_lower = name.lower().strip()
+    def _find_product_by_name(self, name: str) -> Optional[ProductResponse]:
+        with Span("product_resolve"):
+            return catalog.get(self.session).find(name)
 
-        products = self.product_repo.search_by_name(name)
-        if products:
-            return products[0]
+    def _get_available_products_list(self) -> str:
+        products = self._available_products()
+        return ", ".join([p.name for p in products]) if products else "none"
 
-        aliases = {
-            "coke": "Coca-Cola",
-            "cola": "Coca-Cola",
-            "cokes": "Coca-Cola",
-            "fanta": "Fanta Orange",
-            "guarana": "Guarana Antarctica",
-            "sprite": "Sprite",
-            "pepsi": "Pepsi",
-        }
+    def _available_products(self) -> List[ProductResponse]:
+        snapshot = catalog.get(self.session)
+        if self.machine_stock is None:
+            return snapshot.available()
+        levels = self.machine_stock.get_levels()
+        return [
+            product.model_copy(update={"stock_quantity": levels[product.id]})
+            for product in snapshot.active
+            if levels.get(product.id, 0) > 0
+        ]
 
-        for alias, real_name in aliases.items():
-            if alias in name_lower:
-                products = self.product_repo.search_by_name(real_name)
-                if products:
-                    return products[0]
 
-        return None
+class AsyncPurchaseService:
+    """Event-loop friendly variant of PurchaseService.
 
-    def _get_available_products_list(self) -> str:
-        products = self.product_repo.get_available_products()
-        return ", ".join([p.name for p in products]) if products else "none"
+    The model call is awaited on the async instructor client. Database work
+    reuses PurchaseService and its repositories through AsyncSession.run_sync,
+    so every query runs on aiosqlite without holding a threadpool worker.
+    """
+
+    def __init__(self, session: AsyncSession, machine_id: Optional[str] = None):
+        self.session = session
+        self.machine_id = machine_id
+        self.client = async_client
+        self.last_parse_path: Optional[ParsePath] = None
+
+    async def parse_user_message(self, user_message: str) -> PurchaseIntent:
+        started = time.perf_counter()
+        with Span("intent_parse"):
+            intent = await self.session.run_sync(_parse_locally, user_message)
+            # Hand the connection back to the pool while we wait on the model.
+            await self.session.close()
+            if intent is not None:
+                self.last_parse_path = ParsePath.FAST
+            else:
+                # The cache may be a SQLite file shared with other replicas; its
+                # blocking reads and writes run in a worker thread.
+                intent = await asyncio.to_thread(_cached_intent, user_message)
+                if intent is not None:
+                    self.last_parse_path = ParsePath.CACHE
+                else:
+                    intent = await self._parse_with_llm(user_message)
+                    if self.last_parse_path == ParsePath.LLM:
+                        await asyncio.to_thread(_cache_intent, user_message, intent)
+        intent_parse_seconds.observe(
+            time.perf_counter() - started, path=self.last_parse_path.value
+        )
+        return intent
+
+    async def _parse_with_llm(self, user_message: str) -> PurchaseIntent:
+        try:
+            if intent_batcher is not None:
+                response = await intent_batcher.parse(user_message)
+            else:
+                response = await self.client.chat.completions.create(
+                    **_llm_request(user_message)
+                )
+            self.last_parse_path = ParsePath.LLM
+            return response
+
+        except Exception as e:
+            _log_llm_failure(e)
+            self.last_parse_path = ParsePath.FALLBACK
+            return await self.session.run_sync(
+                lambda session: PurchaseService(session)._parse_fallback(user_message)
+            )
+
+    async def process_purchase(
+        self, intent: PurchaseIntent, user_message: str
+    ) -> AIResponse:
+        if shard_router.url_for(self.machine_id) is None:
+            return await self.session.run_sync(
+                lambda session: PurchaseService(session, self.machine_id).process_purchase(
+                    intent, user_message
+                )
+            )
+        try:
+            shard_engine = shard_router.async_engine_for(self.machine_id)
+        except ShardNotFound:
+            # Nothing was ever stocked on this machine.
+            return AIResponse(
+                success=False, message="Sorry, we're currently out of stock on all products."
+            )
+        # The catalog is read through our session, the sale is committed on the
+        # machine's shard; both run inside the shard session's run_sync.
+        async with AsyncSession(shard_engine) as stock_session:
+            return await stock_session.run_sync(
+                lambda sync_stock_session: PurchaseService(
+                    self.session.sync_session, self.machine_id, sync_stock_session
+                ).process_purchase(intent, user_message)
+            )
+
+
+def _llm_request(user_message: str) -> dict:
+    return {
+        "model": "gpt-4o-mini",
+        "response_model": PurchaseIntent,
+        "messages": [
+            {
+                "role": "system",
+                "content": prompt_builder.build(catalog.current(), [user_message]),
+            },
+            {"role": "user", "content": user_message},
+        ],
+        "temperature": 0.1,
+    }
+
+
+def _llm_batch_request(user_messages: List[str]) -> dict:
+    numbered = "\n".join(
+        f"[{index}] {' '.join(message.split())}"
+        for index, message in enumerate(user_messages)
+    )
+    return {
+        "model": "gpt-4o-mini",
+        "response_model": IntentBatch,
+        "messages": [
+            {
+                "role": "system",
+                "content": prompt_builder.build(catalog.current(), user_messages, batch=True),
+            },
+            {"role": "user", "content": numbered},
+        ],
+        "temperature": 0.1,
+    }
+
+
+async def _parse_batch_with_llm(user_messages: List[str]) -> List[PurchaseIntent]:
+    if len(user_messages) == 1:
+        return [await async_client.chat.completions.create(**_llm_request(user_messages[0]))]
+
+    batch = await async_client.chat.completions.create(
+        **_llm_batch_request(user_messages)
+    )
+    intents: List[Optional[PurchaseIntent]] = [None] * len(user_messages)
+    for item in batch.intents:
+        if 0 <= item.message_index < len(intents) and intents[item.message_index] is None:
+            intents[item.message_index] = PurchaseIntent.model_validate(
+                item.model_dump(exclude={"message_index"})
+            )
+
+    # Messages the model skipped are parsed on their own rather than guessed.
+    missing = [index for index, intent in enumerate(intents) if intent is None]
+    retried = await asyncio.gather(
+        *(
+            async_client.chat.completions.create(**_llm_request(user_messages[index]))
+            for index in missing
+        )
+    )
+    for index, intent in zip(missing, retried):
+        intents[index] = intent
+    return intents
+
+
+intent_batcher = (
+    IntentBatcher(
+        _parse_batch_with_llm,
+        window_seconds=INTENT_BATCH_WINDOW_MS / 1000,
+        max_batch_size=INTENT_BATCH_MAX_SIZE,
+    )
+    if INTENT_BATCH_ENABLED
+    else None
+)
+
+
+def _unknown_intent() -> PurchaseIntent:
+    return PurchaseIntent(
+        intent=UserIntent.UNKNOWN,
+        product_name=None,
+        quantity=None,
+        confidence=0.0,
+    )
+
+
+def _log_llm_failure(error: Exception) -> None:
+    if isinstance(error, CircuitOpen):
+        logger.debug("LLM circuit open; parsing locally")
+    else:
+        logger.warning("LLM intent parse failed, parsing locally: %r", error)
+
+
+def _cached_intent(user_message: str) -> Optional[PurchaseIntent]:
+    cache = get_intent_cache()
+    return cache.get(user_message) if cache is not None else None
+
+
+def _cache_intent(user_message: str, intent: PurchaseIntent) -> None:
+    cache = get_intent_cache()
+    if cache is not None:
+        cache.set(user_message, intent)
+
+
+def _parse_locally(session: Session, user_message: str) -> Optional[PurchaseIntent]:
+    intent = PurchaseService(session)._parse_locally(user_message)
+    if intent is None:
+        # Loaded here, on the session, for the prompt the model call will need.
+        catalog.get(session)
+    return intent
@@ -0,0 +1,128 @@
+import re
+import uuid
+from sqlalchemy import Row
+from sqlmodel import Session
+from typing import List, Optional
+from datetime import datetime
+
+from src.core.catalog import catalog
+from src.core.metrics import Counter
+from src.db.repository.machine_stock_repository import MachineStockRepository
+from src.db.repository.product_repository import ProductRepository
+from src.db.repository.sales_rollup_repository import SalesRollupRepository
+from src.db.repository.stock_hold_repository import StockHoldRepository
+from src.db.repository.transaction_repository import TransactionRepository
+from src.model.machine_stock import DEFAULT_MACHINE_ID, MACHINE_ID_PATTERN
+from src.model.purchase import PurchasedItem, ReservationResponse, ReservationStatus
+from src.model.transaction import TransactionStatus
+
+
+stock_holds = Counter(
+    "stock_holds_total",
+    "Stock holds by outcome: placed, confirmed, released by the dispenser, or expired",
+    labelnames=("result",),
+)
+
+_MACHINE_ID = re.compile(MACHINE_ID_PATTERN)
+
+
+def new_reservation_id(machine_id: str) -> str:
+    # Machine ids cannot contain ".", so the id also says which shard holds it.
+    return f"{machine_id}.{uuid.uuid4().hex}"
+
+
+def reservation_machine_id(reservation_id: str) -> Optional[str]:
+    machine_id, dot, _ = reservation_id.partition(".")
+    return machine_id if dot and _MACHINE_ID.match(machine_id) else None
+
+
+class ReservationService:
+    """Settles the stock holds placed by two-phase sales.
+
+    `stock_session` is the database holding the machine's holds; `session`
+    reads the catalog for product names. Confirming records the sale;
+    releasing, or the hold expiring, puts the units back on sale. Either way
+    the PENDING transactions move to SUCCESS or FAILED.
+    """
+
+    def __init__(self, session: Session, stock_session: Optional[Session] = None):
+        self.session = session
+        self.stock_session = stock_session if stock_session is not None else session
+        self.hold_repo = StockHoldRepository(self.stock_session)
+        self.transaction_repo = TransactionRepository(self.stock_session)
+
+    def confirm(self, reservation_id: str) -> Optional[ReservationResponse]:
+        holds = self.hold_repo.claim(reservation_id)
+        if not holds:
+            return None
+        rows = self.transaction_repo.resolve_pending(
+            [hold.transaction_id for hold in holds], TransactionStatus.SUCCESS
+        )
+        for row in rows:
+            SalesRollupRepository(self.stock_session, row.machine_id).record_sale(
+                row.product_id, row.quantity, row.total_price, row.created_at
+            )
+        self.stock_session.commit()
+        stock_holds.inc(len(holds), result="confirmed")
+        return self._response(reservation_id, ReservationStatus.CONFIRMED, rows)
+
+    def release(self, reservation_id: str) -> Optional[ReservationResponse]:
+        holds = self.hold_repo.claim(reservation_id)
+        if not holds:
+            return None
+        rows = self._release(holds)
+        stock_holds.inc(len(holds), result="released")
+        return self._response(reservation_id, ReservationStatus.RELEASED, rows)
+
+    def sweep(self, batch_size: int) -> int:
+        """Releases up to `batch_size` expired holds; returns how many."""
+        holds = self.hold_repo.claim_expired(datetime.now(), batch_size)
+        if holds:
+            self._release(holds)
+            stock_holds.inc(len(holds), result="expired")
+        return len(holds)
+
+    def _release(self, holds: List[Row]) -> List[Row]:
+        restocked = []
+        for hold in holds:
+            if hold.machine_id == DEFAULT_MACHINE_ID:
+                row = ProductRepository(self.stock_session).increment_stock(
+                    hold.product_id, hold.quantity
+                )
+                if row is not None:
+                    restocked.append(row)
+            else:
+                MachineStockRepository(self.stock_session, hold.machine_id).increment_stock(
+                    hold.product_id, hold.quantity
+                )
+        rows = self.transaction_repo.resolve_pending(
+            [hold.transaction_id for hold in holds], TransactionStatus.FAILED
+        )
+        self.stock_session.commit()
+        for row in restocked:
+            catalog.update_stock(row.id, row.stock_quantity)
+        return rows
+
+    def _response(
+        self, reservation_id: str, status: ReservationStatus, rows: List[Row]
+    ) -> ReservationResponse:
+        snapshot = catalog.get(self.session)
+        items = []
+        for row in rows:
+            product = snapshot.get(row.product_id)
+            items.append(
+                PurchasedItem(
+                    product_id=row.product_id,
+                    product_name=product.name if product is not None else str(row.product_id),
+                    quantity=row.quantity,
+                    unit_price=float(row.unit_price),
+                    total_price=float(row.total_price),
+                    transaction_id=row.id,
+                )
+            )
+        return ReservationResponse(
+            reservation_id=reservation_id,
+            status=status,
+            items=items,
+            total_price=sum(item.total_price for item in items),
+        )
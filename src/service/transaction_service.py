@@ -1,14 +1,49 @@
+import csv
+import io
+import json
+import logging
+import time
 from sqlmodel import Session
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
 
+from src.core.pagination import InvalidCursor, decode_cursor, next_cursor
+
+from src.db.repository.sales_rollup_repository import SalesRollupRepository
 from src.db.repository.transaction_repository import TransactionRepository
-from src.model.transaction import TransactionResponse
+from src.model.transaction import ExportFormat, TransactionResponse, TransactionStatus
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = (
+    "id",
+    "machine_id",
+    "product_id",
+    "user_message",
+    "intent",
+    "quantity",
+    "unit_price",
+    "total_price",
+    "status",
+    "created_at",
+)
+
+
+def _export_value(value):
+    if hasattr(value, "value"):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is not None and not isinstance(value, (str, int, float, bool)):
+        return str(value)
+    return value
 
 
 class TransactionService:
-    def __init__(self, session: Session):
-        self.repo = TransactionRepository(session)
+    def __init__(self, session: Session, machine_id: Optional[str] = None):
+        self.repo = TransactionRepository(session, machine_id)
+        self.rollup_repo = SalesRollupRepository(session, machine_id)
 
     def get_all_transactions(
         self, skip: int = 0, limit: int = 100
@@ -16,10 +51,78 @@ class TransactionService:
         transactions = self.repo.get_all(skip, limit)
         return [TransactionResponse.model_validate(t) for t in transactions]
 
+    def get_transaction_page(
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[TransactionResponse], Optional[str]]:
+        if cursor:
+            created_at, transaction_id = decode_cursor(cursor, 2)
+            try:
+                after = datetime.fromisoformat(created_at), int(transaction_id)
+            except (TypeError, ValueError) as e:
+                raise InvalidCursor("Malformed cursor") from e
+            transactions = self.repo.get_page_after(*after, limit)
+        else:
+            transactions = self.repo.get_all(skip, limit)
+        return (
+            [TransactionResponse.model_validate(t) for t in transactions],
+            next_cursor(transactions, limit, "created_at", "id"),
+        )
+
     def get_daily_summary(self, date: Optional[datetime] = None) -> dict:
-        summary = self.repo.get_daily_sales_summary(date)
-        summary.pop("transactions", None)
-        return summary
+        return self.rollup_repo.get_daily_summary((date or datetime.now()).date())
+
+    def get_total_sales(self, start_date: Optional[datetime] = None) -> dict:
+        return {
+            "start_date": start_date,
+            "total_revenue": self.repo.get_total_sales(start_date),
+        }
+
+    def get_popular_products(self, days: int = 7) -> List[dict]:
+        return self.rollup_repo.get_popular_products(days)
+
+    def get_hourly_sales_pattern(self, days: int = 7) -> List[dict]:
+        return self.rollup_repo.get_hourly_sales_pattern(days)
+
+    def export_transactions(
+        self,
+        format: ExportFormat = ExportFormat.NDJSON,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        status: Optional[TransactionStatus] = None,
+    ) -> Iterator[str]:
+        # Rows are encoded a batch at a time so each chunk sent to the client
+        # carries EXPORT_BATCH_SIZE lines instead of one.
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == ExportFormat.CSV:
+            writer.writerow(EXPORT_COLUMNS)
+
+        started = time.perf_counter()
+        count = 0
+        rows = self.repo.stream(start_date, end_date, status, EXPORT_BATCH_SIZE)
+        for row in rows:
+            values = [_export_value(getattr(row, column)) for column in EXPORT_COLUMNS]
+            if format == ExportFormat.CSV:
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values))))
+                buffer.write("\n")
+            count += 1
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Exported %d transactions as %s in %.2fs (%.0f rows/s)",
+            count,
+            format.value,
+            elapsed,
+            count / elapsed if elapsed else 0,
+        )
 
     def get_recent_transactions(self, hours: int = 24) -> List[TransactionResponse]:
         transactions = self.repo.get_recent_transactions(hours)
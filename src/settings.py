@@ -5,4 +5,109 @@ dotenv.load_dotenv()
 
 __ORIGINS__ = os.getenv("ORIGINS", "http://localhost:3000")
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./happyloop.db")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "your-openai-api-key")
+# Points the client at any chat-completions server, e.g. a proxy.
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# "openai", "mock" (benchmarks/mock_openai.py over HTTP) or "local" (in-process,
+# no network): the last two answer with the rule-based intent parser.
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+LLM_MOCK_BASE_URL = os.getenv("LLM_MOCK_BASE_URL", "http://localhost:8080/v1")
+LLM_LOCAL_LATENCY_MS = float(os.getenv("LLM_LOCAL_LATENCY_MS", "0"))
+LLM_LOCAL_JITTER_MS = float(os.getenv("LLM_LOCAL_JITTER_MS", "0"))
+LLM_LOCAL_ERROR_RATE = float(os.getenv("LLM_LOCAL_ERROR_RATE", "0"))
+LLM_LOCAL_SEED = int(os.getenv("LLM_LOCAL_SEED")) if os.getenv("LLM_LOCAL_SEED") else None
+
+# Total time one intent parse may spend on the model, retries included.
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "10"))
+LLM_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("LLM_ATTEMPT_TIMEOUT_SECONDS", "5"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "2"))
+LLM_BACKOFF_BASE_MS = float(os.getenv("LLM_BACKOFF_BASE_MS", "100"))
+LLM_BACKOFF_MAX_MS = float(os.getenv("LLM_BACKOFF_MAX_MS", "2000"))
+# Send a second request when the first has not answered by then; empty disables.
+LLM_HEDGE_AFTER_MS = float(os.getenv("LLM_HEDGE_AFTER_MS")) if os.getenv("LLM_HEDGE_AFTER_MS") else None
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+# Minimum confidence the rule-based parser needs when it stands in for the model.
+LLM_FALLBACK_MIN_CONFIDENCE = float(os.getenv("LLM_FALLBACK_MIN_CONFIDENCE", "0.6"))
+
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Applied to every SQLite connection; an empty value leaves SQLite's default.
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")
+SQLITE_MMAP_SIZE = os.getenv("SQLITE_MMAP_SIZE", "268435456")
+SQLITE_CACHE_SIZE = os.getenv("SQLITE_CACHE_SIZE", "-65536")
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+
+FAST_PARSER_ENABLED = os.getenv("FAST_PARSER_ENABLED", "true").lower() == "true"
+FAST_PARSER_MIN_CONFIDENCE = float(os.getenv("FAST_PARSER_MIN_CONFIDENCE", "0.85"))
+
+INTENT_CACHE_BACKEND = os.getenv("INTENT_CACHE_BACKEND", "memory")
+INTENT_CACHE_MAX_SIZE = int(os.getenv("INTENT_CACHE_MAX_SIZE", "1024"))
+INTENT_CACHE_TTL_SECONDS = float(os.getenv("INTENT_CACHE_TTL_SECONDS", "3600"))
+INTENT_CACHE_PATH = os.getenv("INTENT_CACHE_PATH", "./intent_cache.db")
+
+INTENT_BATCH_ENABLED = os.getenv("INTENT_BATCH_ENABLED", "false").lower() == "true"
+INTENT_BATCH_WINDOW_MS = float(os.getenv("INTENT_BATCH_WINDOW_MS", "10"))
+INTENT_BATCH_MAX_SIZE = int(os.getenv("INTENT_BATCH_MAX_SIZE", "16"))
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# Longer than nginx's proxy_read_timeout, so a live request never loses its claim.
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "330"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "60"))
+IDEMPOTENCY_POLL_SECONDS = float(os.getenv("IDEMPOTENCY_POLL_SECONDS", "0.05"))
+IDEMPOTENCY_SWEEP_SECONDS = float(os.getenv("IDEMPOTENCY_SWEEP_SECONDS", "300"))
+
+# Catalogs with more active products than this only list the PROMPT_TOP_K
+# products matching each message in the LLM prompt.
+PROMPT_MAX_PRODUCTS = int(os.getenv("PROMPT_MAX_PRODUCTS", "50"))
+PROMPT_TOP_K = int(os.getenv("PROMPT_TOP_K", "8"))
+
+# Chat audit rows are queued and batch-inserted off the request path.
+AUDIT_LOG_ENABLED = os.getenv("AUDIT_LOG_ENABLED", "true").lower() == "true"
+AUDIT_LOG_QUEUE_SIZE = int(os.getenv("AUDIT_LOG_QUEUE_SIZE", "10000"))
+AUDIT_LOG_BATCH_SIZE = int(os.getenv("AUDIT_LOG_BATCH_SIZE", "500"))
+AUDIT_LOG_FLUSH_INTERVAL_MS = float(os.getenv("AUDIT_LOG_FLUSH_INTERVAL_MS", "1000"))
+AUDIT_LOG_PUT_TIMEOUT_MS = float(os.getenv("AUDIT_LOG_PUT_TIMEOUT_MS", "50"))
+
+# Two-phase dispense: sales only hold their stock, as PENDING transactions, until
+# the dispenser confirms or releases the reservation. Holds neither confirmed nor
+# released within RESERVATION_TTL_SECONDS are swept back into stock.
+RESERVATIONS_ENABLED = os.getenv("RESERVATIONS_ENABLED", "false").lower() == "true"
+RESERVATION_TTL_SECONDS = float(os.getenv("RESERVATION_TTL_SECONDS", "60"))
+RESERVATION_SWEEP_SECONDS = float(os.getenv("RESERVATION_SWEEP_SECONDS", "5"))
+RESERVATION_SWEEP_BATCH_SIZE = int(os.getenv("RESERVATION_SWEEP_BATCH_SIZE", "500"))
+
+# Stock, transactions and rollups of every machine but the default one go to
+# SHARD_DATABASE_URL: "{machine_id}" in it gives each machine its own database,
+# "{shard}" spreads machines over SHARD_COUNT of them. Unset keeps them in
+# DATABASE_URL, partitioned by the machine_id column.
+SHARD_DATABASE_URL = os.getenv("SHARD_DATABASE_URL") or None
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "4"))
+# Shards with open engines per worker; the least recently used are closed.
+SHARD_ENGINE_CACHE_SIZE = int(os.getenv("SHARD_ENGINE_CACHE_SIZE", "64"))
+
+# Every product write is logged to inventory_events; each worker polls it every
+# INVENTORY_FEED_POLL_MS and streams new rows to its feed subscribers. Clients
+# resuming further back than the last INVENTORY_FEED_RETAIN_EVENTS get a snapshot.
+INVENTORY_FEED_POLL_MS = float(os.getenv("INVENTORY_FEED_POLL_MS", "200"))
+INVENTORY_FEED_RETAIN_EVENTS = int(os.getenv("INVENTORY_FEED_RETAIN_EVENTS", "100000"))
+INVENTORY_FEED_QUEUE_SIZE = int(os.getenv("INVENTORY_FEED_QUEUE_SIZE", "1000"))
+INVENTORY_FEED_HEARTBEAT_SECONDS = float(os.getenv("INVENTORY_FEED_HEARTBEAT_SECONDS", "15"))
+
+# Product reads carry an ETag that changes with every product write; shared
+# caches such as nginx may serve them for PRODUCTS_CACHE_MAX_AGE_SECONDS before
+# revalidating. 0 makes every read revalidate.
+PRODUCTS_CACHE_MAX_AGE_SECONDS = int(os.getenv("PRODUCTS_CACHE_MAX_AGE_SECONDS", "1"))
+
+CATALOG_VERSION_CHECK_SECONDS = float(os.getenv("CATALOG_VERSION_CHECK_SECONDS", "1"))
+CATALOG_MAX_AGE_SECONDS = float(os.getenv("CATALOG_MAX_AGE_SECONDS", "30"))